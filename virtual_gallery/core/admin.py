@@ -1,8 +1,172 @@
+from django.conf import settings
 from django.contrib import admin
-from django.utils.html import format_html
-from django.core.exceptions import ValidationError
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import path, reverse
+from django.template.defaultfilters import filesizeformat
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+from django.core.exceptions import PermissionDenied, ValidationError
 from django import forms
-from .models import Artist, Painting, BlogPost, ContactRequest, SiteContact, BlogPostImage
+from .cards import card_stats
+from .catalog_archive import archive_filename, stream_catalog
+from .contact_export import export_filename, stream_csv
+from .db import connection_stats
+from .duplicates import DUPLICATE_MODES, DUPLICATE_WARN
+from .facets import invalidate_facets
+from .models import (
+    Artist, Painting, BlogPost, ContactRequest, SiteContact, BlogPostImage, ChunkedUpload, OutboxMessage
+)
+from .ratelimit import shed_stats
+from .site_export import schedule_export
+from .uploads import create_upload, open_upload, upload_detail, user_uploads
+
+
+class ChunkedUploadForm(forms.ModelForm):
+    """
+    Базовая форма для моделей с большими изображениями.
+
+    Для каждого поля из chunked_fields форма должна объявить скрытое поле <имя>_upload. Скрипт
+    chunked_upload.js загружает большой файл частями и записывает в него идентификатор загрузки;
+    при сохранении поле изображения получает собранный файл с диска, а не из тела запроса.
+    Загрузка ищется среди загрузок пользователя из request (задает ChunkedUploadAdminMixin.get_form).
+    """
+    chunked_fields = ()
+    request = None
+
+    class Media:
+        js = ('js/chunked_upload.js',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunked_uploads = []
+        for name in self.chunked_fields:
+            upload_field = self.fields[f'{name}_upload']
+            upload_field.widget.attrs.update({
+                'data-chunked-upload': name,
+                'data-endpoint': reverse('custom_admin:chunked_upload_create'),
+                'data-chunk-size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+            })
+            if self.data.get(self.add_prefix(f'{name}_upload')):
+                # Файл уже загружен по частям, в самом запросе его нет.
+                self.fields[name].required = False
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name in self.chunked_fields:
+            upload_id = cleaned_data.get(f'{name}_upload')
+            if not upload_id:
+                continue
+            uploads = user_uploads(self.request) if self.request else ChunkedUpload.objects.none()
+            upload = uploads.filter(pk=upload_id).first()
+            if upload is None or not upload.is_complete:
+                self.add_error(name, "Загрузка файла не завершена. Выберите файл повторно.")
+                continue
+            cleaned_data[name] = open_upload(upload)
+            self.chunked_uploads.append((upload, cleaned_data[name]))
+        return cleaned_data
+
+    def full_clean(self):
+        super().full_clean()
+        if self._errors:
+            self.close_uploads()
+
+    def close_uploads(self):
+        """
+        Закрывает открытые файлы, если объект не будет сохранен: загрузки остаются для повторной отправки.
+        """
+        for _, file in self.chunked_uploads:
+            file.close()
+        self.chunked_uploads = []
+
+    def finish_uploads(self):
+        """
+        Закрывает и удаляет временные файлы после сохранения модели.
+        """
+        for upload, file in self.chunked_uploads:
+            file.close()
+            upload.delete()
+        self.chunked_uploads = []
+
+
+def chunked_upload_field():
+    """
+    Скрытое поле с идентификатором загрузки по частям (UUID).
+    """
+    return forms.UUIDField(required=False, widget=forms.HiddenInput)
+
+
+def duplicate_mode_field():
+    """
+    Выбор действия для повторной загрузки похожего изображения (см. core/duplicates.py).
+    """
+    return forms.ChoiceField(
+        choices=DUPLICATE_MODES,
+        initial=DUPLICATE_WARN,
+        required=False,
+        label="Повторная загрузка",
+        help_text="Новое изображение до обработки сравнивается с уже загруженными по перцептивному хешу."
+    )
+
+
+class DuplicateCheckFormMixin:
+    """
+    Передает модели выбранное действие для похожих изображений.
+
+    Форма должна объявить поле duplicate_mode = duplicate_mode_field(). Проверка выполняется
+    в GuardedImageMixin.clean до обработки изображения.
+    """
+
+    def clean(self):
+        cleaned_data = super().clean()
+        self.instance.duplicate_mode = cleaned_data.get('duplicate_mode') or DUPLICATE_WARN
+        return cleaned_data
+
+
+class PaintingAdminForm(DuplicateCheckFormMixin, ChunkedUploadForm):
+    chunked_fields = ('image',)
+    image_upload = chunked_upload_field()
+    duplicate_mode = duplicate_mode_field()
+
+    class Meta:
+        model = Painting
+        fields = '__all__'
+
+
+class BlogPostAdminForm(DuplicateCheckFormMixin, ChunkedUploadForm):
+    chunked_fields = ('cover_image',)
+    cover_image_upload = chunked_upload_field()
+    duplicate_mode = duplicate_mode_field()
+
+    class Meta:
+        model = BlogPost
+        fields = '__all__'
+
+
+class BlogPostImageAdminForm(DuplicateCheckFormMixin, forms.ModelForm):
+    duplicate_mode = duplicate_mode_field()
+
+    class Meta:
+        model = BlogPostImage
+        fields = '__all__'
+
+
+class ChunkedUploadAdminMixin:
+    """
+    Передает форме запрос и удаляет временные файлы загрузок по частям после сохранения объекта.
+    """
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        return type(form.__name__, (form,), {'request': request})
+
+    def render_change_form(self, request, context, *args, **kwargs):
+        # Форма показывается снова (ошибки в ней или в inline-формах): объект не сохраняется
+        context['adminform'].form.close_uploads()
+        return super().render_change_form(request, context, *args, **kwargs)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        form.finish_uploads()
 
 
 class BlogPostImageInlineFormSet(forms.BaseInlineFormSet):
@@ -31,8 +195,9 @@ class BlogPostImageInline(admin.TabularInline):
     Позволяет добавлять до 5 изображений, с валидацией через формсет.
     """
     model = BlogPostImage
+    form = BlogPostImageAdminForm
     extra = 0
-    fields = ('image',)
+    fields = ('image', 'duplicate_mode')
     max_num = 5
     formset = BlogPostImageInlineFormSet
     verbose_name = "Дополнительное изображение"
@@ -76,13 +241,16 @@ class ArtistAdmin(admin.ModelAdmin):
         super().delete_queryset(request, queryset)
 
 
-class PaintingAdmin(admin.ModelAdmin):
+class PaintingAdmin(ChunkedUploadAdminMixin, admin.ModelAdmin):
     """
     Админ-панель для модели Painting.
 
     Включает превью изображений, действия для избранных, фильтры и поиск.
+    Большие оригиналы загружаются по частям (см. core/uploads.py), повторные загрузки похожих
+    изображений обнаруживаются до обработки (см. core/duplicates.py).
     """
-    list_display = ('title', 'creation_date', 'price', 'is_featured', 'thumbnail_preview')
+    form = PaintingAdminForm
+    list_display = ('title', 'creation_date', 'price', 'is_featured', 'views', 'thumbnail_preview')
     list_filter = ('is_featured', 'creation_date')
     search_fields = ('title', 'description')
     list_editable = ('is_featured', 'price')
@@ -90,10 +258,10 @@ class PaintingAdmin(admin.ModelAdmin):
     date_hierarchy = 'creation_date'
     actions = ['make_featured', 'remove_featured']
     fields = (
-        'title', 'slug', 'description', 'creation_date', 'price', 'is_featured',
-        'image', 'small_image', 'medium_image', 'large_image'
+        'title', 'slug', 'description', 'creation_date', 'price', 'is_featured', 'views',
+        'image', 'image_upload', 'duplicate_mode', 'small_image', 'medium_image', 'large_image', 'image_files_info'
     )
-    readonly_fields = ('small_image', 'medium_image', 'large_image')
+    readonly_fields = ('views', 'small_image', 'medium_image', 'large_image', 'image_files_info')
 
     def thumbnail_preview(self, obj):
         """Отображает превью маленького изображения в списке."""
@@ -103,35 +271,67 @@ class PaintingAdmin(admin.ModelAdmin):
 
     thumbnail_preview.short_description = "Превью"
 
+    def image_files_info(self, obj):
+        """Показывает размеры, объем и формат оригинала и версий (из сохраненных полей, без чтения файлов)."""
+        rows = []
+        for field_name, label in (
+                ('image', 'Оригинал'), ('small_image', 'Малое'),
+                ('medium_image', 'Среднее'), ('large_image', 'Большое')
+        ):
+            width = getattr(obj, f'{field_name}_width')
+            if width is None:
+                continue
+            rows.append((
+                label, width, getattr(obj, f'{field_name}_height'),
+                filesizeformat(getattr(obj, f'{field_name}_bytes') or 0), getattr(obj, f'{field_name}_mime')
+            ))
+        if not rows:
+            return "Нет данных"
+        return format_html_join('', '<div>{}: {}×{}, {}, {}</div>', rows)
+
+    image_files_info.short_description = "Файлы изображения"
+
     def make_featured(self, request, queryset):
         """Делает выбранные картины избранными."""
-        queryset.update(is_featured=True)
+        self.update_featured(queryset, True)
 
     make_featured.short_description = "Сделать избранными"
 
     def remove_featured(self, request, queryset):
         """Убирает выбранные картины из избранных."""
-        queryset.update(is_featured=False)
+        self.update_featured(queryset, False)
 
     remove_featured.short_description = "Убрать из избранных"
 
+    def update_featured(self, queryset, value):
+        """
+        Меняет признак избранного одним UPDATE. Сигналы post_save при этом не срабатывают,
+        поэтому карточки, счетчики фасетов и экспортированные страницы обновляются здесь.
+        """
+        queryset.update(is_featured=value, updated_at=timezone.now())
+        invalidate_facets()
+        schedule_export()
+
     def delete_queryset(self, request, queryset):
         """Удаляет объекты (сигналы pre_delete обработают файлы)."""
         super().delete_queryset(request, queryset)
 
 
-class BlogPostAdmin(admin.ModelAdmin):
+class BlogPostAdmin(ChunkedUploadAdminMixin, admin.ModelAdmin):
     """
     Админ-панель для модели BlogPost.
 
     Включает inline для изображений, превью обложки и содержания.
+    Большие обложки загружаются по частям (см. core/uploads.py), повторные загрузки похожих
+    изображений обнаруживаются до обработки (см. core/duplicates.py).
     """
-    list_display = ('title', 'pub_date', 'cover_preview', 'content_preview')
+    form = BlogPostAdminForm
+    list_display = ('title', 'pub_date', 'cover_preview', 'content_preview', 'reading_time')
     list_filter = ('pub_date',)
     search_fields = ('title', 'content')
     prepopulated_fields = {'slug': ('title',)}
     date_hierarchy = 'pub_date'
-    fields = ('title', 'slug', 'content', 'cover_image')
+    fields = ('title', 'slug', 'content', 'cover_image', 'cover_image_upload', 'duplicate_mode')
     inlines = [BlogPostImageInline]
 
     def cover_preview(self, obj):
@@ -143,12 +343,12 @@ class BlogPostAdmin(admin.ModelAdmin):
     cover_preview.short_description = "Обложка"
 
     def content_preview(self, obj):
-        """Возвращает сокращенную версию содержания для списка (без '...' если текст короткий)."""
-        if not obj.content:
+        """Возвращает начало сохраненного отрывка для списка (без '...' если текст короткий)."""
+        if not obj.excerpt:
             return ''
-        if len(obj.content) > 60:
-            return obj.content[:60] + '...'
-        return obj.content
+        if len(obj.excerpt) > 60:
+            return obj.excerpt[:60] + '...'
+        return obj.excerpt
 
     content_preview.short_description = "Содержание"
 
@@ -165,10 +365,12 @@ class ContactRequestAdmin(admin.ModelAdmin):
     """
     Админ-панель для модели ContactRequest.
 
-    Только просмотр и удаление заявок, без добавления.
+    Только просмотр и удаление заявок, без добавления. Выбранные заявки (или все по фильтру
+    периода) выгружаются в CSV потоком, без загрузки в память (см. core/contact_export.py).
     """
     list_display = ('name', 'email', 'created_at', 'message_preview')
     list_filter = ('created_at',)
+    actions = ['export_csv']
     search_fields = ('name', 'email', 'message')
     date_hierarchy = 'created_at'
     readonly_fields = ('name', 'email', 'message', 'created_at')
@@ -184,6 +386,15 @@ class ContactRequestAdmin(admin.ModelAdmin):
 
     message_preview.short_description = "Сообщение"
 
+    def export_csv(self, request, queryset):
+        """Отдает выбранные заявки файлом CSV; строки читаются из БД порциями по мере скачивания."""
+        response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{export_filename()}"'
+        response['X-Accel-Buffering'] = 'no'  # Nginx передает файл сразу, не накапливая ответ
+        return response
+
+    export_csv.short_description = "Выгрузить в CSV"
+
     def has_add_permission(self, request):
         """Запрещает добавление новых заявок в админке."""
         return False
@@ -193,6 +404,36 @@ class ContactRequestAdmin(admin.ModelAdmin):
         super().delete_queryset(request, queryset)
 
 
+class OutboxMessageAdmin(admin.ModelAdmin):
+    """
+    Админ-панель для модели OutboxMessage.
+
+    Только просмотр очереди уведомлений и повторная отправка недоставленных.
+    """
+    list_display = ('channel', 'recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'channel')
+    search_fields = ('recipient', 'subject')
+    date_hierarchy = 'created_at'
+    readonly_fields = (
+        'contact_request', 'channel', 'recipient', 'subject', 'body', 'status', 'attempts',
+        'next_attempt_at', 'last_error', 'created_at', 'sent_at'
+    )
+    fields = readonly_fields
+    actions = ['retry_delivery']
+
+    def retry_delivery(self, request, queryset):
+        """Возвращает выбранные неотправленные уведомления в очередь с новым счетчиком попыток."""
+        queryset.exclude(status=OutboxMessage.SENT).update(
+            status=OutboxMessage.PENDING, attempts=0, next_attempt_at=timezone.now()
+        )
+
+    retry_delivery.short_description = "Отправить повторно"
+
+    def has_add_permission(self, request):
+        """Запрещает добавление уведомлений в админке: они создаются вместе с заявкой."""
+        return False
+
+
 class SiteContactAdmin(admin.ModelAdmin):
     """
     Админ-панель для модели SiteContact.
@@ -246,6 +487,39 @@ class CustomAdminSite(admin.AdminSite):
     site_title = 'Админ-панель Виртуальной Галереи'  # Title страницы
     index_title = 'Добро пожаловать в панель управления'  # Заголовок главной страницы админки
 
+    def get_urls(self):
+        """Добавляет служебные страницы админки к стандартным маршрутам."""
+        urls = [
+            path('db-stats/', self.admin_view(self.db_stats_view), name='db_stats'),
+            path('card-stats/', self.admin_view(self.card_stats_view), name='card_stats'),
+            path('contact-stats/', self.admin_view(self.contact_stats_view), name='contact_stats'),
+            path('catalog-export/', self.admin_view(self.catalog_export_view), name='catalog_export'),
+            path('uploads/', self.admin_view(create_upload), name='chunked_upload_create'),
+            path('uploads/<uuid:pk>/', self.admin_view(upload_detail), name='chunked_upload_detail'),
+        ]
+        return urls + super().get_urls()
+
+    def db_stats_view(self, request):
+        """Возвращает в JSON статистику соединений с БД воркера, обработавшего запрос."""
+        return JsonResponse(connection_stats())
+
+    def card_stats_view(self, request):
+        """Возвращает в JSON попадания и промахи кэша карточек воркера, обработавшего запрос."""
+        return JsonResponse(card_stats())
+
+    def contact_stats_view(self, request):
+        """Возвращает в JSON счетчики отсеченных отправок формы обратной связи (общие, если кэш в Redis)."""
+        return JsonResponse(shed_stats())
+
+    def catalog_export_view(self, request):
+        """Отдает ZIP-архив каталога потоком (только суперпользователю: архив содержит все данные сайта)."""
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        response = StreamingHttpResponse(stream_catalog(), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{archive_filename()}"'
+        response['X-Accel-Buffering'] = 'no'  # Nginx передает архив сразу, не накапливая ответ
+        return response
+
 
 # Создаём экземпляр кастомного сайта
 custom_admin_site = CustomAdminSite(name='custom_admin')
@@ -255,4 +529,5 @@ custom_admin_site.register(Artist, ArtistAdmin)
 custom_admin_site.register(Painting, PaintingAdmin)
 custom_admin_site.register(BlogPost, BlogPostAdmin)
 custom_admin_site.register(ContactRequest, ContactRequestAdmin)
+custom_admin_site.register(OutboxMessage, OutboxMessageAdmin)
 custom_admin_site.register(SiteContact, SiteContactAdmin)
@@ -0,0 +1,346 @@
+"""
+JSON API только для чтения: картины, посты блога и информация о художнике.
+
+GET /api/paintings/?fields=slug,title,medium_image&featured=1&limit=20&cursor=...
+GET /api/paintings/<slug>/
+GET /api/posts/?fields=...&limit=...&cursor=...
+GET /api/artist/
+GET /api/suggest/?q=бер -- подсказки поиска по префиксу названия (см. core/autocomplete.py)
+
+- fields -- разреженный набор полей: в ответ попадают и из БД выбираются только перечисленные поля.
+- cursor -- курсорная пагинация по ключу сортировки (дата, id): страница не зависит от смещения,
+  поэтому добавление картины не сдвигает и не дублирует записи при подгрузке следующей страницы.
+- Объекты моделей не создаются: строки читаются через values() и сразу преобразуются в словари ответа.
+- ETag — хеш тела ответа: повторный запрос с If-None-Match получает 304 без тела.
+"""
+import base64
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views import View
+from .autocomplete import suggest
+from .models import Artist, BlogPost, BlogPostImage, Painting
+
+DEFAULT_LIMIT = 20  # Записей на странице по умолчанию
+MAX_LIMIT = 100  # Максимум записей на странице
+CACHE_MAX_AGE = 60  # Время кэширования ответа в браузере и прокси, сек
+
+
+class ApiError(Exception):
+    """
+    Ошибка запроса к API: возвращается клиенту с кодом 400 или 404.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def column(name, convert=None):
+    """
+    Описание поля ответа, которое берется из одного столбца (convert -- преобразование значения).
+    """
+    return (name,), lambda row: convert(row[name]) if convert and row[name] is not None else row[name]
+
+
+def image_column(model, name):
+    """
+    Описание поля-изображения: объект с url, width и height или null, если файла нет.
+    """
+    storage = model._meta.get_field(name).storage
+    columns = (name, f'{name}_width', f'{name}_height')
+
+    def value(row):
+        if not row[name]:
+            return None
+        return {'url': storage.url(row[name]), 'width': row[f'{name}_width'], 'height': row[f'{name}_height']}
+
+    return columns, value
+
+
+def isoformat(value):
+    """
+    Дата или дата-время в формате ISO 8601.
+    """
+    return value.isoformat()
+
+
+PAINTING_FIELDS = {
+    'slug': column('slug'),
+    'title': column('title'),
+    'description': column('description'),
+    'creation_date': column('creation_date', isoformat),
+    'price': column('price'),
+    'is_featured': column('is_featured'),
+    'url': (('slug',), lambda row: reverse('painting_detail', kwargs={'slug': row['slug']})),
+    'image': image_column(Painting, 'image'),
+    'small_image': image_column(Painting, 'small_image'),
+    'medium_image': image_column(Painting, 'medium_image'),
+    'large_image': image_column(Painting, 'large_image'),
+    'placeholder': column('placeholder'),
+    'dominant_color': column('dominant_color'),
+}
+
+POST_FIELDS = {
+    'slug': column('slug'),
+    'title': column('title'),
+    'content': column('content'),
+    'content_html': column('content_html'),
+    'excerpt': column('excerpt'),
+    'word_count': column('word_count'),
+    'reading_time': column('reading_time'),
+    'pub_date': column('pub_date', isoformat),
+    'cover_image': image_column(BlogPost, 'cover_image'),
+    'placeholder': column('placeholder'),
+    'dominant_color': column('dominant_color'),
+    'images': (('pk',), None),  # Заполняется отдельным запросом для всей страницы (PostListApi.attach)
+}
+
+ARTIST_FIELDS = {
+    'name': column('name'),
+    'bio': column('bio'),
+    'photo': image_column(Artist, 'photo'),
+    'placeholder': column('placeholder'),
+    'dominant_color': column('dominant_color'),
+}
+
+POST_IMAGE_FIELDS = {
+    'image': image_column(BlogPostImage, 'image'),
+    'placeholder': column('placeholder'),
+    'dominant_color': column('dominant_color'),
+}
+
+
+def columns_for(fields, names):
+    """
+    Возвращает столбцы, которые нужно выбрать из БД для полей names.
+    """
+    columns = []
+    for name in names:
+        for column_name in fields[name][0]:
+            if column_name not in columns:
+                columns.append(column_name)
+    return columns
+
+
+def serialize_row(row, fields, names):
+    """
+    Преобразует строку values() в словарь ответа.
+    """
+    return {name: fields[name][1](row) if fields[name][1] else None for name in names}
+
+
+def serialize(queryset, fields, names):
+    """
+    Выбирает из queryset только нужные столбцы и возвращает список словарей ответа.
+
+    Используется и API, и представлениями (данные для карусели на главной).
+    """
+    return [serialize_row(row, fields, names) for row in queryset.values(*columns_for(fields, names))]
+
+
+def encode_cursor(values):
+    """
+    Кодирует значения ключа сортировки в непрозрачную строку курсора.
+    """
+    data = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """
+    Декодирует курсор в значения ключа сортировки (в типах полей модели).
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError
+        model_fields = [model._meta.pk if name == 'pk' else model._meta.get_field(name) for name in ordering]
+        return [field.to_python(value) for field, value in zip(model_fields, values)]
+    except Exception:
+        raise ApiError('Некорректный курсор')
+
+
+def after_cursor(ordering, values):
+    """
+    Условие «после курсора» для сортировки по убыванию всех полей ordering.
+
+    Для ключа (дата, id): дата < d ИЛИ (дата = d И id < i).
+    """
+    condition = Q()
+    for index, name in enumerate(ordering):
+        step = Q(**{f'{name}__lt': values[index]})
+        for previous, value in zip(ordering[:index], values[:index]):
+            step &= Q(**{previous: value})
+        condition |= step
+    return condition
+
+
+class ApiView(View):
+    """
+    Базовое представление API: разбор параметра fields, ответ JSON с ETag и Cache-Control.
+    """
+    http_method_names = ['get', 'head', 'options']
+    fields = {}
+    replica_reads = True  # Чтение с реплики БД, если она настроена (см. core/db.py)
+
+    def get_names(self):
+        """
+        Возвращает запрошенные поля ответа (по умолчанию все поля ресурса).
+        """
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Неизвестные поля: {', '.join(unknown)}. Доступны: {', '.join(self.fields)}")
+        return names
+
+    def get(self, request, *args, **kwargs):
+        try:
+            data = self.get_data(**kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=error.status, json_dumps_params={'ensure_ascii': False})
+        return self.render(data)
+
+    def render(self, data):
+        """
+        Возвращает JSON-ответ или 304, если у клиента актуальная версия (совпадает ETag).
+        """
+        content = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        response = HttpResponse(content, content_type='application/json')
+        etag = '"%s"' % hashlib.md5(content).hexdigest()
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=CACHE_MAX_AGE)
+        return get_conditional_response(self.request, etag=etag, response=response) or response
+
+
+class ApiListView(ApiView):
+    """
+    Базовое представление списка с курсорной пагинацией.
+
+    ordering -- поля ключа сортировки (по убыванию), последнее поле должно быть уникальным (pk).
+    """
+    queryset = None
+    ordering = ()
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    def get_limit(self):
+        """
+        Возвращает размер страницы из параметра limit.
+        """
+        try:
+            limit = int(self.request.GET.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            raise ApiError('Параметр limit должен быть числом')
+        return max(1, min(limit, MAX_LIMIT))
+
+    def attach(self, results, rows, names):
+        """
+        Дополняет результаты данными из связанных таблиц (один запрос на страницу).
+        """
+
+    def get_data(self, **kwargs):
+        names = self.get_names()
+        limit = self.get_limit()
+        queryset = self.get_queryset().order_by(*(f'-{name}' for name in self.ordering))
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            queryset = queryset.filter(after_cursor(self.ordering, decode_cursor(cursor, queryset.model, self.ordering)))
+
+        columns = columns_for(self.fields, names) + [name for name in self.ordering]
+        rows = list(queryset.values(*dict.fromkeys(columns))[:limit + 1])
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        results = [serialize_row(row, self.fields, names) for row in rows]
+        self.attach(results, rows, names)
+
+        next_url = None
+        if has_next:
+            params = self.request.GET.copy()
+            params['cursor'] = encode_cursor([rows[-1][name] for name in self.ordering])
+            next_url = f'{self.request.path}?{params.urlencode()}'
+        return {'results': results, 'next': next_url}
+
+
+class PaintingListApi(ApiListView):
+    """
+    Список картин (новые сначала), параметр featured=1 оставляет только избранные.
+    """
+    queryset = Painting.objects.all()
+    fields = PAINTING_FIELDS
+    ordering = ('creation_date', 'pk')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.GET.get('featured') in ('1', 'true'):
+            queryset = queryset.filter(is_featured=True)
+        return queryset
+
+
+class PaintingDetailApi(ApiView):
+    """
+    Одна картина по slug.
+    """
+    fields = PAINTING_FIELDS
+
+    def get_data(self, slug):
+        names = self.get_names()
+        results = serialize(Painting.objects.filter(slug=slug), self.fields, names)
+        if not results:
+            raise ApiError('Картина не найдена', status=404)
+        return results[0]
+
+
+class PostListApi(ApiListView):
+    """
+    Список постов блога (новые сначала) с дополнительными изображениями.
+    """
+    queryset = BlogPost.objects.all()
+    fields = POST_FIELDS
+    ordering = ('pub_date', 'pk')
+
+    def attach(self, results, rows, names):
+        if 'images' not in names:
+            return
+        images = {row['pk']: [] for row in rows}
+        image_names = list(POST_IMAGE_FIELDS)
+        columns = ['post_id'] + columns_for(POST_IMAGE_FIELDS, image_names)
+        queryset = BlogPostImage.objects.filter(post_id__in=images).exclude(image='').order_by('pk')
+        for row in queryset.values(*columns):
+            images[row['post_id']].append(serialize_row(row, POST_IMAGE_FIELDS, image_names))
+        for result, row in zip(results, rows):
+            result['images'] = images[row['pk']]
+
+
+class ArtistApi(ApiView):
+    """
+    Информация о художнике (на сайте один художник).
+    """
+    fields = ARTIST_FIELDS
+
+    def get_data(self):
+        names = self.get_names()
+        results = serialize(Artist.objects.order_by('pk')[:1], self.fields, names)
+        if not results:
+            raise ApiError('Художник не найден', status=404)
+        return results[0]
+
+
+class SuggestApi(ApiView):
+    """
+    Подсказки поиска по префиксу названия картины или заголовка поста.
+
+    Ответ берется из индекса в памяти воркера: запросов к БД на каждое нажатие клавиши нет.
+    """
+
+    def get_data(self):
+        return {'results': suggest(self.request.GET.get('q', ''))}
@@ -13,3 +13,8 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals  # Подключаем сигналы
+        from django.conf import settings
+        from PIL import Image
+
+        # Pillow отказывается открывать изображения больше бюджета (в том числе в формах Django).
+        Image.MAX_IMAGE_PIXELS = settings.IMAGE_MAX_PIXELS
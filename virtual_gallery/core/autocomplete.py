@@ -0,0 +1,223 @@
+"""
+Префиксный индекс названий картин и заголовков постов для поиска по мере ввода.
+
+Индекс — отсортированный список ключей (слово или название целиком, в нижнем регистре, «ё» → «е»)
+и их транслитераций: «Берёзы у реки» ищется по «бер», «у ре», «berez», «reki». Поиск — bisect
+по списку, без запросов к БД. Индекс строится при первом запросе в каждом воркере (два запроса
+values()), сигналы сохранения и удаления обновляют его в текущем процессе и меняют версию в общем
+кэше (сразу и после коммита), по которой остальные воркеры перестраивают свой индекс при следующем запросе.
+"""
+import re
+import threading
+import uuid
+from bisect import bisect_left, insort
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.urls import reverse
+from unidecode import unidecode
+from .models import BlogPost, Painting
+
+VERSION_KEY = 'autocomplete:version'
+MIN_PREFIX_LENGTH = 2  # Короче — пустой ответ: такие префиксы совпадают почти со всем
+MAX_RESULTS = 10
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    """
+    Приводит текст к виду ключа: нижний регистр, «ё» → «е», одиночные пробелы между словами.
+    """
+    return ' '.join(WORD_RE.findall(text.lower().replace('ё', 'е')))
+
+
+def index_keys(title):
+    """
+    Возвращает ключи индекса для названия: название целиком и каждое слово, а также их транслитерацию.
+    """
+    keys = set()
+    for text in {normalize(title), normalize(unidecode(normalize(title)))}:
+        if text:
+            keys.add(text)
+            keys.update(text.split())
+    return keys
+
+
+def painting_entry(row):
+    """
+    Запись индекса для картины.
+    """
+    return {'kind': 'painting', 'title': row['title'], 'url': reverse('painting_detail', args=[row['slug']])}
+
+
+def post_entry(row):
+    """
+    Запись индекса для поста блога (ссылка на пост в ленте).
+    """
+    return {'kind': 'post', 'title': row['title'], 'url': f"{reverse('blog_list')}#post-{row['slug']}"}
+
+
+SOURCES = {'painting': (Painting, painting_entry), 'post': (BlogPost, post_entry)}
+
+
+class PrefixIndex:
+    """
+    Отсортированный список ключей (ключ, вид, id) с записями для выдачи.
+
+    Изменения выполняются под блокировкой, поиск — без нее: bisect и срез списка атомарны.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def add(self, kind, pk, entry):
+        """
+        Добавляет или заменяет запись объекта.
+        """
+        with self.lock:
+            self._remove((kind, pk))
+            self.entries[(kind, pk)] = entry
+            for key in index_keys(entry['title']):
+                insort(self.keys, (key, kind, pk))
+
+    def remove(self, kind, pk):
+        """
+        Удаляет запись объекта, если она есть.
+        """
+        with self.lock:
+            self._remove((kind, pk))
+
+    def _remove(self, ident):
+        """
+        Вспомогательный метод: удаляет ключи и запись объекта (вызывается под блокировкой).
+        """
+        entry = self.entries.pop(ident, None)
+        if entry is None:
+            return
+        for key in index_keys(entry['title']):
+            position = bisect_left(self.keys, (key, *ident))
+            if position < len(self.keys) and self.keys[position] == (key, *ident):
+                del self.keys[position]
+
+    def search(self, prefix, limit=MAX_RESULTS):
+        """
+        Возвращает записи, у которых название или одно из слов начинается с prefix.
+
+        Сначала идут записи, у которых с prefix начинается само название, затем по алфавиту.
+        """
+        prefix = normalize(prefix)
+        if len(prefix) < MIN_PREFIX_LENGTH:
+            return []
+        keys = self.keys
+        found = {}
+        position = bisect_left(keys, (prefix,))
+        while position < len(keys) and keys[position][0].startswith(prefix) and len(found) < limit * 5:
+            _, kind, pk = keys[position]
+            entry = self.entries.get((kind, pk))
+            if entry is not None:
+                found[(kind, pk)] = entry
+            position += 1
+        results = sorted(
+            found.values(),
+            key=lambda entry: (not normalize(entry['title']).startswith(prefix), entry['title'].lower())
+        )
+        return results[:limit]
+
+
+# Индекс процесса и версия, с которой он построен
+_index = None
+_version = None
+_build_lock = threading.Lock()
+
+
+def current_version():
+    """
+    Возвращает версию индекса из общего кэша (заводит ее, если кэш пуст).
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_index():
+    """
+    Возвращает индекс процесса, при необходимости перестраивая его.
+    """
+    global _index, _version
+    version = current_version()
+    if _index is not None and _version == version:
+        return _index
+    with _build_lock:
+        if _index is None or _version != version:
+            index = PrefixIndex()
+            for kind, (model, make_entry) in SOURCES.items():
+                # Из основной БД: с отстающей реплики старые названия закэшировались бы под новой версией
+                for row in model.objects.using(DEFAULT_DB_ALIAS).values('pk', 'title', 'slug'):
+                    index.add(kind, row['pk'], make_entry(row))
+            _index, _version = index, version
+    return _index
+
+
+def suggest(prefix, limit=MAX_RESULTS):
+    """
+    Возвращает подсказки для введенного префикса.
+    """
+    return get_index().search(prefix, limit)
+
+
+def bump_version():
+    """
+    Меняет версию индекса в общем кэше. Индекс текущего процесса остается актуальным,
+    если до смены он был построен с последней версией.
+    """
+    global _version
+    previous = cache.get(VERSION_KEY)
+    version = uuid.uuid4().hex
+    cache.set(VERSION_KEY, version, timeout=None)
+    up_to_date = _index is not None and _version == previous
+    if up_to_date:
+        _version = version
+    return up_to_date
+
+
+def bump_on_commit():
+    """
+    Меняет версию еще раз после фиксации транзакции.
+
+    Повторная смена нужна, если другой воркер успел перестроить индекс между изменением и коммитом
+    и сохранил старые названия под новой версией (как в singletons.invalidate_singleton).
+    """
+    with _build_lock:
+        bump_version()
+
+
+def invalidate_index():
+    """
+    Меняет версию сразу и после фиксации транзакции и сбрасывает индекс текущего процесса:
+    все воркеры перестроят индекс (массовые изменения, например восстановление каталога).
+    """
+    global _index
+    with _build_lock:
+        _index = None
+        bump_version()
+    transaction.on_commit(bump_on_commit)
+
+
+def update_index(instance, deleted=False):
+    """
+    Обновляет индекс текущего процесса после изменения объекта и меняет версию для остальных воркеров
+    сразу и еще раз после фиксации транзакции.
+    """
+    kind = next(kind for kind, (model, _) in SOURCES.items() if isinstance(instance, model))
+    with _build_lock:
+        if bump_version():
+            if deleted:
+                _index.remove(kind, instance.pk)
+            else:
+                row = {'pk': instance.pk, 'title': instance.title, 'slug': instance.slug}
+                _index.add(kind, instance.pk, SOURCES[kind][1](row))
+    transaction.on_commit(bump_on_commit)
@@ -0,0 +1,110 @@
+"""
+Кэш HTML-фрагментов карточек картин и постов для страниц-списков.
+
+Ключ карточки: cards:<имя>:<хеш шаблона>:<id>:<версия>, где версия — updated_at объекта.
+Сохранение объекта меняет версию, поэтому старая карточка больше не читается ни одним воркером
+(даже если у каждого свой локальный кэш), а место освобождается по таймауту CARD_CACHE_TIMEOUT.
+Хеш шаблона меняется при изменении разметки карточки, то есть после деплоя кэш не нужно очищать.
+
+Карточки страницы читаются одним cache.get_many, рендерятся только отсутствующие в кэше
+(для них же выполняется prefetch связанных объектов) и записываются одним cache.set_many.
+"""
+import hashlib
+import os
+import threading
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import get_template
+
+
+class CardCache:
+    """
+    Кэш карточек одного вида.
+
+    Аргументы:
+    name -- имя вида карточки (часть ключа и имя в статистике).
+    template_name -- шаблон карточки.
+    context_name -- имя переменной объекта в шаблоне карточки.
+    prefetch -- связи, которые подгружаются только для рендеринга отсутствующих в кэше карточек.
+    """
+
+    def __init__(self, name, template_name, context_name, prefetch=()):
+        self.name = name
+        self.template_name = template_name
+        self.context_name = context_name
+        self.prefetch = prefetch
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._template_digest = None
+
+    def template_digest(self):
+        """
+        Возвращает короткий хеш исходного кода шаблона (в DEBUG пересчитывается при каждом вызове).
+        """
+        if self._template_digest is None or settings.DEBUG:
+            source = get_template(self.template_name).template.source
+            self._template_digest = hashlib.md5(source.encode('utf-8')).hexdigest()[:8]
+        return self._template_digest
+
+    def key(self, obj, digest):
+        """
+        Возвращает ключ карточки объекта с учетом его версии.
+        """
+        version = int(obj.updated_at.timestamp() * 1_000_000)
+        return f'cards:{self.name}:{digest}:{obj.pk}:{version:x}'
+
+    def render_many(self, objects):
+        """
+        Возвращает HTML карточек объектов в том же порядке.
+        """
+        objects = list(objects)
+        if not objects:
+            return []
+        digest = self.template_digest()
+        keys = [self.key(obj, digest) for obj in objects]
+        fragments = cache.get_many(keys)
+        missing = [obj for obj, key in zip(objects, keys) if key not in fragments]
+
+        with self._lock:
+            self.hits += len(objects) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            if self.prefetch:
+                prefetch_related_objects(missing, *self.prefetch)
+            template = get_template(self.template_name)
+            rendered = {self.key(obj, digest): template.render({self.context_name: obj}) for obj in missing}
+            cache.set_many(rendered, settings.CARD_CACHE_TIMEOUT)
+            fragments.update(rendered)
+        return [fragments[key] for key in keys]
+
+    def stats(self):
+        """
+        Возвращает счетчики попаданий и промахов текущего процесса.
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+        }
+
+
+CARDS = {card.name: card for card in (
+    CardCache('painting', 'core/cards/painting.html', 'painting'),
+    CardCache('featured_painting', 'core/cards/featured_painting.html', 'painting'),
+    CardCache('post', 'core/cards/post.html', 'post', prefetch=('images',)),
+)}
+
+
+def card_stats():
+    """
+    Возвращает статистику кэша карточек процесса, обработавшего вызов (у каждого воркера Gunicorn своя).
+    """
+    return {
+        'pid': os.getpid(),
+        'backend': settings.CACHES['default']['BACKEND'],
+        'cards': {name: card.stats() for name, card in CARDS.items()},
+    }
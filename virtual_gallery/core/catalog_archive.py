@@ -0,0 +1,207 @@
+"""
+Резервная копия каталога одним ZIP-архивом: команды export_catalog / import_catalog и загрузка из админки.
+
+Архив содержит manifest.jsonl — записи художника, контактов сайта, картин, постов, изображений постов
+и перцептивных хешей (формат jsonl сериализаторов Django, одна запись в строке) — и файлы изображений
+в каталоге media/ с теми же путями, что в хранилище. Тайлы для увеличения в архив не входят:
+после восстановления они строятся командой build_tiles.
+
+Архив пишется zipfile в поток без перемотки (ZipStream): записи читаются из БД порциями, файлы —
+блоками по FILE_CHUNK_SIZE, и каждый записанный кусок сразу отдается дальше. Ни архив, ни отдельный
+файл целиком в памяти не держатся, а скачивание из админки начинается до чтения всего каталога.
+"""
+import io
+import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from django.core import serializers
+from django.core.files import File
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+from .autocomplete import invalidate_index
+from .facets import invalidate_facets
+from .models import Artist, BlogPost, BlogPostImage, ImageHash, Painting, SiteContact
+from .singletons import invalidate_singleton
+from .site_export import schedule_export
+
+logger = logging.getLogger(__name__)
+
+# Модели в порядке восстановления: изображения постов — после постов
+CATALOG_MODELS = (Artist, SiteContact, Painting, BlogPost, BlogPostImage, ImageHash)
+
+MANIFEST_NAME = 'manifest.jsonl'
+MEDIA_DIR = 'media/'
+CHUNK_SIZE = 500  # Записей в одной порции чтения из БД
+FILE_CHUNK_SIZE = 1024 * 1024  # Блок чтения файла изображения, байт
+IMPORT_WORKERS = 4  # Потоков записи файлов при восстановлении
+
+
+class ZipStream(io.RawIOBase):
+    """
+    Поток для zipfile.ZipFile, который накапливает записанные байты до вызова drain().
+
+    Перемотка не поддерживается, поэтому zipfile пишет размеры файлов после их содержимого
+    (data descriptor) и не возвращается к уже отданным байтам.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        """
+        Возвращает байты, записанные с прошлого вызова.
+        """
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def file_fields(model):
+    """
+    Поля модели с файлами (ImageField).
+    """
+    return [field for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+
+
+def catalog_files():
+    """
+    Возвращает файлы каталога {путь в хранилище: хранилище}.
+
+    Файлы, общие для нескольких записей (повторные загрузки, см. core/duplicates.py), входят один раз.
+    """
+    files = {}
+    for model in CATALOG_MODELS:
+        fields = file_fields(model)
+        if not fields:
+            continue
+        for names in model.objects.values_list(*(field.name for field in fields)).iterator(chunk_size=CHUNK_SIZE):
+            for field, name in zip(fields, names):
+                if name:
+                    files.setdefault(name, field.storage)
+    return dict(sorted(files.items()))
+
+
+def stream_catalog(chunk_size=CHUNK_SIZE):
+    """
+    Генератор байтов ZIP-архива каталога: манифест, затем файлы изображений.
+
+    Файлы, которых нет в хранилище, пропускаются с предупреждением в журнале.
+    """
+    stream = ZipStream()
+    date_time = timezone.localtime().timetuple()[:6]
+    with zipfile.ZipFile(stream, 'w') as archive:
+        manifest = zipfile.ZipInfo(MANIFEST_NAME, date_time)
+        manifest.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(manifest, 'w') as entry:
+            for model in CATALOG_MODELS:
+                objects = model.objects.order_by('pk').iterator(chunk_size=chunk_size)
+                while batch := list(islice(objects, chunk_size)):
+                    entry.write(serializers.serialize('jsonl', batch).encode('utf-8'))
+                    yield stream.drain()
+
+        for name, storage in catalog_files().items():
+            try:
+                size = storage.size(name)
+                source = storage.open(name, 'rb')
+            except OSError:
+                logger.warning('Файл %s не найден в хранилище и не добавлен в архив', name)
+                continue
+            # Изображения уже сжаты (WEBP, JPEG), поэтому хранятся без сжатия;
+            # по размеру zipfile решает, нужен ли формат ZIP64 (файлы больше 2 ГБ).
+            info = zipfile.ZipInfo(MEDIA_DIR + name, date_time)
+            info.file_size = size
+            with source, archive.open(info, 'w') as entry:
+                while chunk := source.read(FILE_CHUNK_SIZE):
+                    entry.write(chunk)
+                    yield stream.drain()
+    yield stream.drain()
+
+
+def archive_filename():
+    """
+    Имя файла архива с датой, например catalog-2025-12-31.zip.
+    """
+    return f'catalog-{timezone.localdate().isoformat()}.zip'
+
+
+def catalog_is_empty():
+    """
+    Проверяет, что в БД нет записей каталога (восстановление идет только в пустой каталог).
+    """
+    return not any(model.objects.exists() for model in CATALOG_MODELS)
+
+
+def restore_file(archive, name, storage):
+    """
+    Записывает файл name из архива в хранилище под тем же путем.
+    """
+    info = archive.getinfo(MEDIA_DIR + name)
+    with archive.open(info) as source:
+        if storage.exists(name):
+            storage.delete(name)  # Иначе хранилище сохранит файл под другим именем
+        content = File(source, name=name)
+        content.size = info.file_size
+        storage.save(name, content)
+
+
+def import_catalog(archive_file, workers=None):
+    """
+    Восстанавливает каталог из архива stream_catalog в пустую БД.
+
+    Файлы записываются параллельно в workers потоков (ZipFile разрешает одновременное чтение
+    нескольких файлов архива), затем записи сохраняются в одной транзакции с исходными id.
+    Записи с отсутствующими в архиве файлами восстанавливаются, недостающие файлы считаются.
+
+    Возвращает словарь {'objects': ..., 'files': ..., 'missing': ...}.
+    """
+    if not catalog_is_empty():
+        raise ValueError('Каталог не пуст: восстановление возможно только в пустую БД (см. clear_db)')
+
+    with zipfile.ZipFile(archive_file) as archive:
+        try:
+            with archive.open(MANIFEST_NAME) as manifest:
+                objects = list(serializers.deserialize('jsonl', io.TextIOWrapper(manifest, encoding='utf-8')))
+        except KeyError:
+            raise ValueError(f'В архиве нет {MANIFEST_NAME}')
+
+        files = {}
+        for deserialized in objects:
+            for field in file_fields(type(deserialized.object)):
+                name = getattr(deserialized.object, field.attname).name
+                if name:
+                    files.setdefault(name, field.storage)
+        members = set(archive.namelist())
+        present = [(name, storage) for name, storage in files.items() if MEDIA_DIR + name in members]
+
+        with ThreadPoolExecutor(max_workers=workers or IMPORT_WORKERS) as executor:
+            # list() дожидается всех потоков и передает дальше первую ошибку записи
+            list(executor.map(lambda item: restore_file(archive, *item), present))
+
+    with transaction.atomic():
+        for deserialized in objects:
+            if isinstance(deserialized.object, Painting):
+                deserialized.object.tiles_ready = False  # Тайлы в архив не входят
+            # Сохранение raw: даты изменения остаются из архива, обработчики сигналов пропускают записи
+            deserialized.save()
+        # Записи сохранены с явными id: счетчики id (PostgreSQL) сдвигаются за максимальный id
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), CATALOG_MODELS):
+                cursor.execute(sql)
+        # Кэши и экспортированные страницы обновляются один раз для всего каталога
+        for model in (Artist, SiteContact):
+            invalidate_singleton(model)
+        invalidate_facets()
+        invalidate_index()
+        schedule_export()
+
+    return {'objects': len(objects), 'files': len(present), 'missing': len(files) - len(present)}
@@ -0,0 +1,174 @@
+"""
+Поиск картин по цвету: /paintings/?color=#3a6ea5.
+
+У каждой картины хранится цветовая сигнатура (Painting.color_signature): доли пикселей среднего
+изображения в SIGNATURE_SIZE ячейках квантованного пространства Lab (см. images.color_signature).
+Запрошенный цвет превращается в вектор весов ячеек (гауссово ядро по расстоянию в Lab), и оценка
+всех картин — одно умножение матрицы сигнатур на этот вектор: доля картины, близкая к цвету.
+
+Матрица сигнатур хранится в файле COLOR_INDEX_PATH (.npy) и открывается через np.load(mmap_mode='r'):
+воркеры gunicorn не копируют ее в свою память, а читают общие страницы файла из кэша ОС.
+Файл пересобирается при первом запросе после изменения каталога: число картин с сигнатурой и
+последняя дата изменения из БД сравниваются с теми же значениями в самом файле. Новый файл пишется
+рядом и подменяется через os.replace, поэтому открытые воркерами отображения остаются корректными.
+"""
+import os
+import re
+import tempfile
+import threading
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+from .images import SIGNATURE_SIZE, lab_bin_centers, rgb_to_lab
+from .models import Painting
+
+COLOR_SIGMA = 20  # Ширина ядра в единицах Lab: насколько далекие оттенки еще считаются похожими
+MIN_SCORE = 0.05  # Картины, где близких к цвету пикселей меньше этой доли, в выдачу не попадают
+
+# Цвета для быстрого выбора в фильтре каталога: (значение, подпись)
+COLOR_PRESETS = (
+    ('#c0392b', 'Красный'),
+    ('#e67e22', 'Оранжевый'),
+    ('#f1c40f', 'Желтый'),
+    ('#4e8f3a', 'Зеленый'),
+    ('#3a6ea5', 'Синий'),
+    ('#7d5ba6', 'Фиолетовый'),
+    ('#8d6e4f', 'Коричневый'),
+    ('#f2efe6', 'Светлый'),
+    ('#2b2b2b', 'Темный'),
+)
+
+COLOR_RE = re.compile(r'^#?([0-9a-fA-F]{6})$')
+
+INDEX_DTYPE = np.dtype([
+    ('id', '<i8'),
+    ('updated', '<i8'),  # Дата изменения картины, микросекунды с начала эпохи
+    ('signature', '<f4', (SIGNATURE_SIZE,)),
+])
+
+BIN_CENTERS = lab_bin_centers()
+
+# Отображение файла в текущем процессе: ((st_ino, st_mtime_ns), массив)
+_index = None
+_lock = threading.Lock()
+
+
+def parse_color(value):
+    """
+    Возвращает цвет в виде '#rrggbb' (нижний регистр) или None, если значение некорректно.
+    """
+    match = COLOR_RE.match((value or '').strip())
+    return f'#{match.group(1).lower()}' if match else None
+
+
+def query_weights(color):
+    """
+    Веса ячеек сигнатуры для цвета '#rrggbb': 1 в ячейке цвета, убывают с расстоянием в Lab.
+    """
+    rgb = [int(color[position:position + 2], 16) for position in (1, 3, 5)]
+    distances = np.linalg.norm(BIN_CENTERS - rgb_to_lab(rgb), axis=1)
+    return np.exp(-(distances ** 2) / (2 * COLOR_SIGMA ** 2)).astype(np.float32)
+
+
+def microseconds(value):
+    """
+    Дата в микросекундах с начала эпохи (для сравнения с колонкой updated индекса).
+    """
+    return round(value.timestamp() * 1_000_000) if value else 0
+
+
+def catalog_stamp():
+    """
+    Возвращает (число картин с сигнатурой, последняя дата изменения) из БД одним запросом.
+    """
+    stamp = Painting.objects.filter(color_signature__isnull=False).aggregate(count=Count('pk'), updated=Max('updated_at'))
+    return stamp['count'], microseconds(stamp['updated'])
+
+
+def index_stamp(index):
+    """
+    Те же значения, что у catalog_stamp(), по содержимому файла индекса.
+    """
+    return len(index), int(index['updated'].max()) if len(index) else 0
+
+
+def build_index():
+    """
+    Записывает матрицу сигнатур всех картин в COLOR_INDEX_PATH и возвращает число картин.
+    """
+    rows = Painting.objects.filter(color_signature__isnull=False).values_list('pk', 'updated_at', 'color_signature')
+    index = np.zeros(len(rows), dtype=INDEX_DTYPE)
+    for position, (pk, updated_at, signature) in enumerate(rows):
+        index[position] = (pk, microseconds(updated_at), np.frombuffer(signature, dtype='<f4'))
+
+    path = os.fspath(settings.COLOR_INDEX_PATH)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.npy')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            np.save(file, index)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(index)
+
+
+def open_index():
+    """
+    Возвращает массив индекса, отображенный в память; отображение переоткрывается после замены файла.
+    """
+    global _index
+    path = os.fspath(settings.COLOR_INDEX_PATH)
+    stat = os.stat(path)
+    key = (stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        if _index is None or _index[0] != key:
+            _index = (key, np.load(path, mmap_mode='r'))
+        return _index[1]
+
+
+def get_index():
+    """
+    Возвращает актуальный индекс сигнатур, при необходимости пересобирая файл.
+    """
+    stamp = catalog_stamp()
+    try:
+        index = open_index()
+    except (FileNotFoundError, ValueError):
+        index = None
+    if index is None or index_stamp(index) != stamp:
+        build_index()
+        index = open_index()
+    return index
+
+
+def rank_paintings(color):
+    """
+    Возвращает id картин, похожих на цвет '#rrggbb', от наиболее похожей к наименее.
+    """
+    index = get_index()
+    if not len(index):
+        return []
+    scores = index['signature'] @ query_weights(color)
+    order = np.argsort(-scores, kind='stable')
+    return [int(pk) for pk in index['id'][order[scores[order] >= MIN_SCORE]]]
+
+
+def color_options(color, params):
+    """
+    Варианты цвета для фильтра каталога: подпись, значение, признак выбора и ссылка,
+    которая выбирает цвет или снимает выбор.
+    """
+    options = []
+    for value, label in COLOR_PRESETS:
+        query = params.copy()
+        query.pop('page', None)
+        selected = value == color
+        if selected:
+            query.pop('color', None)
+        else:
+            query['color'] = value
+        options.append({'value': value, 'label': label, 'selected': selected, 'query': query.urlencode()})
+    return options
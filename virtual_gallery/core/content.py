@@ -0,0 +1,130 @@
+"""
+Подготовка текста поста блога к выводу: HTML, отрывок, число слов и время чтения.
+
+Считается один раз при сохранении поста (BlogPost.save) и хранится в модели: лента блога, API
+и админка читают готовые поля и не обрабатывают полный текст поста на каждый запрос.
+
+Поддерживаемая разметка (подмножество Markdown):
+- абзацы разделяются пустой строкой, перевод строки внутри абзаца сохраняется (<br>);
+- заголовки «## Текст» и «### Текст»;
+- списки: строки, начинающиеся с «- » или «* »;
+- **жирный**, *курсив*, `код`, [текст](https://адрес);
+- адреса вида https://… и www.… становятся ссылками.
+
+Текст экранируется до разбора разметки: HTML из содержания поста выводится как текст.
+"""
+import math
+import re
+from html import unescape
+from django.utils.html import escape
+from django.utils.text import Truncator
+
+WORDS_PER_MINUTE = 180  # Средняя скорость чтения текста на русском языке
+EXCERPT_WORDS = 40
+
+BLOCK_SEPARATOR_RE = re.compile(r'\n\s*\n')
+HEADING_RE = re.compile(r'^(#{2,3})\s+(.+)$')
+LIST_ITEM_RE = re.compile(r'^[-*]\s+(.+)$')
+CODE_RE = re.compile(r'`([^`\n]+)`')
+LINK_RE = re.compile(r'\[([^\]\n]+)\]\((https?://[^\s)]+)\)')
+URL_RE = re.compile(r'(?<![\w/.@])((?:https?://|www\.)[^\s<]*[^\s<.,:;!?)\'"])')
+BOLD_RE = re.compile(r'\*\*(\S(?:.*?\S)?)\*\*')
+ITALIC_RE = re.compile(r'(?<![*\w])\*(\S(?:.*?\S)?)\*(?![*\w])')
+TOKEN_RE = re.compile(r'\x00(\d+)\x00')
+WORD_RE = re.compile(r'\w+')
+BLOCK_TAG_RE = re.compile(r'</?(?:p|h\d|ul|li|br)>')  # Границы блоков и строк: в тексте заменяются пробелом
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def link(url, text):
+    """
+    Ссылка на адрес url (адреса вида www.… дополняются схемой).
+    """
+    href = url if '://' in url else f'http://{url}'
+    return f'<a href="{href}">{text}</a>'
+
+
+def render_inline(text):
+    """
+    Экранирует строку и размечает в ней код, ссылки, жирный текст и курсив.
+
+    Код и готовые ссылки на время разбора заменяются метками, чтобы разметка внутри них не применялась.
+    """
+    tokens = []
+
+    def keep(html):
+        tokens.append(html)
+        return f'\x00{len(tokens) - 1}\x00'
+
+    text = escape(text)
+    text = CODE_RE.sub(lambda match: keep(f'<code>{match.group(1)}</code>'), text)
+    text = LINK_RE.sub(lambda match: keep(link(match.group(2), emphasize(match.group(1)))), text)
+    text = URL_RE.sub(lambda match: keep(link(match.group(1), match.group(1))), text)
+    text = emphasize(text)
+    return TOKEN_RE.sub(lambda match: tokens[int(match.group(1))], text)
+
+
+def emphasize(text):
+    """
+    Размечает **жирный** текст и *курсив* в уже экранированной строке.
+    """
+    text = BOLD_RE.sub(r'<strong>\1</strong>', text)
+    return ITALIC_RE.sub(r'<em>\1</em>', text)
+
+
+def render_block(block):
+    """
+    Преобразует блок текста (между пустыми строками) в заголовки, списки и абзацы.
+    """
+    html = []
+    paragraph, items = [], []
+
+    def flush():
+        if paragraph:
+            html.append('<p>' + '<br>'.join(render_inline(line) for line in paragraph) + '</p>')
+            paragraph.clear()
+        if items:
+            html.append('<ul>' + ''.join(f'<li>{render_inline(item)}</li>' for item in items) + '</ul>')
+            items.clear()
+
+    for line in block.split('\n'):
+        line = line.strip()
+        heading = HEADING_RE.match(line)
+        item = LIST_ITEM_RE.match(line)
+        if heading:
+            flush()
+            level = len(heading.group(1)) + 2  # Заголовок поста — h3, разделы внутри — h4 и h5
+            html.append(f'<h{level}>{render_inline(heading.group(2))}</h{level}>')
+        elif item:
+            if paragraph:
+                flush()
+            items.append(item.group(1))
+        elif line:
+            if items:
+                flush()
+            paragraph.append(line)
+    flush()
+    return ''.join(html)
+
+
+def render_content(text):
+    """
+    Возвращает HTML для текста поста.
+    """
+    text = text.replace('\r\n', '\n').replace('\r', '\n').strip()
+    return '\n'.join(filter(None, (render_block(block) for block in BLOCK_SEPARATOR_RE.split(text))))
+
+
+def render_post(text):
+    """
+    Возвращает значения полей поста, вычисляемых из текста: content_html, excerpt, word_count, reading_time.
+    """
+    content_html = render_content(text)
+    plain = ' '.join(unescape(TAG_RE.sub('', BLOCK_TAG_RE.sub(' ', content_html))).split())
+    word_count = len(WORD_RE.findall(plain))
+    return {
+        'content_html': content_html,
+        'excerpt': Truncator(plain).words(EXCERPT_WORDS, truncate='…'),
+        'word_count': word_count,
+        'reading_time': math.ceil(word_count / WORDS_PER_MINUTE),
+    }
@@ -0,0 +1,16 @@
+from django.utils.functional import SimpleLazyObject
+from .models import Artist, SiteContact
+from .singletons import get_singleton
+
+
+def singletons(request):
+    """
+    Добавляет в контекст всех шаблонов художника (artist) и контакты сайта (site_contact).
+
+    Объекты ленивые и берутся из кэша записей-одиночек: страница, которая их не использует,
+    не обращается ни к кэшу, ни к БД.
+    """
+    return {
+        'artist': SimpleLazyObject(lambda: get_singleton(Artist)),
+        'site_contact': SimpleLazyObject(lambda: get_singleton(SiteContact)),
+    }
@@ -0,0 +1,222 @@
+import re
+
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+TEMPLATE_TAG_RE = re.compile(r'\{[%{#].*?[%}#]\}', re.DOTALL)
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*"([^"]*)"')
+ID_ATTR_RE = re.compile(r'\bid\s*=\s*"([^"]*)"')
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)')
+ATTR_NAME_RE = re.compile(r'\s([a-zA-Z][\w-]*)(?=[\s=>/])')
+
+# Псевдоклассы взаимодействия не влияют на первую отрисовку.
+INTERACTIVE_PSEUDO_RE = re.compile(r':(hover|focus|focus-visible|focus-within|active|visited)\b')
+PSEUDO_RE = re.compile(r'::?[\w-]+(\([^)]*\))?')
+ATTR_SELECTOR_RE = re.compile(r'\[\s*([\w-]+)[^\]]*\]')
+ANIMATION_NAME_RE = re.compile(r'animation(?:-name)?\s*:\s*([^;}]+)')
+
+# Страницы, для которых собирается критический CSS: имя файла -> шаблон.
+PAGES = {
+    'home': 'core/home.html',
+    'painting_list': 'core/painting_list.html',
+    'painting_detail': 'core/painting_detail.html',
+    'blog_list': 'core/blog_list.html',
+    'contacts': 'core/contacts.html',
+}
+
+# Классы, которые main.js добавляет сразу после загрузки: без них первый экран «прыгает».
+RUNTIME_CLASSES = 'aos-animate scrolled navbar-hidden back-to-top show active'
+
+# Сколько секций контента считается первым экраном (герой + начало основного блока).
+ABOVE_THE_FOLD_SECTIONS = 2
+
+
+def collect_tokens(html):
+    """
+    Собирает из разметки шаблона используемые классы, id, теги и атрибуты.
+
+    Теги шаблонизатора ({% %}, {{ }}) удаляются, текст между ними остается:
+    так class="nav-link {% if ... %}active{% endif %}" дает классы nav-link и active.
+    """
+    html = TEMPLATE_TAG_RE.sub(' ', html)
+    tokens = {
+        'classes': set(),
+        'ids': set(),
+        'tags': {'html', 'body', 'head'},
+        'attrs': set(),
+    }
+    for value in CLASS_ATTR_RE.findall(html):
+        tokens['classes'].update(value.split())
+    for value in ID_ATTR_RE.findall(html):
+        tokens['ids'].update(value.split())
+    tokens['tags'].update(tag.lower() for tag in TAG_RE.findall(html))
+    tokens['attrs'].update(ATTR_NAME_RE.findall(html))
+    return tokens
+
+
+def above_the_fold(template_source, sections=ABOVE_THE_FOLD_SECTIONS):
+    """
+    Возвращает разметку блока content шаблона до начала секции с номером sections + 1.
+    """
+    start = template_source.find('{% block content %}')
+    content = template_source[start:] if start != -1 else template_source
+    position = -1
+    for _ in range(sections + 1):
+        position = content.find('<section', position + 1)
+        if position == -1:
+            return content
+    return content[:position]
+
+
+def split_top_level(text, separator=','):
+    """
+    Делит строку по разделителю, не заходя внутрь скобок (например, :is(a, b)).
+    """
+    parts, depth, current = [], 0, ''
+    for char in text:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if char == separator and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def parse_css(css):
+    """
+    Разбирает таблицу стилей в список блоков (prelude, body).
+
+    Для @media и @supports body — вложенный список блоков, для остальных — строка деклараций.
+    Однострочные at-правила (@import, @charset) пропускаются.
+    """
+    css = COMMENT_RE.sub('', css)
+    blocks, position = [], 0
+    while position < len(css):
+        brace = css.find('{', position)
+        if brace == -1:
+            break
+        prelude = css[position:brace].strip()
+        # Однострочные at-правила перед блоком (например, @import url(...);) отбрасываем.
+        if ';' in prelude and prelude.lstrip().startswith('@'):
+            prelude = prelude.rsplit(';', 1)[1].strip()
+
+        depth, end = 0, brace
+        while end < len(css):
+            if css[end] == '{':
+                depth += 1
+            elif css[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+        body = css[brace + 1:end].strip()
+
+        if prelude.startswith(('@media', '@supports')):
+            blocks.append((prelude, parse_css(body)))
+        else:
+            blocks.append((prelude, body))
+        position = end + 1
+    return blocks
+
+
+def selector_matches(selector, tokens):
+    """
+    Проверяет, может ли селектор сработать на разметке с данными токенами при первой отрисовке.
+    """
+    if INTERACTIVE_PSEUDO_RE.search(selector):
+        return False
+    for attr in ATTR_SELECTOR_RE.findall(selector):
+        if attr not in tokens['attrs']:
+            return False
+    selector = ATTR_SELECTOR_RE.sub('', selector)
+    selector = PSEUDO_RE.sub('', selector)
+
+    for name in re.findall(r'\.([\w-]+)', selector):
+        if name not in tokens['classes']:
+            return False
+    for name in re.findall(r'#([\w-]+)', selector):
+        if name not in tokens['ids']:
+            return False
+    for compound in re.split(r'[\s>+~]+', selector):
+        tag = re.match(r'[a-zA-Z][a-zA-Z0-9]*', compound)
+        if tag and tag.group(0).lower() not in tokens['tags']:
+            return False
+    return True
+
+
+def select_blocks(blocks, tokens):
+    """
+    Оставляет только правила, селекторы которых совпадают с токенами (рекурсивно для @media).
+    """
+    selected = []
+    for prelude, body in blocks:
+        if isinstance(body, list):
+            nested = select_blocks(body, tokens)
+            if nested:
+                selected.append((prelude, nested))
+        elif prelude.startswith('@font-face'):
+            selected.append((prelude, body))
+        elif prelude.startswith('@'):
+            continue  # @keyframes добавляются позже, только используемые
+        else:
+            selectors = [s for s in split_top_level(prelude) if selector_matches(s, tokens)]
+            if selectors:
+                selected.append((', '.join(selectors), body))
+    return selected
+
+
+def used_keyframes(blocks):
+    """
+    Возвращает имена анимаций, на которые ссылаются выбранные правила.
+    """
+    names = set()
+    for prelude, body in blocks:
+        if isinstance(body, list):
+            names |= used_keyframes(body)
+        else:
+            for value in ANIMATION_NAME_RE.findall(body):
+                names.update(re.findall(r'[A-Za-z_][\w-]*', value))
+    return names
+
+
+def keyframes_blocks(blocks, names):
+    """
+    Находит определения @keyframes с указанными именами (в том числе внутри @media).
+    """
+    found = []
+    for prelude, body in blocks:
+        if isinstance(body, list):
+            found.extend(keyframes_blocks(body, names))
+        elif prelude.startswith('@keyframes') and prelude.split()[-1] in names:
+            found.append((prelude, body))
+    return found
+
+
+def serialize(blocks):
+    """
+    Собирает блоки обратно в компактный CSS.
+    """
+    parts = []
+    for prelude, body in blocks:
+        if isinstance(body, list):
+            parts.append(f'{prelude}{{{serialize(body)}}}')
+        else:
+            parts.append(f'{prelude}{{{body}}}')
+    return ''.join(parts)
+
+
+def extract_critical_css(css, html):
+    """
+    Возвращает CSS, необходимый для первой отрисовки разметки html.
+
+    Аргументы:
+    css -- полная таблица стилей.
+    html -- разметка первого экрана (может содержать теги шаблонизатора).
+    """
+    blocks = parse_css(css)
+    selected = select_blocks(blocks, collect_tokens(html))
+    selected += keyframes_blocks(blocks, used_keyframes(selected))
+    return serialize(selected)
@@ -0,0 +1,157 @@
+"""
+Соединения с БД: статистика пула и маршрутизация чтения публичных страниц на реплики.
+
+Публичные представления (replica_reads = True) читают с реплик из REPLICA_DATABASES, все записи
+и остальные запросы (админка, форма обратной связи, команды) идут в default. Перед чтением
+с реплики проверяется ее отставание: если оно больше REPLICA_MAX_LAG секунд или реплика недоступна,
+запрос уходит в default. Результат проверки кэшируется в процессе на REPLICA_CHECK_INTERVAL секунд.
+
+После записи сотрудника (например, сохранения в админке) браузер получает cookie PIN_COOKIE
+на REPLICA_PIN_SECONDS секунд, и его запросы читают из default: свои изменения видны сразу,
+даже если реплика еще не получила их (см. core/middleware.py).
+"""
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'db_pin_primary'
+
+# Отставание реплики PostgreSQL в секундах: 0, если все полученные изменения применены
+# (иначе простой без записей выглядел бы как отставание)
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Чтение с реплик разрешено в текущем запросе (выставляется middleware для публичных представлений)
+_replica_reads = ContextVar('replica_reads', default=False)
+
+# Результаты проверки реплик процесса: {alias: (время проверки, пригодна ли реплика)}
+_health = {}
+_health_lock = threading.Lock()
+
+
+def connection_stats(alias='default'):
+    """
+    Возвращает статистику управления соединениями текущего процесса для подключения alias.
+
+    Режимы:
+    pool -- пул psycopg 3 (в 'pool' добавляются счетчики ConnectionPool.get_stats());
+    persistent -- постоянные соединения с CONN_MAX_AGE > 0;
+    per-request -- новое соединение на каждый запрос.
+
+    Статистика относится к процессу, который обработал вызов: у каждого воркера Gunicorn свой пул.
+    """
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    conn_max_age = settings_dict.get('CONN_MAX_AGE', 0)
+    stats = {
+        'alias': alias,
+        'pid': os.getpid(),
+        'vendor': connection.vendor,
+        'health_checks': settings_dict.get('CONN_HEALTH_CHECKS', False),
+        'conn_max_age': conn_max_age,
+        'connected': connection.connection is not None,
+        'mode': 'persistent' if conn_max_age else 'per-request',
+    }
+
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats['mode'] = 'pool'
+        stats['pool'] = {
+            'name': pool.name,
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            **pool.get_stats(),
+        }
+    return stats
+
+
+@contextmanager
+def replica_reads():
+    """
+    Разрешает чтение с реплик внутри блока with.
+    """
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_lag(alias):
+    """
+    Возвращает отставание реплики alias в секундах (для других СУБД, кроме PostgreSQL, — 0).
+
+    После ошибки соединение закрывается, следующая проверка откроет новое.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        connection.close()
+        raise
+
+
+def replica_available(alias):
+    """
+    Проверяет, можно ли читать с реплики alias: она отвечает и отстает не больше REPLICA_MAX_LAG.
+    """
+    now = time.monotonic()
+    with _health_lock:
+        checked = _health.get(alias)
+    if checked is not None and now - checked[0] < settings.REPLICA_CHECK_INTERVAL:
+        return checked[1]
+
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError as error:
+        logger.warning('Реплика %s недоступна, чтение идет из основной БД: %s', alias, error)
+        available = False
+    else:
+        available = lag <= settings.REPLICA_MAX_LAG
+        if not available:
+            logger.warning('Реплика %s отстает на %.1f с, чтение идет из основной БД', alias, lag)
+    with _health_lock:
+        _health[alias] = (now, available)
+    return available
+
+
+class ReplicaRouter:
+    """
+    Маршрутизатор БД: чтение публичных страниц с реплик, все остальное — в default.
+
+    Реплики выбираются случайно среди пригодных, чтобы нагрузка каталога распределялась между ними.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return DEFAULT_DB_ALIAS
+        replicas = [alias for alias in settings.REPLICA_DATABASES if replica_available(alias)]
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что в default
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики доступны только для чтения и получают схему из default
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,45 @@
+"""
+Поиск повторных загрузок изображений по перцептивному хешу (dHash, см. images.perceptual_hash).
+
+Для оригинала картины, обложки поста и изображения поста хранится 64-битный хеш (модель ImageHash).
+Похожими считаются изображения, хеши которых отличаются не больше чем на IMAGE_DUPLICATE_MAX_DISTANCE
+бит (расстояние Хэмминга).
+
+Поиск по индексу: хеш делится на HASH_BANDS частей по 16 бит, каждая хранится в отдельном столбце
+с индексом. Если хеши отличаются не больше чем на HASH_BANDS - 1 бит, то хотя бы одна часть
+совпадает полностью, поэтому кандидаты выбираются одним запросом по равенству частей,
+а точное расстояние считается только для них.
+
+В админке новая загрузка сравнивается с уже загруженными до создания версий (GuardedImageMixin.clean):
+- DUPLICATE_WARN -- найденные копии показываются ошибкой поля, изображение не обрабатывается;
+- DUPLICATE_UPLOAD -- изображение обрабатывается и сохраняется как новое;
+- DUPLICATE_REUSE -- запись получает файлы и метаданные найденной копии той же модели без обработки.
+"""
+HASH_BITS = 64
+HASH_BANDS = 4
+BAND_BITS = HASH_BITS // HASH_BANDS
+
+DUPLICATE_WARN = 'warn'
+DUPLICATE_UPLOAD = 'upload'
+DUPLICATE_REUSE = 'reuse'
+DUPLICATE_MODES = (
+    (DUPLICATE_WARN, 'Предупредить о похожих изображениях'),
+    (DUPLICATE_UPLOAD, 'Загрузить как новое изображение'),
+    (DUPLICATE_REUSE, 'Использовать файлы найденной копии'),
+)
+
+
+def hash_bands(image_hash):
+    """
+    Делит хеш (16 шестнадцатеричных символов) на HASH_BANDS целых чисел по BAND_BITS бит.
+    """
+    value = int(image_hash, 16)
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (BAND_BITS * (HASH_BANDS - 1 - index))) & mask for index in range(HASH_BANDS)]
+
+
+def hamming_distance(first, second):
+    """
+    Возвращает число различающихся бит двух хешей.
+    """
+    return (int(first, 16) ^ int(second, 16)).bit_count()
@@ -0,0 +1,164 @@
+"""
+Фасетный фильтр каталога картин: год, ценовой диапазон, наличие в продаже и избранное.
+
+Параметры запроса: ?year=2023&price=5000-10000&available=1&featured=1 (в каждой группе одно значение).
+
+Счетчики фасетов строятся из одной агрегирующей таблицы: число картин для каждого сочетания
+(год, ценовой диапазон, избранная). Таблица считается одним запросом GROUP BY, хранится в кэше
+до изменения любой картины (см. signals.py), и счетчики для любого набора выбранных фильтров
+вычисляются из нее в памяти: для каждой группы учитываются фильтры остальных групп.
+"""
+from datetime import MAXYEAR, MINYEAR
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Case, CharField, Count, Q, Value, When
+from django.db.models.functions import ExtractYear
+from .models import Painting
+
+FACETS_KEY = 'paintings:facets'
+
+# Ценовые диапазоны: (значение параметра, подпись, от, до); границы в рублях, «до» не включается
+PRICE_BANDS = (
+    ('0-5000', 'до 5 000 ₽', None, 5000),
+    ('5000-10000', '5 000 – 10 000 ₽', 5000, 10000),
+    ('10000-', 'от 10 000 ₽', 10000, None),
+)
+NOT_FOR_SALE = ''  # Ценовой диапазон картин без цены
+
+AVAILABILITY = (('1', 'В продаже'), ('0', 'Не продается'))
+
+
+def band_condition(low, high):
+    """
+    Условие на цену для ценового диапазона.
+    """
+    condition = Q(price__isnull=False)
+    if low is not None:
+        condition &= Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def parse_filters(params):
+    """
+    Возвращает выбранные фильтры из параметров запроса; некорректные значения игнорируются.
+    """
+    filters = {}
+    year = params.get('year', '')
+    if year.isascii() and year.isdigit() and MINYEAR <= int(year) <= MAXYEAR:  # Иначе дата вне диапазона: 500
+        filters['year'] = int(year)
+    if params.get('price') in {band[0] for band in PRICE_BANDS}:
+        filters['price'] = params['price']
+    if params.get('available') in ('0', '1'):
+        filters['available'] = params['available']
+    if params.get('featured') == '1':
+        filters['featured'] = '1'
+    return filters
+
+
+def filter_paintings(queryset, filters):
+    """
+    Применяет фильтры к queryset картин (условия по диапазонам, чтобы работали индексы).
+    """
+    if 'year' in filters:
+        queryset = queryset.filter(creation_date__year=filters['year'])
+    if 'price' in filters:
+        _, _, low, high = next(band for band in PRICE_BANDS if band[0] == filters['price'])
+        queryset = queryset.filter(band_condition(low, high))
+    if 'available' in filters:
+        queryset = queryset.filter(price__isnull=filters['available'] == '0')
+    if 'featured' in filters:
+        queryset = queryset.filter(is_featured=True)
+    return queryset
+
+
+def facet_table():
+    """
+    Возвращает список строк (год, ценовой диапазон, избранная, число картин) из кэша или БД.
+    """
+    table = cache.get(FACETS_KEY)
+    if table is None:
+        band = Case(
+            *(When(band_condition(low, high), then=Value(value)) for value, _, low, high in PRICE_BANDS),
+            default=Value(NOT_FOR_SALE),
+            output_field=CharField(),
+        )
+        # Таблица общая для всех воркеров, поэтому читается из основной БД, а не с отстающей реплики
+        rows = (
+            Painting.objects.using(DEFAULT_DB_ALIAS).annotate(year=ExtractYear('creation_date'), band=band)
+            .values('year', 'band', 'is_featured').annotate(count=Count('pk')).order_by()
+        )
+        table = [(row['year'], row['band'], row['is_featured'], row['count']) for row in rows]
+        cache.set(FACETS_KEY, table, settings.FACET_CACHE_TIMEOUT)
+    return table
+
+
+def invalidate_facets():
+    """
+    Удаляет счетчики фасетов из кэша сразу и еще раз после фиксации транзакции (вызывается при изменении картин).
+
+    Повторное удаление нужно, если другой запрос успел пересчитать таблицу между изменением и коммитом
+    и закэшировал старые счетчики на FACET_CACHE_TIMEOUT.
+    """
+    cache.delete(FACETS_KEY)
+    transaction.on_commit(lambda: cache.delete(FACETS_KEY))
+
+
+def row_matches(row, filters, skip):
+    """
+    Проверяет, подходит ли строка таблицы под все фильтры, кроме группы skip.
+    """
+    year, band, featured, _ = row
+    checks = {
+        'year': lambda value: year == value,
+        'price': lambda value: band == value,
+        'available': lambda value: (band != NOT_FOR_SALE) == (value == '1'),
+        'featured': lambda value: featured,
+    }
+    return all(checks[name](value) for name, value in filters.items() if name != skip)
+
+
+def build_facets(filters, params):
+    """
+    Возвращает группы фасетов для шаблона: подпись группы и варианты с числом картин,
+    признаком выбора и ссылкой, которая выбирает вариант или снимает выбор.
+    """
+    table = facet_table()
+
+    def counts(group, key):
+        result = {}
+        for row in table:
+            if row_matches(row, filters, group):
+                value = key(row)
+                result[value] = result.get(value, 0) + row[3]
+        return result
+
+    def option(group, value, label, count):
+        query = params.copy()
+        query.pop('page', None)
+        selected = str(filters.get(group, '')) == str(value)
+        if selected:
+            query.pop(group, None)
+        else:
+            query[group] = str(value)
+        return {'label': label, 'count': count, 'selected': selected, 'query': query.urlencode()}
+
+    years = counts('year', lambda row: row[0])
+    bands = counts('price', lambda row: row[1])
+    availability = counts('available', lambda row: '1' if row[1] != NOT_FOR_SALE else '0')
+    featured = counts('featured', lambda row: row[2])
+
+    return [
+        {'name': 'Год', 'options': [
+            option('year', year, year, count) for year, count in sorted(years.items(), reverse=True)
+        ]},
+        {'name': 'Цена', 'options': [
+            option('price', value, label, bands.get(value, 0)) for value, label, _, _ in PRICE_BANDS
+        ]},
+        {'name': 'Наличие', 'options': [
+            option('available', value, label, availability.get(value, 0)) for value, label in AVAILABILITY
+        ]},
+        {'name': 'Подборка', 'options': [option('featured', '1', 'Избранные', featured.get(True, 0))]},
+    ]
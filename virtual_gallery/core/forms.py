@@ -7,7 +7,13 @@ class ContactForm(forms.ModelForm):
     Форма для отправки заявки на обратную связь.
 
     Основана на модели ContactRequest, с кастомными виджетами для плейсхолдеров.
+    Поле website — ловушка для ботов: скрыто от посетителей, заполненное отсекается в ContactsView.
     """
+    website = forms.CharField(
+        required=False,
+        label='Сайт',
+        widget=forms.TextInput(attrs={'tabindex': '-1', 'autocomplete': 'off'})
+    )
 
     class Meta:
         model = ContactRequest
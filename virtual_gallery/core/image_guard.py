@@ -0,0 +1,168 @@
+"""
+Защита обработки изображений от «бомб декомпрессии» и слишком тяжелых файлов.
+
+1. До декодирования по заголовку проверяются формат, число пикселей и оценка памяти (check_image).
+   Нарушение бюджета — ValidationError, в админке она показывается у поля формы.
+2. Изображения больше IMAGE_SUBPROCESS_PIXELS декодируются в отдельном процессе с ограничением
+   памяти (RLIMIT_AS) и процессорного времени (RLIMIT_CPU), см. render_guarded. При превышении
+   лимита завершается только этот процесс, воркер Gunicorn продолжает работу.
+
+Небольшие изображения обрабатываются в текущем процессе: запуск отдельного процесса дороже их обработки.
+"""
+import multiprocessing
+import os
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from PIL import Image, UnidentifiedImageError
+from .images import hash_image, render_image
+
+try:
+    import resource
+except ImportError:  # Windows: лимиты процесса не поддерживаются, остается проверка по заголовку
+    resource = None
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'TIFF', 'WEBP'}  # Форматы, которые принимает сайт
+BYTES_PER_PIXEL = 4  # Pillow хранит RGB и RGBA по 4 байта на пиксель
+PEAK_COPIES = 3  # Одновременно в памяти: оригинал, его копия и промежуточная версия
+
+
+def check_image(file):
+    """
+    Проверяет изображение по заголовку, не декодируя пиксели.
+
+    Аргументы:
+    file -- путь к файлу или открытый файл (позиция чтения восстанавливается).
+
+    Возвращает кортеж (формат, ширина, высота) или выбрасывает ValidationError.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as opened:
+            return check_image(opened)
+
+    position = file.tell()
+    try:
+        # Image.close() не вызывается: для открытого файла он закрыл бы и сам файл.
+        image = Image.open(file)
+        image_format, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        raise ValidationError("Изображение слишком большое для обработки.", code='too_many_pixels')
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        raise ValidationError("Файл не является изображением или поврежден.", code='invalid_image')
+    finally:
+        file.seek(position)
+
+    if image_format not in ALLOWED_FORMATS:
+        raise ValidationError(
+            "Формат %(format)s не поддерживается. Загрузите JPEG, PNG, TIFF или WebP.",
+            code='invalid_format', params={'format': image_format}
+        )
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            "Изображение %(width)sx%(height)s больше допустимых %(limit)s Мп.",
+            code='too_many_pixels',
+            params={'width': width, 'height': height, 'limit': settings.IMAGE_MAX_PIXELS // 1_000_000}
+        )
+    if width * height * BYTES_PER_PIXEL * PEAK_COPIES > settings.IMAGE_MAX_MEMORY:
+        raise ValidationError(
+            "Для обработки изображения %(width)sx%(height)s не хватит памяти.",
+            code='too_much_memory', params={'width': width, 'height': height}
+        )
+    return image_format, width, height
+
+
+def limit_resources(memory, cpu_seconds):
+    """
+    Ограничивает память и процессорное время текущего процесса (инициализатор процесса обработки).
+
+    По мягкому лимиту CPU процесс получает SIGXCPU и завершается, жесткий лимит — запас на завершение.
+    """
+    if resource is None:
+        return
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 5))
+
+
+def local_path(image_field):
+    """
+    Возвращает путь к файлу поля на диске или None.
+
+    Путь есть у временного файла загрузки, у собранной загрузки по частям и у файлов локального хранилища:
+    процессу обработки передается путь, а не содержимое файла.
+    """
+    file = image_field.file
+    if hasattr(file, 'temporary_file_path'):
+        return file.temporary_file_path()
+    name = getattr(getattr(file, 'file', file), 'name', None)
+    if isinstance(name, str) and os.path.isabs(name) and os.path.isfile(name):
+        return name
+    return None
+
+
+@contextmanager
+def local_copy(image_field):
+    """
+    Возвращает путь к файлу поля на диске; файл из удаленного хранилища (S3) на время обработки
+    копируется блоками во временный файл, а не читается в память воркера целиком.
+    """
+    path = local_path(image_field)
+    if path is not None:
+        yield path
+        return
+    with tempfile.NamedTemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR) as copy:
+        for chunk in image_field.chunks():
+            copy.write(chunk)
+        copy.flush()
+        yield copy.name
+
+
+def run_guarded(image_field, function, *args):
+    """
+    Проверяет изображение поля и выполняет function(источник, *args) в пределах бюджета.
+
+    Аргументы:
+    image_field -- файл поля ImageField (сохраненный или только что загруженный).
+    function -- функция модуля images, которая открывает изображение (render_image, hash_image).
+
+    Возвращает результат function или выбрасывает ValidationError.
+    """
+    _, width, height = check_image(image_field)
+    try:
+        if width * height <= settings.IMAGE_SUBPROCESS_PIXELS:
+            return function(image_field, *args)
+
+        context = multiprocessing.get_context('spawn')  # Без копии памяти воркера и его потоков
+        with local_copy(image_field) as source, ProcessPoolExecutor(
+                max_workers=1, mp_context=context, initializer=limit_resources,
+                initargs=(settings.IMAGE_MAX_MEMORY, settings.IMAGE_DECODE_CPU_SECONDS)
+        ) as executor:
+            return executor.submit(function, source, *args).result()
+    except (BrokenProcessPool, MemoryError):
+        raise ValidationError(
+            "Обработка изображения превысила лимит памяти или времени.", code='resource_limit'
+        )
+    except (OSError, SyntaxError, ValueError):
+        raise ValidationError("Не удалось обработать изображение: файл поврежден.", code='invalid_image')
+
+
+def render_guarded(image_field, renditions):
+    """
+    Проверяет изображение поля и создает его версии в пределах бюджета.
+
+    Аргументы:
+    image_field -- файл поля ImageField (сохраненный или только что загруженный).
+    renditions -- словарь {имя версии: параметры encode_rendition}.
+
+    Возвращает результат images.render_image или выбрасывает ValidationError.
+    """
+    return run_guarded(image_field, render_image, renditions)
+
+
+def hash_guarded(image_field):
+    """
+    Проверяет изображение поля и считает его перцептивный хеш в пределах бюджета (до создания версий).
+    """
+    return run_guarded(image_field, hash_image)
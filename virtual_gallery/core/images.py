@@ -0,0 +1,323 @@
+"""
+Вспомогательные функции для обработки изображений: генерация версий в WEBP и метаданные
+(плейсхолдер (LQIP), доминирующий цвет, размеры, объем и MIME-тип файла, перцептивный хеш,
+цветовая сигнатура).
+
+Метаданные считаются один раз при генерации версий изображения и хранятся в модели, чтобы шаблоны
+могли встроить их прямо в HTML без дополнительных запросов и без чтения файлов.
+
+Модуль не зависит от Django: render_image выполняется и в отдельном процессе (см. image_guard.py).
+"""
+import base64
+import os
+from io import BytesIO
+import numpy as np
+from PIL import Image
+from PIL.Image import Resampling
+
+PLACEHOLDER_WIDTH = 16  # Ширина плейсхолдера в пикселях
+PLACEHOLDER_QUALITY = 40  # Качество WEBP плейсхолдера (после растяжения детали все равно не видны)
+COLOR_SAMPLE_SIZE = 64  # Сторона уменьшенной копии для подсчета цвета
+COLOR_LEVELS = 16  # Число уровней на канал при квантовании цвета
+HASH_SIZE = 8  # dHash: сетка HASH_SIZE x HASH_SIZE сравнений соседних пикселей, 64 бита
+LAB_BINS = (4, 6, 6)  # Цветовая сигнатура: число ячеек по L, a и b
+LAB_RANGES = ((0, 100), (-80, 80), (-80, 80))  # Значения вне диапазона попадают в крайние ячейки
+SIGNATURE_SIZE = LAB_BINS[0] * LAB_BINS[1] * LAB_BINS[2]
+
+# Перевод линейного sRGB в XYZ и белая точка D65
+SRGB_TO_XYZ = np.array([
+    [0.4124, 0.3576, 0.1805],
+    [0.2126, 0.7152, 0.0722],
+    [0.0193, 0.1192, 0.9505],
+], dtype=np.float32)
+WHITE_D65 = np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+
+
+def to_rgb_array(image, size):
+    """
+    Возвращает пиксели уменьшенной копии изображения как массив (N, 3) без прозрачных пикселей.
+    """
+    sample = image.copy()
+    sample.thumbnail((size, size), Resampling.BILINEAR)
+    rgba = np.asarray(sample.convert('RGBA'), dtype=np.uint8).reshape(-1, 4)
+    sample.close()
+    opaque = rgba[rgba[:, 3] >= 128]
+    return (opaque if len(opaque) else rgba)[:, :3]
+
+
+def dominant_color(image):
+    """
+    Определяет доминирующий цвет изображения в формате '#rrggbb'.
+
+    Пиксели квантуются до COLOR_LEVELS уровней на канал, выбирается самая частая ячейка,
+    и возвращается средний цвет ее пикселей (а не центр ячейки, чтобы оттенок был точным).
+    """
+    pixels = to_rgb_array(image, COLOR_SAMPLE_SIZE)
+    step = 256 // COLOR_LEVELS
+    quantized = pixels // step
+    bins = (quantized[:, 0].astype(np.int32) * COLOR_LEVELS + quantized[:, 1]) * COLOR_LEVELS + quantized[:, 2]
+    top = np.bincount(bins).argmax()
+    red, green, blue = pixels[bins == top].mean(axis=0).round().astype(int)
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def rgb_to_lab(rgb):
+    """
+    Переводит массив цветов sRGB (..., 3) со значениями 0–255 в CIE Lab (D65).
+    """
+    srgb = np.asarray(rgb, dtype=np.float32) / 255
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ SRGB_TO_XYZ.T / WHITE_D65
+    delta = 6 / 29
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def lab_bin_centers():
+    """
+    Возвращает центры ячеек цветовой сигнатуры в Lab: массив (SIGNATURE_SIZE, 3) в порядке ячеек.
+    """
+    axes = [low + (np.arange(count) + 0.5) * (high - low) / count for count, (low, high) in zip(LAB_BINS, LAB_RANGES)]
+    return np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3).astype(np.float32)
+
+
+def color_signature(image):
+    """
+    Считает цветовую сигнатуру изображения: доли пикселей в ячейках квантованного пространства Lab.
+
+    Возвращает массив float32 длины SIGNATURE_SIZE с суммой 1 (см. core/colors.py).
+    """
+    lab = rgb_to_lab(to_rgb_array(image, COLOR_SAMPLE_SIZE))
+    cells = []
+    for channel, (count, (low, high)) in enumerate(zip(LAB_BINS, LAB_RANGES)):
+        cells.append(np.clip(((lab[:, channel] - low) * count / (high - low)).astype(np.int32), 0, count - 1))
+    counts = np.bincount(np.ravel_multi_index(cells, LAB_BINS), minlength=SIGNATURE_SIZE)
+    return (counts / counts.sum()).astype(np.float32)
+
+
+def placeholder_data_uri(image):
+    """
+    Возвращает крошечную WEBP-копию изображения (PLACEHOLDER_WIDTH пикселей по ширине) как data URI.
+    """
+    width = min(PLACEHOLDER_WIDTH, image.width)
+    height = max(1, round(image.height * width / image.width))
+    thumb = image.convert('RGB').resize((width, height), Resampling.BOX)
+    buffer = BytesIO()
+    thumb.save(buffer, format='WEBP', quality=PLACEHOLDER_QUALITY)
+    thumb.close()
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def perceptual_hash(image):
+    """
+    Считает разностный перцептивный хеш (dHash) изображения: 16 шестнадцатеричных символов.
+
+    Изображение уменьшается до (HASH_SIZE + 1) x HASH_SIZE в оттенках серого, каждый бит — светлее ли
+    пиксель соседа справа. Пересжатие, смена формата и размера почти не меняют хеш, поэтому у повторной
+    загрузки того же скана он совпадает или отличается на несколько бит (см. core/duplicates.py).
+    """
+    if image.mode not in ('L', 'RGB', 'RGBA'):
+        image = image.convert('RGB')
+    small = image.resize((HASH_SIZE + 1, HASH_SIZE), Resampling.BOX).convert('L')
+    pixels = np.asarray(small, dtype=np.int16)
+    small.close()
+    return np.packbits(pixels[:, 1:] > pixels[:, :-1]).tobytes().hex()
+
+
+def hash_image(source):
+    """
+    Открывает изображение и считает его перцептивный хеш.
+
+    Аргументы:
+    source -- путь к файлу, байты файла или открытый файл (не закрывается, как в render_image).
+
+    JPEG декодируется сразу в уменьшенном виде (Image.draft): для хеша полное разрешение не нужно.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            return hash_image(file)
+    if isinstance(source, bytes):
+        return hash_image(BytesIO(source))
+
+    source.seek(0)
+    image = Image.open(source)
+    image.draft('RGB', (HASH_SIZE * 16, HASH_SIZE * 16))
+    image.load()
+    return perceptual_hash(image)
+
+
+def image_metadata(image):
+    """
+    Считает метаданные для хранения в модели.
+
+    Аргументы:
+    image -- объект изображения Pillow (уже обрезанный так же, как показывается на сайте).
+
+    Возвращает словарь с ключами placeholder и dominant_color.
+    """
+    return {
+        'placeholder': placeholder_data_uri(image),
+        'dominant_color': dominant_color(image),
+    }
+
+
+def rendition_info(image, data, mime='image/webp'):
+    """
+    Возвращает размеры, объем и MIME-тип закодированной версии изображения.
+
+    Аргументы:
+    image -- объект изображения Pillow, из которого получены данные.
+    data -- байты сохраненного файла.
+    mime -- MIME-тип файла (версии сохраняются в WEBP).
+    """
+    return {'width': image.width, 'height': image.height, 'bytes': len(data), 'mime': mime}
+
+
+def source_info(image, image_field):
+    """
+    Возвращает размеры, объем и MIME-тип исходного файла, уже открытого в Pillow.
+
+    Объем берется у загруженного файла (в памяти) или из storage, MIME-тип — по формату Pillow.
+    """
+    return {
+        'width': image.width,
+        'height': image.height,
+        'bytes': image_field.size,
+        'mime': Image.MIME.get(image.format, ''),
+    }
+
+
+def metadata_from_file(image_field):
+    """
+    Считает метаданные по уже сохраненному файлу (для заполнения существующих записей).
+    """
+    with image_field.open('rb') as file, Image.open(file) as image:
+        image.load()
+        return image_metadata(image)
+
+
+def hash_from_file(image_field):
+    """
+    Считает перцептивный хеш по уже сохраненному файлу (для заполнения существующих записей).
+    """
+    with image_field.open('rb') as file:
+        return hash_image(file)
+
+
+def signature_from_file(image_field):
+    """
+    Считает цветовую сигнатуру по уже сохраненному файлу (для заполнения существующих записей).
+    """
+    with image_field.open('rb') as file, Image.open(file) as image:
+        image.load()
+        return color_signature(image).tobytes()
+
+
+def info_from_file(image_field):
+    """
+    Читает заголовок сохраненного файла и возвращает его размеры, объем и MIME-тип.
+
+    Пиксели не декодируются: Pillow при открытии читает только заголовок.
+    """
+    with image_field.open('rb') as file, Image.open(file) as image:
+        return source_info(image, image_field)
+
+
+def crop_to_aspect(image, target_width, target_height):
+    """
+    Обрезает изображение до заданного соотношения сторон (target_width:target_height).
+
+    Аргументы:
+    image -- объект изображения Pillow.
+    target_width -- целевая ширина в пикселях.
+    target_height -- целевая высота в пикселях.
+
+    Возвращает обрезанное изображение.
+    """
+    target_ratio = target_width / target_height
+    current_width, current_height = image.size
+    current_ratio = current_width / current_height
+
+    if current_ratio > target_ratio:
+        # Обрезаем по ширине, если изображение шире целевого соотношения.
+        new_width = int(current_height * target_ratio)
+        left = (current_width - new_width) // 2
+        top = 0
+        right = left + new_width
+        bottom = current_height
+    else:
+        # Обрезаем по высоте, если изображение выше целевого соотношения.
+        new_height = int(current_width / target_ratio)
+        left = 0
+        top = (current_height - new_height) // 2
+        right = current_width
+        bottom = top + new_height
+
+    return image.crop((left, top, right, bottom))
+
+
+def encode_rendition(image, quality=85, crop=None, size=None, max_width=None, signature=False, **options):
+    """
+    Создает версию изображения и кодирует ее в WEBP.
+
+    Аргументы:
+    image -- объект изображения Pillow (оригинал не изменяется).
+    quality -- качество сохранения WEBP.
+    crop -- кортеж (width, height) соотношения сторон для обрезки (если None, не применяется).
+    size -- кортеж (width, height) для точного изменения размера (если None, не применяется).
+    max_width -- максимальная ширина с сохранением пропорций (если None, не применяется).
+    signature -- добавить в метаданные цветовую сигнатуру версии (color_signature, байты float32).
+    options -- остальные ключи описания версии (например, suffix имени файла) не используются.
+
+    Возвращает кортеж (байты WEBP, словарь метаданных версии: плейсхолдер, цвет, размеры, объем, MIME-тип).
+    """
+    rendition = crop_to_aspect(image, *crop) if crop else image.copy()
+    if size:
+        rendition = rendition.resize(size, Resampling.LANCZOS)
+    elif max_width and rendition.width > max_width:
+        new_height = int(rendition.height * max_width / rendition.width)
+        rendition = rendition.resize((max_width, new_height), Resampling.LANCZOS)
+
+    buffer = BytesIO()
+    rendition.save(buffer, format='WEBP', quality=quality)
+    data = buffer.getvalue()
+    info = {**image_metadata(rendition), **rendition_info(rendition, data)}
+    if signature:
+        info['color_signature'] = color_signature(rendition).tobytes()
+    rendition.close()
+    return data, info
+
+
+def render_image(source, renditions):
+    """
+    Открывает оригинал и создает его версии.
+
+    Аргументы:
+    source -- путь к файлу, байты файла или открытый файл.
+    renditions -- словарь {имя версии: параметры encode_rendition}.
+
+    Возвращает словарь: source -- размеры, MIME-тип, перцептивный хеш и метаданные оригинала,
+    renditions -- {имя версии: (байты WEBP, метаданные версии)}.
+
+    Открытый файл не закрывается (для PNG и TIFF Image.close() закрыл бы и его): он может быть еще
+    не сохраненной загрузкой, которую затем копирует хранилище.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            return render_image(file, renditions)
+    if isinstance(source, bytes):
+        return render_image(BytesIO(source), renditions)
+
+    source.seek(0)
+    image = Image.open(source)
+    image.load()
+    return {
+        'source': {
+            'width': image.width,
+            'height': image.height,
+            'mime': Image.MIME.get(image.format, ''),
+            'hash': perceptual_hash(image),
+            **image_metadata(image),
+        },
+        'renditions': {name: encode_rendition(image, **options) for name, options in renditions.items()},
+    }
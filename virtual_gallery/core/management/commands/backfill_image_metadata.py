@@ -0,0 +1,145 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+from core.images import hash_from_file, info_from_file, metadata_from_file, signature_from_file
+from core.models import Artist, Painting, BlogPost, BlogPostImage, ImageHash
+
+# Модель -> поле, по которому считаются плейсхолдер и цвет (то же изображение, что показывается на сайте),
+# и все поля изображений, для которых хранятся размеры, объем и MIME-тип.
+IMAGE_FIELDS = (
+    (Artist, 'photo', ('photo',)),
+    (Painting, 'image', ('image', 'small_image', 'medium_image', 'large_image')),
+    (BlogPost, 'cover_image', ('cover_image',)),
+    (BlogPostImage, 'image', ('image',)),
+)
+
+
+def has_file(field_name):
+    """
+    Возвращает условие «в поле field_name указан файл».
+    """
+    return Q(**{f'{field_name}__isnull': False}) & ~Q(**{field_name: ''})
+
+
+class Command(BaseCommand):
+    """
+    Команда для заполнения метаданных у уже загруженных изображений.
+
+    Заполняются плейсхолдер, доминирующий цвет, а также размеры, объем и MIME-тип оригинала
+    и каждой версии, перцептивные хеши для поиска повторных загрузок (см. core/duplicates.py)
+    и цветовые сигнатуры картин для поиска по цвету (см. core/colors.py). Новые изображения получают метаданные при сохранении модели; команда нужна
+    для записей, созданных до появления этих полей. Изображения не перегенерируются: обновляются
+    только поля метаданных через update(), без вызова save(). Для размеров читается только
+    заголовок файла.
+    """
+    help = 'Заполняет плейсхолдеры, цвет, размеры и объем для существующих изображений'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: --force для пересчета уже заполненных записей.
+        """
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересчитать метаданные и для записей, где они уже заполнены'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: обходит модели с изображениями и заполняет метаданные.
+        """
+        total = 0
+        for model, preview_field, info_fields in IMAGE_FIELDS:
+            updated = self._backfill_model(model, preview_field, info_fields, options['force'])
+            total += updated
+            self.stdout.write(f'{model._meta.verbose_name_plural}: обновлено {updated}')
+        for model, _, _ in IMAGE_FIELDS:
+            for field_name in model.image_hash_fields:
+                hashed = self._backfill_hashes(model, field_name, options['force'])
+                total += hashed
+                self.stdout.write(f'{model._meta.verbose_name_plural}: хешей изображений сохранено {hashed}')
+        signed = self._backfill_signatures(options['force'])
+        total += signed
+        self.stdout.write(f'{Painting._meta.verbose_name_plural}: цветовых сигнатур сохранено {signed}')
+        self.stdout.write(self.style.SUCCESS(f'Готово, всего обновлено записей: {total}'))
+
+    def _backfill_model(self, model, preview_field, info_fields, force):
+        """
+        Вспомогательный метод: считает недостающие метаданные для записей одной модели.
+        """
+        queryset = model.objects.filter(has_file(preview_field))
+        if not force:
+            missing = Q(placeholder='')
+            for field_name in info_fields:
+                missing |= has_file(field_name) & Q(**{f'{field_name}_width__isnull': True})
+            queryset = queryset.filter(missing)
+
+        updated = 0
+        for obj in queryset.iterator():
+            try:
+                values = self._collect(obj, preview_field, info_fields, force)
+            except (OSError, ValueError) as error:
+                self.stdout.write(self.style.WARNING(f'{model.__name__} #{obj.pk}: пропущен ({error})'))
+                continue
+            if values:
+                model.objects.filter(pk=obj.pk).update(**values)
+                updated += 1
+        return updated
+
+    def _collect(self, obj, preview_field, info_fields, force):
+        """
+        Вспомогательный метод: возвращает значения полей метаданных, которые нужно обновить.
+        """
+        values = {}
+        if force or not obj.placeholder:
+            values.update(metadata_from_file(getattr(obj, preview_field)))
+        for field_name in info_fields:
+            image_field = getattr(obj, field_name)
+            if not image_field or (not force and getattr(obj, f'{field_name}_width') is not None):
+                continue
+            info = info_from_file(image_field)
+            values.update({f'{field_name}_{key}': value for key, value in info.items()})
+        return values
+
+    def _backfill_hashes(self, model, field_name, force):
+        """
+        Вспомогательный метод: считает перцептивные хеши изображений поля, для которых их еще нет.
+        """
+        queryset = model.objects.filter(has_file(field_name))
+        if not force:
+            hashed = ImageHash.objects.filter(
+                model_label=model._meta.label_lower, field_name=field_name
+            ).values('object_id')
+            queryset = queryset.exclude(pk__in=hashed)
+
+        saved = 0
+        for obj in queryset.iterator():
+            try:
+                image_hash = hash_from_file(getattr(obj, field_name))
+            except (OSError, ValueError) as error:
+                self.stdout.write(self.style.WARNING(f'{model.__name__} #{obj.pk}: хеш не посчитан ({error})'))
+                continue
+            ImageHash.store(obj, field_name, image_hash)
+            saved += 1
+        return saved
+
+    def _backfill_signatures(self, force):
+        """
+        Вспомогательный метод: считает цветовые сигнатуры картин по среднему изображению.
+
+        Вместе с сигнатурой обновляется updated_at: по нему индекс поиска по цвету узнает об изменении.
+        """
+        queryset = Painting.objects.filter(has_file('medium_image'))
+        if not force:
+            queryset = queryset.filter(color_signature__isnull=True)
+
+        saved = 0
+        for painting in queryset.iterator():
+            try:
+                signature = signature_from_file(painting.medium_image)
+            except (OSError, ValueError) as error:
+                self.stdout.write(self.style.WARNING(f'Painting #{painting.pk}: сигнатура не посчитана ({error})'))
+                continue
+            Painting.objects.filter(pk=painting.pk).update(color_signature=signature, updated_at=timezone.now())
+            saved += 1
+        return saved
@@ -0,0 +1,97 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from core.db import connection_stats
+
+
+class Command(BaseCommand):
+    """
+    Команда для замера задержки получения соединения с БД на один запрос.
+
+    Сравнивает два сценария:
+    1. Новое соединение на каждый запрос (TCP + аутентификация, как без CONN_MAX_AGE и пула).
+    2. Текущая конфигурация (пул или постоянные соединения), с тем же жизненным циклом,
+       что у HTTP-запроса Django: close_old_connections() в начале и в конце.
+    В обоих сценариях выполняется один и тот же запрос SELECT 1.
+    """
+    help = 'Сравнивает задержку запроса к БД с новым соединением и с пулом/постоянным соединением'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: число итераций и имя подключения.
+        """
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Количество имитируемых запросов в каждом сценарии (по умолчанию 200)'
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Имя подключения из DATABASES (по умолчанию default)'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: прогоняет оба сценария и выводит сравнение.
+        """
+        alias = options['database']
+        iterations = options['iterations']
+        connection = connections[alias]
+
+        fresh = self._measure(iterations, lambda: self._fresh_connection_query(connection))
+        reused = self._measure(iterations, lambda: self._reused_connection_query(connection))
+
+        stats = connection_stats(alias)
+        self.stdout.write(f"Режим соединений: {stats['mode']} (health checks: {stats['health_checks']})")
+        self._report('Новое соединение на запрос', fresh)
+        self._report('Текущая конфигурация', reused)
+        saved = statistics.mean(fresh) - statistics.mean(reused)
+        self.stdout.write(self.style.SUCCESS(f'Экономия на запрос: {saved:.2f} мс (в среднем)'))
+
+    def _fresh_connection_query(self, connection):
+        """
+        Открывает отдельное соединение драйвером напрямую, выполняет запрос и закрывает его.
+        """
+        raw = connection.Database.connect(**connection.get_connection_params())
+        try:
+            cursor = raw.cursor()
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+            cursor.close()
+        finally:
+            raw.close()
+
+    def _reused_connection_query(self, connection):
+        """
+        Имитирует запрос Django: сигналы request_started/request_finished вызывают close_old_connections().
+        """
+        close_old_connections()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        close_old_connections()
+
+    def _measure(self, iterations, func):
+        """
+        Вспомогательный метод: выполняет func iterations раз (плюс прогрев) и возвращает времена в мс.
+        """
+        func()  # Прогрев: открытие пула, кеши драйвера
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def _report(self, title, timings):
+        """
+        Вспомогательный метод: печатает среднее, медиану и 95-й перцентиль.
+        """
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f'{title}: среднее {statistics.mean(timings):.2f} мс, '
+            f'медиана {statistics.median(timings):.2f} мс, p95 {p95:.2f} мс'
+        )
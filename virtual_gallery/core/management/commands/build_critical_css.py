@@ -0,0 +1,75 @@
+import os
+import re
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+from core.cards import CARDS
+from core.critical_css import PAGES, RUNTIME_CLASSES, above_the_fold, extract_critical_css
+from core.storage import cssmin
+
+# Тег {% cards <объекты> '<вид>' %}: разметка карточек лежит в отдельных шаблонах (core/cards.py)
+CARDS_TAG_RE = re.compile(r"""\{%\s*cards\s+\S+\s+['"](\w+)['"]\s*%\}""")
+
+
+class Command(BaseCommand):
+    """
+    Команда для сборки критического CSS каждой страницы.
+
+    Для каждого шаблона из PAGES берется разметка шапки base.html и первых секций контента,
+    из styles.css отбираются правила, которые к ней применимы, и результат сохраняется
+    в static/css/critical/<страница>.css. Тег {% critical_css %} встраивает этот файл в <head>,
+    а полный styles.css загружается асинхронно. Запускается перед collectstatic.
+    """
+    help = 'Извлекает критический CSS первого экрана для шаблонов страниц'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: исходную таблицу стилей и каталог для результата.
+        """
+        parser.add_argument(
+            '--stylesheet',
+            default='css/styles.css',
+            help='Путь к таблице стилей внутри static (по умолчанию css/styles.css)'
+        )
+        parser.add_argument(
+            '--output',
+            default=os.path.join(settings.STATICFILES_DIRS[0], 'css', 'critical'),
+            help='Каталог для файлов критического CSS (по умолчанию static/css/critical)'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: собирает критический CSS для всех страниц и выводит размеры.
+        """
+        stylesheet = finders.find(options['stylesheet'])
+        if stylesheet is None:
+            raise CommandError(f"Таблица стилей {options['stylesheet']} не найдена")
+        with open(stylesheet, encoding='utf-8') as file:
+            css = file.read()
+
+        header = self._template_source('base.html').split('{% block content %}')[0]
+        os.makedirs(options['output'], exist_ok=True)
+        full_size = len(css.encode('utf-8'))
+
+        for name, template_name in PAGES.items():
+            html = header + above_the_fold(self._template_source(template_name))
+            html += f'<div class="{RUNTIME_CLASSES}"></div>'
+            critical = extract_critical_css(css, html)
+            if cssmin is not None:
+                critical = cssmin(critical)
+
+            path = os.path.join(options['output'], f'{name}.css')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(critical)
+            size = len(critical.encode('utf-8'))
+            self.stdout.write(f'{name}: {size / 1024:.1f} КБ из {full_size / 1024:.1f} КБ')
+
+        self.stdout.write(self.style.SUCCESS(f"Критический CSS сохранен в {options['output']}"))
+
+    def _template_source(self, template_name):
+        """
+        Вспомогательный метод: возвращает исходный текст шаблона с подставленными шаблонами карточек.
+        """
+        source = get_template(template_name).template.source
+        return CARDS_TAG_RE.sub(lambda match: self._template_source(CARDS[match.group(1)].template_name), source)
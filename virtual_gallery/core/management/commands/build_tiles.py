@@ -0,0 +1,51 @@
+import time
+from django.core.management.base import BaseCommand
+from core.models import Painting
+from core.tiles import build_painting_tiles
+
+
+class Command(BaseCommand):
+    """
+    Команда для построения пирамид тайлов (Deep Zoom) картин.
+
+    Обычно тайлы строятся в фоне при сохранении картины. Команда нужна для картин, загруженных
+    до появления тайлов, и для повторной нарезки после изменения параметров (размер тайла, качество).
+    Выполняется синхронно, по одной картине.
+    """
+    help = 'Строит пирамиды тайлов для увеличения картин в лайтбоксе'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: slug картин и флаг --all для пересборки всех пирамид.
+        """
+        parser.add_argument(
+            'slugs',
+            nargs='*',
+            help='Slug картин (по умолчанию — все картины без готовых тайлов)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перестроить тайлы всех картин, включая уже готовые'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: строит тайлы для выбранных картин и выводит статистику.
+        """
+        queryset = Painting.objects.exclude(image='')
+        if options['slugs']:
+            queryset = queryset.filter(slug__in=options['slugs'])
+        elif not options['all']:
+            queryset = queryset.filter(tiles_ready=False)
+
+        built = 0
+        for painting in queryset.only('pk', 'slug').order_by('pk'):
+            start = time.perf_counter()
+            count = build_painting_tiles(painting.pk)
+            if count is None:
+                continue
+            built += 1
+            self.stdout.write(f'{painting.slug}: {count} тайлов за {time.perf_counter() - start:.1f} с')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово, обработано картин: {built}'))
@@ -0,0 +1,58 @@
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import ChunkedUpload
+
+
+class Command(BaseCommand):
+    """
+    Команда для удаления брошенных загрузок по частям.
+
+    Удаляет загрузки, которые не обновлялись дольше заданного срока, и временные файлы
+    в CHUNKED_UPLOAD_DIR, для которых нет записи в базе данных.
+    """
+    help = 'Удаляет незавершенные загрузки изображений по частям и их временные файлы'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: --hours для срока хранения загрузки.
+        """
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=24,
+            help='Удалять загрузки, не обновлявшиеся дольше указанного числа часов (по умолчанию 24)'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: удаляет устаревшие загрузки и осиротевшие временные файлы.
+        """
+        threshold = timezone.now() - timedelta(hours=options['hours'])
+        stale = ChunkedUpload.objects.filter(updated_at__lt=threshold)
+        deleted_uploads = 0
+        for upload in stale.iterator():
+            upload.delete()  # Временный файл удаляется сигналом pre_delete
+            deleted_uploads += 1
+
+        deleted_files = self._delete_orphan_files()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено загрузок: {deleted_uploads}, временных файлов без записи: {deleted_files}'
+        ))
+
+    def _delete_orphan_files(self):
+        """
+        Вспомогательный метод: удаляет файлы .part, для которых нет загрузки в базе данных.
+        """
+        directory = settings.CHUNKED_UPLOAD_DIR
+        if not os.path.isdir(directory):
+            return 0
+        known = {f'{pk}.part' for pk in ChunkedUpload.objects.values_list('pk', flat=True)}
+        deleted = 0
+        for name in os.listdir(directory):
+            if name.endswith('.part') and name not in known:
+                os.remove(os.path.join(directory, name))
+                deleted += 1
+        return deleted
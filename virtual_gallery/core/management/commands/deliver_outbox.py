@@ -0,0 +1,52 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    """
+    Команда для отправки уведомлений о заявках из исходящей очереди (см. core/outbox.py).
+
+    Без --loop отправляет все наступившие сообщения и завершается (для cron). С --loop работает
+    постоянно и проверяет очередь каждые --interval секунд (отдельный сервис в docker-compose).
+    """
+    help = 'Отправляет уведомления о заявках из исходящей очереди'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: --loop, --interval и --batch-size.
+        """
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, проверяя очередь через заданный интервал'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop, сек (по умолчанию 5)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help=f'Сообщений в одной выборке (по умолчанию {settings.OUTBOX_BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: отправляет наступившие сообщения один раз или в цикле.
+        """
+        while True:
+            stats = deliver_pending(options['batch_size'])
+            if any(stats.values()) or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Отправлено: {stats['sent']}, отложено: {stats['retried']}, не доставлено: {stats['failed']}"
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+            close_old_connections()  # Долгий процесс: устаревшее соединение с БД заменяется новым
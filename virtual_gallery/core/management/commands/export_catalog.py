@@ -0,0 +1,38 @@
+import os
+from django.core.management.base import BaseCommand
+from core.catalog_archive import CHUNK_SIZE, stream_catalog
+
+
+class Command(BaseCommand):
+    """
+    Команда для выгрузки каталога (записи и файлы изображений) в ZIP-архив.
+
+    Архив пишется в файл по мере чтения записей и файлов, не собираясь в памяти.
+    Восстанавливается командой import_catalog.
+    """
+    help = 'Выгружает каталог с изображениями в ZIP-архив для резервного копирования'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: путь к архиву и --chunk-size.
+        """
+        parser.add_argument(
+            'output',
+            help='Файл архива (например, catalog.zip)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help=f'Записей в одной порции чтения из БД (по умолчанию {CHUNK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: записывает архив и выводит его размер.
+        """
+        with open(options['output'], 'wb') as file:
+            for chunk in stream_catalog(options['chunk_size']):
+                file.write(chunk)
+        size = os.path.getsize(options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Каталог выгружен в {options['output']} ({size} байт)"))
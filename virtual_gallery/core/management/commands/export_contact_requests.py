@@ -0,0 +1,73 @@
+from argparse import ArgumentTypeError
+from datetime import date
+from django.core.management.base import BaseCommand
+from core.contact_export import CHUNK_SIZE, filter_by_dates, stream_csv
+from core.models import ContactRequest
+
+
+def parse_date(value):
+    """
+    Преобразует дату ГГГГ-ММ-ДД из аргумента команды.
+
+    ArgumentTypeError превращается argparse в сообщение об ошибке аргумента (CommandError
+    из type= он не перехватывает, и команда завершилась бы трассировкой).
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ArgumentTypeError(f'некорректная дата {value} (ожидается ГГГГ-ММ-ДД)')
+
+
+class Command(BaseCommand):
+    """
+    Команда для выгрузки заявок с формы обратной связи в CSV.
+
+    Заявки читаются из БД порциями и записываются по мере чтения: выгрузка за любой период
+    занимает постоянный объем памяти. Без --output CSV выводится в stdout.
+    """
+    help = 'Выгружает заявки на обратную связь в CSV за указанный период'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: --from, --to, --output и --chunk-size.
+        """
+        parser.add_argument(
+            '--from',
+            dest='date_from',
+            type=parse_date,
+            help='Начало периода, ГГГГ-ММ-ДД (включительно)'
+        )
+        parser.add_argument(
+            '--to',
+            dest='date_to',
+            type=parse_date,
+            help='Конец периода, ГГГГ-ММ-ДД (включительно)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для записи CSV (по умолчанию вывод в stdout)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help=f'Заявок в одной порции чтения из БД (по умолчанию {CHUNK_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: записывает заявки за период в файл или stdout.
+        """
+        queryset = filter_by_dates(ContactRequest.objects.all(), options['date_from'], options['date_to'])
+        lines = stream_csv(queryset, options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        written = -1  # Первая строка — заголовок
+        with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+            for line in lines:
+                file.write(line)
+                written += 1
+        self.stdout.write(self.style.SUCCESS(f"Выгружено заявок: {written} в {options['output']}"))
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.site_export import export_site
+
+
+class Command(BaseCommand):
+    """
+    Команда для экспорта публичных страниц в статические HTML-файлы.
+
+    Страницы рендерятся параллельно и записываются атомарно в каталог, который Nginx отдает
+    через try_files. Без аргументов экспортируются все страницы, неизмененные файлы не перезаписываются.
+    """
+    help = 'Экспортирует публичные страницы сайта в HTML-файлы для отдачи через Nginx'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: пути страниц, --output, --workers и --force.
+        """
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='Пути страниц для экспорта (например, /paintings/). По умолчанию — все страницы'
+        )
+        parser.add_argument(
+            '--output',
+            default=settings.SITE_EXPORT_DIR,
+            help='Каталог экспорта (по умолчанию SITE_EXPORT_DIR)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.SITE_EXPORT_WORKERS,
+            help='Число потоков рендеринга'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перезаписать все файлы, даже если содержимое не изменилось'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: экспортирует страницы и выводит статистику.
+        """
+        if not options['output']:
+            raise CommandError('Не задан каталог экспорта: укажите --output или SITE_EXPORT_DIR')
+
+        stats = export_site(
+            paths=options['paths'] or None,
+            root=options['output'],
+            workers=options['workers'],
+            force=options['force'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Экспорт в {options['output']}: записано {stats['written']}, без изменений {stats['unchanged']}, "
+            f"удалено {stats['removed']}"
+        ))
+        if stats['failed']:
+            self.stdout.write(self.style.WARNING(f"Не удалось экспортировать страниц: {stats['failed']}"))
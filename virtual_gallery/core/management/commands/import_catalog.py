@@ -0,0 +1,45 @@
+import zipfile
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from core.catalog_archive import IMPORT_WORKERS, import_catalog
+
+
+class Command(BaseCommand):
+    """
+    Команда для восстановления каталога из ZIP-архива export_catalog.
+
+    Восстанавливает записи с исходными id и файлы изображений (параллельно, в --workers потоков)
+    в пустую БД. Тайлы для увеличения после восстановления строятся командой build_tiles.
+    """
+    help = 'Восстанавливает каталог с изображениями из ZIP-архива'
+
+    def add_arguments(self, parser):
+        """
+        Добавляет аргументы команды: путь к архиву и --workers.
+        """
+        parser.add_argument(
+            'archive',
+            help='Файл архива, созданный export_catalog'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=IMPORT_WORKERS,
+            help=f'Число потоков записи файлов (по умолчанию {IMPORT_WORKERS})'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: восстанавливает каталог и выводит статистику.
+        """
+        try:
+            stats = import_catalog(options['archive'], workers=options['workers'])
+        except (OSError, zipfile.BadZipFile, DeserializationError, ValueError) as error:
+            raise CommandError(f'Не удалось восстановить каталог: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Восстановлено записей: {stats['objects']}, файлов: {stats['files']}"
+        ))
+        if stats['missing']:
+            self.stdout.write(self.style.WARNING(f"Файлов нет в архиве: {stats['missing']}"))
+        self.stdout.write('Тайлы для увеличения картин: python manage.py build_tiles')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.content import render_post
+from core.models import BlogPost
+
+
+class Command(BaseCommand):
+    """
+    Команда для повторного расчета HTML, отрывка, числа слов и времени чтения постов блога.
+
+    Поля заполняются при сохранении поста; команда нужна после изменения правил разметки
+    в core/content.py. Обновляются только изменившиеся записи — через update(), без вызова save(),
+    поэтому изображения постов не обрабатываются заново. Для измененных постов обновляется
+    updated_at, чтобы карточки в кэше фрагментов перерисовались.
+    """
+    help = 'Пересчитывает HTML, отрывок и время чтения постов блога'
+
+    def handle(self, *args, **options):
+        """
+        Основной метод команды: обходит посты и обновляет устаревшие вычисляемые поля.
+        """
+        fields = ('content_html', 'excerpt', 'word_count', 'reading_time')
+        updated = 0
+        for post in BlogPost.objects.only('pk', 'content', *fields).iterator():
+            values = render_post(post.content)
+            if any(getattr(post, name) != value for name, value in values.items()):
+                BlogPost.objects.filter(pk=post.pk).update(updated_at=timezone.now(), **values)
+                updated += 1
+        self.stdout.write(self.style.SUCCESS(f'Готово, обновлено постов: {updated}'))
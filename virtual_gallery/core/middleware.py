@@ -1,4 +1,7 @@
+from django.conf import settings
 from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from .db import PIN_COOKIE, replica_reads
 
 
 class IgnoreDevToolsRequestMiddleware:
@@ -16,3 +19,44 @@ class IgnoreDevToolsRequestMiddleware:
         if request.path == '/.well-known/appspecific/com.chrome.devtools.json':
             return HttpResponse(status=204)  # No Content, без содержимого
         return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Middleware для чтения публичных страниц с реплик БД (см. core/db.py).
+
+    GET- и HEAD-запросы к представлениям с атрибутом replica_reads = True читают с реплики,
+    если у браузера нет cookie PIN_COOKIE. Cookie выдается на REPLICA_PIN_SECONDS после успешного
+    изменяющего запроса сотрудника: сохранив картину в админке, он сразу видит ее на сайте.
+    Должен стоять после AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+
+        if self.reads_from_replica(request):
+            # Блок охватывает и отрисовку шаблона: ленивые queryset'ы выполняются в ней
+            with replica_reads():
+                return self.get_response(request)
+
+        response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400 and request.user.is_staff:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                                samesite='Lax', secure=request.is_secure())
+        return response
+
+    def reads_from_replica(self, request):
+        """
+        Проверяет, может ли запрос читать с реплики.
+        """
+        if request.method not in ('GET', 'HEAD') or PIN_COOKIE in request.COOKIES:
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return getattr(getattr(match.func, 'view_class', None), 'replica_reads', False)
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_artist_photo_alter_blogpost_cover_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='dominant_color',
+            field=models.CharField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', max_length=7, verbose_name='Доминирующий цвет'),
+        ),
+        migrations.AddField(
+            model_name='artist',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', verbose_name='Плейсхолдер изображения'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='dominant_color',
+            field=models.CharField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', max_length=7, verbose_name='Доминирующий цвет'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', verbose_name='Плейсхолдер изображения'),
+        ),
+        migrations.AddField(
+            model_name='blogpostimage',
+            name='dominant_color',
+            field=models.CharField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', max_length=7, verbose_name='Доминирующий цвет'),
+        ),
+        migrations.AddField(
+            model_name='blogpostimage',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', verbose_name='Плейсхолдер изображения'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='dominant_color',
+            field=models.CharField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', max_length=7, verbose_name='Доминирующий цвет'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False, help_text='Рассчитывается автоматически при обработке изображения.', verbose_name='Плейсхолдер изображения'),
+        ),
+    ]
@@ -0,0 +1,153 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_image_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artist',
+            name='photo_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт (фото)'),
+        ),
+        migrations.AddField(
+            model_name='artist',
+            name='photo_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (фото)'),
+        ),
+        migrations.AddField(
+            model_name='artist',
+            name='photo_mime',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип (фото)'),
+        ),
+        migrations.AddField(
+            model_name='artist',
+            name='photo_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (фото)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='cover_image_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='cover_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='cover_image_mime',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='cover_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='blogpostimage',
+            name='image_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт (изображение)'),
+        ),
+        migrations.AddField(
+            model_name='blogpostimage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (изображение)'),
+        ),
+        migrations.AddField(
+            model_name='blogpostimage',
+            name='image_mime',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип (изображение)'),
+        ),
+        migrations.AddField(
+            model_name='blogpostimage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (изображение)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='image_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт (оригинал)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (оригинал)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='image_mime',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип (оригинал)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (оригинал)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='large_image_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт (большое)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='large_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (большое)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='large_image_mime',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип (большое)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='large_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (большое)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='medium_image_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт (среднее)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='medium_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (среднее)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='medium_image_mime',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип (среднее)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='medium_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (среднее)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='small_image_bytes',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Размер файла, байт (малое)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='small_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (малое)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='small_image_mime',
+            field=models.CharField(blank=True, editable=False, max_length=50, verbose_name='MIME-тип (малое)'),
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='small_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (малое)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='painting',
+            name='tiles_ready',
+            field=models.BooleanField(default=False, editable=False, help_text='Пирамида тайлов строится в фоне после загрузки изображения.', verbose_name='Тайлы для увеличения готовы'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Версия карточки в кэше фрагментов; обновляется и при изменении изображений поста.', verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='painting',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Версия карточки в кэше фрагментов (см. core/cards.py).', verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='painting',
+            name='views',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Накапливаются в памяти воркеров и записываются пакетами (см. core/popularity.py).', verbose_name='Просмотры'),
+        ),
+    ]
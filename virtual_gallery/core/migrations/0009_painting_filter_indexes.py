@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_painting_views'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(fields=['-creation_date'], name='painting_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(fields=['price', '-creation_date'], name='painting_price_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='painting',
+            index=models.Index(fields=['is_featured', '-creation_date'], name='painting_featured_date_idx'),
+        ),
+    ]
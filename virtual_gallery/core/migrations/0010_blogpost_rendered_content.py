@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:17
+
+from django.db import migrations, models
+
+from core.content import render_post
+
+
+def render_existing_posts(apps, schema_editor):
+    """
+    Заполняет HTML, отрывок и время чтения для уже опубликованных постов.
+    """
+    BlogPost = apps.get_model('core', 'BlogPost')
+    for post in BlogPost.objects.only('pk', 'content').iterator():
+        BlogPost.objects.filter(pk=post.pk).update(**render_post(post.content))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_painting_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='Рассчитывается автоматически при сохранении поста (см. core/content.py).', verbose_name='Содержание (HTML)'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Начало текста поста без разметки.', verbose_name='Отрывок'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Время чтения, мин'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Число слов'),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='content',
+            field=models.TextField(help_text='Абзацы разделяются пустой строкой. Разметка: ## заголовок, - пункт списка, **жирный**, *курсив*, `код`, [текст](https://адрес); адреса становятся ссылками.', verbose_name='Содержание'),
+        ),
+        migrations.RunPython(render_existing_posts, migrations.RunPython.noop),
+    ]
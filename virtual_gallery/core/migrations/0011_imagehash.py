@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_blogpost_rendered_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='Метка модели записи, например core.painting.', max_length=100, verbose_name='Модель')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID записи')),
+                ('field_name', models.CharField(max_length=50, verbose_name='Поле изображения')),
+                ('hash', models.CharField(help_text='dHash оригинала: 64 бита в шестнадцатеричной записи.', max_length=16, verbose_name='Перцептивный хеш')),
+                ('band_0', models.PositiveIntegerField(db_index=True)),
+                ('band_1', models.PositiveIntegerField(db_index=True)),
+                ('band_2', models.PositiveIntegerField(db_index=True)),
+                ('band_3', models.PositiveIntegerField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Хеш изображения',
+                'verbose_name_plural': 'Хеши изображений',
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'object_id', 'field_name'), name='unique_image_hash')],
+            },
+        ),
+    ]
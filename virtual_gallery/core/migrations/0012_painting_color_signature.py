@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_imagehash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='painting',
+            name='color_signature',
+            field=models.BinaryField(help_text='Гистограмма цветов среднего изображения для поиска по цвету (см. core/colors.py).', null=True, verbose_name='Цветовая сигнатура'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contactrequest',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания'),
+        ),
+    ]
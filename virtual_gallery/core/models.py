@@ -1,87 +1,223 @@
+import uuid
+from functools import partial
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
-from PIL import Image
-from PIL.Image import Resampling
-from io import BytesIO
 from django.core.files.base import ContentFile
 import os
-from .storage import OverwriteStorage
+from .content import render_post
+from .duplicates import DUPLICATE_REUSE, DUPLICATE_UPLOAD, hamming_distance, hash_bands
+from .image_guard import hash_guarded, render_guarded
+from .storage import overwrite_storage, run_parallel
+from .tiles import delete_tiles, schedule_tiles, tiles_dir
 
 
-def crop_to_aspect(image, target_width, target_height):
+def set_image_metadata(instance, metadata=None):
     """
-    Обрезает изображение до заданного соотношения сторон (target_width:target_height).
+    Записывает в модель плейсхолдер и доминирующий цвет или очищает их, если изображения нет.
+    """
+    metadata = metadata or {'placeholder': '', 'dominant_color': ''}
+    instance.placeholder = metadata['placeholder']
+    instance.dominant_color = metadata['dominant_color']
 
-    Аргументы:
-    image -- объект изображения Pillow.
-    target_width -- целевая ширина в пикселях.
-    target_height -- целевая высота в пикселях.
 
-    Возвращает обрезанное изображение.
+def set_image_info(instance, field_name, info=None):
     """
-    target_ratio = target_width / target_height
-    current_width, current_height = image.size
-    current_ratio = current_width / current_height
-
-    if current_ratio > target_ratio:
-        # Обрезаем по ширине, если изображение шире целевого соотношения.
-        new_width = int(current_height * target_ratio)
-        left = (current_width - new_width) // 2
-        top = 0
-        right = left + new_width
-        bottom = current_height
-    else:
-        # Обрезаем по высоте, если изображение выше целевого соотношения.
-        new_height = int(current_width / target_ratio)
-        left = 0
-        top = (current_height - new_height) // 2
-        right = current_width
-        bottom = top + new_height
-
-    return image.crop((left, top, right, bottom))
-
-
-def process_image(image_field, max_width=None, quality=85, crop_ratio=None, resize_size=None):
+    Записывает размеры, объем и MIME-тип файла в поля <field_name>_width/_height/_bytes/_mime.
+
+    Без info поля очищаются (изображение удалено).
     """
-    Обрабатывает изображение: обрезает (если указано), изменяет размер и сохраняет в формате WEBP.
+    info = info or {}
+    setattr(instance, f'{field_name}_width', info.get('width'))
+    setattr(instance, f'{field_name}_height', info.get('height'))
+    setattr(instance, f'{field_name}_bytes', info.get('bytes'))
+    setattr(instance, f'{field_name}_mime', info.get('mime', ''))
 
-    Аргументы:
-    image_field -- поле модели с изображением.
-    max_width -- максимальная ширина (если None, не применяется).
-    quality -- качество сохранения WEBP (по умолчанию 85).
-    crop_ratio -- кортеж (width, height) для обрезки (если None, не применяется).
-    resize_size -- кортеж (width, height) для точного изменения размера (если None, не применяется).
 
-    Возвращает None, но обновляет image_field.
+def image_info_field(kind, label):
+    """
+    Поле с характеристикой файла изображения: kind -- 'width', 'height', 'bytes' или 'mime'.
+
+    Заполняется при обработке изображения, чтобы шаблоны и админка не открывали файлы ради заголовка.
     """
-    if not image_field:
-        return
-
-    img = Image.open(image_field)
-    try:
-        if crop_ratio:
-            # Обрезаем изображение до указанного соотношения.
-            img = crop_to_aspect(img.copy(), *crop_ratio)
-
-        if resize_size:
-            # Изменяем размер до точных значений.
-            img = img.resize(resize_size, Resampling.LANCZOS)
-        elif max_width and img.width > max_width:
-            # Изменяем размер, сохраняя пропорции, если ширина превышает максимум.
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((max_width, new_height), Resampling.LANCZOS)
-
-        # Сохраняем в WEBP и перезаписываем поле.
-        io_buffer = BytesIO()
-        img.save(io_buffer, format='WEBP', quality=quality)
-        name = os.path.splitext(os.path.basename(image_field.name))[0] + '.webp'
-        image_field.save(name, ContentFile(io_buffer.getvalue()), save=False)
-    finally:
-        img.close()  # Закрываем изображение для освобождения ресурсов.
-
-
-class Artist(models.Model):
+    verbose_name = {
+        'width': 'Ширина',
+        'height': 'Высота',
+        'bytes': 'Размер файла, байт',
+        'mime': 'MIME-тип',
+    }[kind]
+    if kind == 'mime':
+        return models.CharField(max_length=50, blank=True, editable=False, verbose_name=f"{verbose_name} ({label})")
+    return models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name=f"{verbose_name} ({label})")
+
+
+def placeholder_field():
+    """
+    Поле для крошечного WEBP-плейсхолдера в виде data URI (встраивается в HTML).
+    """
+    return models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Плейсхолдер изображения",
+        help_text="Рассчитывается автоматически при обработке изображения."
+    )
+
+
+def dominant_color_field():
+    """
+    Поле для доминирующего цвета изображения в формате #rrggbb.
+    """
+    return models.CharField(
+        max_length=7,
+        blank=True,
+        editable=False,
+        verbose_name="Доминирующий цвет",
+        help_text="Рассчитывается автоматически при обработке изображения."
+    )
+
+
+class GuardedImageMixin:
+    """
+    Обработка изображений модели через защищенный конвейер (см. core/image_guard.py).
+
+    image_renditions описывает версии для каждого поля-источника: {поле: {поле версии: параметры}}.
+    Параметры передаются в images.encode_rendition, suffix добавляется к имени файла версии.
+    Если версия записывается в само поле-источник, оригинал заменяется ею.
+
+    clean() заранее обрабатывает новые загрузки: превышение бюджета становится ошибкой поля формы,
+    а save() использует готовый результат. Без формы (команды управления) обработка идет в save().
+
+    Для полей из image_hash_fields хранится перцептивный хеш (ImageHash). Если форма задала
+    duplicate_mode, clean() до обработки ищет похожие изображения (см. core/duplicates.py).
+    Поля image_metadata_fields копируются вместе с файлами при повторном использовании версий.
+    """
+    image_renditions = {}
+    image_hash_fields = ()
+    image_metadata_fields = ('placeholder', 'dominant_color')
+    duplicate_mode = DUPLICATE_UPLOAD  # Без формы повторные загрузки не проверяются
+
+    def clean(self):
+        super().clean()
+        errors = {}
+        for field_name in self.image_renditions:
+            field_file = getattr(self, field_name)
+            if field_file and not field_file._committed:
+                try:
+                    if not self.check_duplicates(field_name):
+                        self.render_image_field(field_name)
+                except ValidationError as error:
+                    errors[field_name] = error.messages
+        if errors:
+            raise ValidationError(errors)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        pending = self.__dict__.pop('_image_hashes', {})
+        for field_name in self.image_hash_fields:
+            if not getattr(self, field_name):
+                ImageHash.objects.filter(
+                    model_label=self._meta.label_lower, object_id=self.pk, field_name=field_name
+                ).delete()
+            elif field_name in pending:
+                ImageHash.store(self, field_name, pending[field_name])
+        self.__dict__.pop('_reused_images', None)
+
+    def check_duplicates(self, field_name):
+        """
+        Ищет уже загруженные изображения, похожие на новую загрузку поля field_name.
+
+        В режиме DUPLICATE_WARN найденные копии становятся ошибкой поля. В режиме DUPLICATE_REUSE
+        запись получает файлы ближайшей копии той же модели и возвращается True: обработка не нужна.
+        """
+        if field_name not in self.image_hash_fields or self.duplicate_mode == DUPLICATE_UPLOAD:
+            return False
+        image_hash = hash_guarded(getattr(self, field_name))
+        self.__dict__.setdefault('_image_hashes', {})[field_name] = image_hash
+        matches = ImageHash.objects.similar(image_hash, exclude=self)
+        if not matches:
+            return False
+
+        if self.duplicate_mode == DUPLICATE_REUSE:
+            for match in matches:
+                if (match.model_label, match.field_name) == (self._meta.label_lower, field_name):
+                    source = match.owner()
+                    if source is not None:
+                        self.reuse_renditions(field_name, source)
+                        return True
+            return False
+        raise ValidationError(
+            ["Похожее изображение уже загружено. Выберите, как поступить с повторной загрузкой:"]
+            + [match.describe() for match in matches],
+            code='duplicate_image'
+        )
+
+    def reuse_renditions(self, field_name, source):
+        """
+        Берет у записи source файлы изображения field_name, его версий и их метаданные.
+
+        Файлы становятся общими для обеих записей (удаляются вместе с последней, см. delete_image_file).
+        """
+        for name in {field_name, *self.image_renditions[field_name]}:
+            setattr(self, name, getattr(source, name).name)
+            for key in ('width', 'height', 'bytes', 'mime'):
+                setattr(self, f'{name}_{key}', getattr(source, f'{name}_{key}'))
+        for name in self.image_metadata_fields:
+            setattr(self, name, getattr(source, name))
+        self.__dict__.setdefault('_reused_images', set()).add(field_name)
+
+    def is_reused(self, field_name):
+        """
+        Проверяет, взяты ли файлы поля field_name у найденной копии (обработка в save() не нужна).
+        """
+        return field_name in self.__dict__.get('_reused_images', ())
+
+    def delete_image_file(self, field_name):
+        """
+        Удаляет файл поля field_name, если на него не ссылаются другие записи модели.
+        """
+        field_file = getattr(self, field_name)
+        if field_file and not type(self).objects.filter(
+                **{field_name: field_file.name}
+        ).exclude(pk=self.pk).exists():
+            field_file.delete(save=False)
+
+    def render_image_field(self, field_name):
+        """
+        Возвращает результат обработки изображения поля field_name (images.render_image).
+
+        Результат запоминается для текущего файла поля, поэтому clean() и save() обрабатывают его один раз.
+        """
+        field_file = getattr(self, field_name)
+        rendered = self.__dict__.setdefault('_rendered_images', {})
+        if field_name in rendered and rendered[field_name][0] is field_file.file:
+            return rendered[field_name][1]
+        result = render_guarded(field_file, self.image_renditions[field_name])
+        rendered[field_name] = (field_file.file, result)
+        if field_name in self.image_hash_fields:
+            self.__dict__.setdefault('_image_hashes', {})[field_name] = result['source']['hash']
+        return result
+
+    def save_renditions(self, field_name):
+        """
+        Сохраняет версии изображения field_name в поля модели и возвращает результат обработки.
+
+        Версии записываются в хранилище параллельно (для S3 — одновременными запросами).
+        """
+        result = self.render_image_field(field_name)
+        base_name = os.path.splitext(os.path.basename(getattr(self, field_name).name))[0]
+        saves = []
+        for target, (data, info) in result['renditions'].items():
+            suffix = self.image_renditions[field_name][target].get('suffix', '')
+            field_file = getattr(self, target)
+            saves.append(partial(field_file.save, f'{base_name}{suffix}.webp', ContentFile(data), save=False))
+        run_parallel(saves)
+        return result
+
+
+class Artist(GuardedImageMixin, models.Model):
     name = models.CharField(
         max_length=200,
         verbose_name="Имя художника"
@@ -91,13 +227,22 @@ class Artist(models.Model):
         verbose_name="Краткая биография"
     )
     photo = models.ImageField(
-        storage=OverwriteStorage(),
+        storage=overwrite_storage,
         upload_to='artist/',
         null=True,
         blank=True,
         verbose_name="Фото художника",
         help_text="Загрузите фотографию художника (будет обработана автоматически)."
     )
+    photo_width = image_info_field('width', 'фото')
+    photo_height = image_info_field('height', 'фото')
+    photo_bytes = image_info_field('bytes', 'фото')
+    photo_mime = image_info_field('mime', 'фото')
+    placeholder = placeholder_field()
+    dominant_color = dominant_color_field()
+
+    # Ресайз до 800 пикселей ширины, качество 90.
+    image_renditions = {'photo': {'photo': {'max_width': 800, 'quality': 90}}}
 
     class Meta:
         verbose_name = "Художник"
@@ -113,14 +258,19 @@ class Artist(models.Model):
             if old_self.photo and old_self.photo != self.photo:
                 old_self.photo.delete(save=False)
 
-        # Обрабатываем фото (только при создании или изменении поля): ресайз до 800 пикселей ширины, качество 90.
+        # Обрабатываем фото (только при создании или изменении поля).
         if self.photo and (not self.pk or old_self.photo != self.photo):
-            process_image(self.photo, max_width=800, quality=90)
+            _, info = self.save_renditions('photo')['renditions']['photo']
+            set_image_metadata(self, info)
+            set_image_info(self, 'photo', info)
+        elif not self.photo:
+            set_image_metadata(self)
+            set_image_info(self, 'photo')
 
         super().save(*args, **kwargs)
 
 
-class Painting(models.Model):
+class Painting(GuardedImageMixin, models.Model):
     title = models.CharField(
         max_length=200,
         verbose_name="Название картины"
@@ -174,33 +324,106 @@ class Painting(models.Model):
         verbose_name="Большое изображение",
         help_text="Автоматически генерируется для детальной страницы."
     )
+    image_width = image_info_field('width', 'оригинал')
+    image_height = image_info_field('height', 'оригинал')
+    image_bytes = image_info_field('bytes', 'оригинал')
+    image_mime = image_info_field('mime', 'оригинал')
+    small_image_width = image_info_field('width', 'малое')
+    small_image_height = image_info_field('height', 'малое')
+    small_image_bytes = image_info_field('bytes', 'малое')
+    small_image_mime = image_info_field('mime', 'малое')
+    medium_image_width = image_info_field('width', 'среднее')
+    medium_image_height = image_info_field('height', 'среднее')
+    medium_image_bytes = image_info_field('bytes', 'среднее')
+    medium_image_mime = image_info_field('mime', 'среднее')
+    large_image_width = image_info_field('width', 'большое')
+    large_image_height = image_info_field('height', 'большое')
+    large_image_bytes = image_info_field('bytes', 'большое')
+    large_image_mime = image_info_field('mime', 'большое')
+    placeholder = placeholder_field()
+    dominant_color = dominant_color_field()
+    tiles_ready = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Тайлы для увеличения готовы",
+        help_text="Пирамида тайлов строится в фоне после загрузки изображения."
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения",
+        help_text="Версия карточки в кэше фрагментов (см. core/cards.py)."
+    )
+    views = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        verbose_name="Просмотры",
+        help_text="Накапливаются в памяти воркеров и записываются пакетами (см. core/popularity.py)."
+    )
+    color_signature = models.BinaryField(
+        null=True,
+        editable=False,
+        verbose_name="Цветовая сигнатура",
+        help_text="Гистограмма цветов среднего изображения для поиска по цвету (см. core/colors.py)."
+    )
+
+    image_renditions = {'image': {
+        # Small: обрезка 4:3, ресайз 400x300, качество 80.
+        'small_image': {'crop': (400, 300), 'size': (400, 300), 'quality': 80, 'suffix': '_small'},
+        # Medium: обрезка 4:3, ресайз 800x600, качество 85.
+        # Сигнатура для поиска по цвету — по среднему изображению, которое видно в каталоге.
+        'medium_image': {'crop': (800, 600), 'size': (800, 600), 'quality': 85, 'suffix': '_medium',
+                         'signature': True},
+        # Large: без обрезки, ресайз до 1920 ширины, качество 90.
+        'large_image': {'max_width': 1920, 'quality': 90, 'suffix': '_large'},
+    }}
+    image_hash_fields = ('image',)
+    image_metadata_fields = ('placeholder', 'dominant_color', 'color_signature')
 
     class Meta:
         verbose_name = "Картина"
         verbose_name_plural = "Картины"
+        # Индексы для фильтров каталога (core/facets.py): год — диапазон дат, цена — диапазон и IS NULL
+        indexes = [
+            models.Index(fields=['-creation_date'], name='painting_date_idx'),
+            models.Index(fields=['price', '-creation_date'], name='painting_price_date_idx'),
+            models.Index(fields=['is_featured', '-creation_date'], name='painting_featured_date_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def tiles_url(self):
+        """
+        URL каталога уровней пирамиды тайлов (используется просмотрщиком deepzoom.js).
+        """
+        return self.image.storage.url(f'{tiles_dir(self.pk)}/image_files/')
+
     def save(self, *args, **kwargs):
+        image_changed = True
         if self.pk:
             # При обновлении: если оригинальное изображение изменилось, удаляем старые версии.
             old_self = Painting.objects.get(pk=self.pk)
-            if old_self.image and old_self.image != self.image:
-                if old_self.small_image:
-                    old_self.small_image.delete(save=False)
-                if old_self.medium_image:
-                    old_self.medium_image.delete(save=False)
-                if old_self.large_image:
-                    old_self.large_image.delete(save=False)
-                if old_self.image:
-                    old_self.image.delete(save=False)
+            image_changed = old_self.image.name != self.image.name
+            if old_self.image and image_changed:
+                # Файлы могут быть общими с повторной загрузкой того же изображения (см. core/duplicates.py).
+                old_self.delete_image_file('small_image')
+                old_self.delete_image_file('medium_image')
+                old_self.delete_image_file('large_image')
+                old_self.delete_image_file('image')
+                delete_tiles(old_self.image.storage, self.pk)
+                self.tiles_ready = False
 
                 # Если новый image пустой, очищаем генерируемые поля в БД
                 if not self.image:
                     self.small_image = None
                     self.medium_image = None
                     self.large_image = None
+                    set_image_metadata(self)
+                    self.color_signature = None
+                    for field_name in ('image', 'small_image', 'medium_image', 'large_image'):
+                        set_image_info(self, field_name)
 
         if not self.slug:
             # Генерируем уникальный slug на основе названия.
@@ -211,57 +434,63 @@ class Painting(models.Model):
                 self.slug = f"{original_slug}-{counter}"
                 counter += 1
 
-        if self.image and (
-                not self.small_image or not self.medium_image or not self.large_image or self.image != getattr(self,
-                                                                                                               '_original_image',
-                                                                                                               None)
-        ):
-            img = Image.open(self.image)
-            try:
-                # Small: обрезка 4:3, ресайз 400x300, качество 80.
-                small_img = crop_to_aspect(img.copy(), 400, 300)
-                small_img = small_img.resize((400, 300), Resampling.LANCZOS)
-                small_io = BytesIO()
-                small_img.save(small_io, format='WEBP', quality=80)
-                small_name = os.path.splitext(os.path.basename(self.image.name))[0] + '_small.webp'
-                self.small_image.save(small_name, ContentFile(small_io.getvalue()), save=False)
-                small_img.close()
-
-                # Medium: обрезка 4:3, ресайз 800x600, качество 85.
-                medium_img = crop_to_aspect(img.copy(), 800, 600)
-                medium_img = medium_img.resize((800, 600), Resampling.LANCZOS)
-                medium_io = BytesIO()
-                medium_img.save(medium_io, format='WEBP', quality=85)
-                medium_name = os.path.splitext(os.path.basename(self.image.name))[0] + '_medium.webp'
-                self.medium_image.save(medium_name, ContentFile(medium_io.getvalue()), save=False)
-                medium_img.close()
-
-                # Large: без обрезки, ресайз до 1920 ширины, качество 90.
-                large_img = img.copy()
-                if large_img.width > 1920:
-                    ratio = 1920 / large_img.width
-                    new_height = int(large_img.height * ratio)
-                    large_img = large_img.resize((1920, new_height), Resampling.LANCZOS)
-                large_io = BytesIO()
-                large_img.save(large_io, format='WEBP', quality=90)
-                large_name = os.path.splitext(os.path.basename(self.image.name))[0] + '_large.webp'
-                self.large_image.save(large_name, ContentFile(large_io.getvalue()), save=False)
-                large_img.close()
-
-                self._original_image = self.image
-            finally:
-                img.close()
+        rebuild_tiles = False
+        if self.is_reused('image'):
+            # Версии и метаданные взяты у картины с тем же изображением, тайлы у каждой картины свои.
+            self.tiles_ready = False
+            rebuild_tiles = True
+        elif self.image and (image_changed or not self.small_image or not self.medium_image or not self.large_image):
+            # Версии создаются только для нового оригинала или при отсутствии какой-то из них:
+            # сохранение без смены изображения (правка названия) файлы и тайлы не трогает.
+            result = self.save_renditions('image')
+            # Плейсхолдер и цвет по всему кадру: центр совпадает с обрезкой 4:3 при background-size: cover.
+            set_image_metadata(self, result['source'])
+            set_image_info(self, 'image', {**result['source'], 'bytes': self.image.size})
+            for field_name, (_, info) in result['renditions'].items():
+                set_image_info(self, field_name, info)
+            self.color_signature = result['renditions']['medium_image'][1]['color_signature']
+
+            self.tiles_ready = False
+            rebuild_tiles = True
 
         super().save(*args, **kwargs)
 
+        if rebuild_tiles:
+            # Нарезка тайлов для лайтбокса идет в фоне: для больших оригиналов это секунды.
+            schedule_tiles(self.pk)
 
-class BlogPost(models.Model):
+
+class BlogPost(GuardedImageMixin, models.Model):
     title = models.CharField(
         max_length=200,
         verbose_name="Заголовок поста"
     )
     content = models.TextField(
-        verbose_name="Содержание"
+        verbose_name="Содержание",
+        help_text="Абзацы разделяются пустой строкой. Разметка: ## заголовок, - пункт списка, "
+                  "**жирный**, *курсив*, `код`, [текст](https://адрес); адреса становятся ссылками."
+    )
+    content_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Содержание (HTML)",
+        help_text="Рассчитывается автоматически при сохранении поста (см. core/content.py)."
+    )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Отрывок",
+        help_text="Начало текста поста без разметки."
+    )
+    word_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Число слов"
+    )
+    reading_time = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Время чтения, мин"
     )
     pub_date = models.DateTimeField(
         auto_now_add=True,
@@ -275,13 +504,28 @@ class BlogPost(models.Model):
         help_text="Автоматически генерируется из заголовка для URL."
     )
     cover_image = models.ImageField(
-        storage=OverwriteStorage(),
+        storage=overwrite_storage,
         upload_to='blog/covers/',
         null=True,
         blank=True,
         verbose_name="Обложка поста",
         help_text="Загрузите изображение обложки (будет обработано автоматически)."
     )
+    cover_image_width = image_info_field('width', 'обложка')
+    cover_image_height = image_info_field('height', 'обложка')
+    cover_image_bytes = image_info_field('bytes', 'обложка')
+    cover_image_mime = image_info_field('mime', 'обложка')
+    placeholder = placeholder_field()
+    dominant_color = dominant_color_field()
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения",
+        help_text="Версия карточки в кэше фрагментов; обновляется и при изменении изображений поста."
+    )
+
+    # Ресайз до 800 пикселей ширины, качество 85.
+    image_renditions = {'cover_image': {'cover_image': {'max_width': 800, 'quality': 85}}}
+    image_hash_fields = ('cover_image',)
 
     class Meta:
         verbose_name = "Пост в блоге"
@@ -297,7 +541,7 @@ class BlogPost(models.Model):
             old_self = BlogPost.objects.get(pk=self.pk)
             old_cover = old_self.cover_image
             if old_cover and old_cover != self.cover_image:
-                old_cover.delete(save=False)
+                old_self.delete_image_file('cover_image')
 
         if not self.slug:
             # Генерируем уникальный slug на основе заголовка.
@@ -308,14 +552,24 @@ class BlogPost(models.Model):
                 self.slug = f"{original_slug}-{counter}"
                 counter += 1
 
-        # Обрабатываем обложку (только при создании или изменении поля): ресайз до 800 пикселей ширины, качество 85.
-        if self.cover_image and (not self.pk or old_cover != self.cover_image):
-            process_image(self.cover_image, max_width=800, quality=85)
+        # HTML, отрывок и время чтения считаются один раз здесь, а не при каждом показе поста.
+        for name, value in render_post(self.content).items():
+            setattr(self, name, value)
+
+        # Обрабатываем обложку (только при создании или изменении поля).
+        # Файлы, взятые у найденной копии (is_reused), не обрабатываются повторно.
+        if self.cover_image and not self.is_reused('cover_image') and (not self.pk or old_cover != self.cover_image):
+            _, info = self.save_renditions('cover_image')['renditions']['cover_image']
+            set_image_metadata(self, info)
+            set_image_info(self, 'cover_image', info)
+        elif not self.cover_image:
+            set_image_metadata(self)
+            set_image_info(self, 'cover_image')
 
         super().save(*args, **kwargs)
 
 
-class BlogPostImage(models.Model):
+class BlogPostImage(GuardedImageMixin, models.Model):
     post = models.ForeignKey(
         BlogPost,
         on_delete=models.CASCADE,
@@ -323,13 +577,23 @@ class BlogPostImage(models.Model):
         verbose_name="Пост"
     )
     image = models.ImageField(
-        storage=OverwriteStorage(),
+        storage=overwrite_storage,
         upload_to='blog/images/',
         null=True,
         blank=True,
         verbose_name="Изображение",
         help_text="Загрузите изображение для поста (будет обработано автоматически)."
     )
+    image_width = image_info_field('width', 'изображение')
+    image_height = image_info_field('height', 'изображение')
+    image_bytes = image_info_field('bytes', 'изображение')
+    image_mime = image_info_field('mime', 'изображение')
+    placeholder = placeholder_field()
+    dominant_color = dominant_color_field()
+
+    # Ресайз до 800 пикселей ширины, качество 85.
+    image_renditions = {'image': {'image': {'max_width': 800, 'quality': 85}}}
+    image_hash_fields = ('image',)
 
     class Meta:
         verbose_name = "Изображение поста"
@@ -345,15 +609,109 @@ class BlogPostImage(models.Model):
             old_self = BlogPostImage.objects.get(pk=self.pk)
             old_image = old_self.image
             if old_image and old_image != self.image:
-                old_image.delete(save=False)
+                old_self.delete_image_file('image')
 
-        # Обрабатываем изображение (только при создании или изменении поля): ресайз до 800 пикселей ширины, качество 85.
-        if self.image and (not self.pk or old_image != self.image):
-            process_image(self.image, max_width=800, quality=85)
+        # Обрабатываем изображение (только при создании или изменении поля и не взятое у найденной копии).
+        if self.image and not self.is_reused('image') and (not self.pk or old_image != self.image):
+            _, info = self.save_renditions('image')['renditions']['image']
+            set_image_metadata(self, info)
+            set_image_info(self, 'image', info)
+        elif not self.image:
+            set_image_metadata(self)
+            set_image_info(self, 'image')
 
         super().save(*args, **kwargs)
 
 
+class ImageHashQuerySet(models.QuerySet):
+    def similar(self, image_hash, max_distance=None, exclude=None):
+        """
+        Возвращает хеши, отличающиеся от image_hash не больше чем на max_distance бит, по возрастанию отличия.
+
+        Кандидаты выбираются по индексам частей хеша (см. core/duplicates.py), точное расстояние
+        считается только для них. exclude -- запись, собственный хеш которой не учитывается.
+        """
+        if max_distance is None:
+            max_distance = settings.IMAGE_DUPLICATE_MAX_DISTANCE
+        condition = models.Q()
+        for index, band in enumerate(hash_bands(image_hash)):
+            condition |= models.Q(**{f'band_{index}': band})
+        candidates = self.filter(condition)
+        if exclude is not None and exclude.pk is not None:
+            candidates = candidates.exclude(model_label=exclude._meta.label_lower, object_id=exclude.pk)
+
+        matches = []
+        for candidate in candidates:
+            candidate.distance = hamming_distance(image_hash, candidate.hash)
+            if candidate.distance <= max_distance:
+                matches.append(candidate)
+        return sorted(matches, key=lambda match: (match.distance, match.pk))
+
+
+class ImageHash(models.Model):
+    model_label = models.CharField(
+        max_length=100,
+        verbose_name="Модель",
+        help_text="Метка модели записи, например core.painting."
+    )
+    object_id = models.PositiveIntegerField(
+        verbose_name="ID записи"
+    )
+    field_name = models.CharField(
+        max_length=50,
+        verbose_name="Поле изображения"
+    )
+    hash = models.CharField(
+        max_length=16,
+        verbose_name="Перцептивный хеш",
+        help_text="dHash оригинала: 64 бита в шестнадцатеричной записи."
+    )
+    # Части хеша по 16 бит с индексами для поиска похожих изображений (см. core/duplicates.py)
+    band_0 = models.PositiveIntegerField(db_index=True)
+    band_1 = models.PositiveIntegerField(db_index=True)
+    band_2 = models.PositiveIntegerField(db_index=True)
+    band_3 = models.PositiveIntegerField(db_index=True)
+
+    objects = ImageHashQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Хеш изображения"
+        verbose_name_plural = "Хеши изображений"
+        constraints = [
+            models.UniqueConstraint(fields=['model_label', 'object_id', 'field_name'], name='unique_image_hash'),
+        ]
+
+    def __str__(self):
+        return f'{self.model_label}#{self.object_id}.{self.field_name}: {self.hash}'
+
+    @classmethod
+    def store(cls, instance, field_name, image_hash):
+        """
+        Сохраняет хеш изображения поля field_name записи instance.
+        """
+        bands = {f'band_{index}': band for index, band in enumerate(hash_bands(image_hash))}
+        cls.objects.update_or_create(
+            model_label=instance._meta.label_lower, object_id=instance.pk, field_name=field_name,
+            defaults={'hash': image_hash, **bands}
+        )
+
+    def owner(self):
+        """
+        Возвращает запись, которой принадлежит изображение, или None, если ее уже нет.
+        """
+        model = apps.get_model(self.model_label)
+        return model.objects.filter(pk=self.object_id).first()
+
+    def describe(self):
+        """
+        Описание найденной копии для сообщения в админке.
+        """
+        owner = self.owner()
+        model = apps.get_model(self.model_label)
+        name = f'«{owner}»' if owner is not None else f'#{self.object_id} (удалена)'
+        return f'{model._meta.verbose_name.capitalize()} {name}: отличие {self.distance} бит из 64.'
+
+
 class ContactRequest(models.Model):
     name = models.CharField(
         max_length=100,
@@ -367,6 +725,7 @@ class ContactRequest(models.Model):
     )
     created_at = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,  # Выгрузка за период (см. core/contact_export.py) и фильтр по дате в админке
         verbose_name="Дата создания"
     )
 
@@ -378,6 +737,98 @@ class ContactRequest(models.Model):
         return f"{self.name} - {self.created_at.strftime('%Y-%m-%d')}"
 
 
+class OutboxMessageQuerySet(models.QuerySet):
+    def due(self):
+        """
+        Сообщения, ожидающие отправки, время очередной попытки которых наступило.
+        """
+        return self.filter(status=OutboxMessage.PENDING, next_attempt_at__lte=timezone.now())
+
+
+class OutboxMessage(models.Model):
+    """
+    Уведомление о заявке, ожидающее отправки (см. core/outbox.py).
+
+    Записывается в одной транзакции с заявкой, отправляется командой deliver_outbox.
+    """
+    EMAIL = 'email'
+    TELEGRAM = 'telegram'
+    CHANNELS = ((EMAIL, 'E-mail'), (TELEGRAM, 'Telegram'))
+
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = ((PENDING, 'Ожидает отправки'), (SENT, 'Отправлено'), (FAILED, 'Не доставлено'))
+
+    contact_request = models.ForeignKey(
+        ContactRequest,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications',
+        verbose_name="Заявка"
+    )
+    channel = models.CharField(
+        max_length=20,
+        choices=CHANNELS,
+        verbose_name="Канал"
+    )
+    recipient = models.CharField(
+        max_length=255,
+        verbose_name="Получатель",
+        help_text="Адрес e-mail или ID чата Telegram."
+    )
+    subject = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Тема"
+    )
+    body = models.TextField(
+        verbose_name="Текст"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name="Статус"
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Попыток отправки"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Следующая попытка",
+        help_text="После неудачной попытки откладывается с растущим интервалом."
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="Последняя ошибка"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Дата отправки"
+    )
+
+    objects = OutboxMessageQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Исходящее уведомление"
+        verbose_name_plural = "Исходящие уведомления"
+        # Выборка очереди: ожидающие сообщения по времени попытки
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_channel_display()} → {self.recipient} ({self.get_status_display()})"
+
+
 class SiteContact(models.Model):
     phone = models.CharField(
         max_length=20,
@@ -410,3 +861,70 @@ class SiteContact(models.Model):
 
     def __str__(self):
         return "Контакты сайта"
+
+
+class ChunkedUpload(models.Model):
+    """
+    Загрузка большого файла частями (протокол в стиле tus) из админки.
+
+    Части дописываются во временный файл в CHUNKED_UPLOAD_DIR, offset хранит число принятых байт,
+    поэтому прерванную загрузку можно продолжить с того же места.
+    """
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    filename = models.CharField(
+        max_length=255,
+        verbose_name="Имя файла"
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name="Размер файла, байт"
+    )
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name="Принято байт"
+    )
+    mime = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name="MIME-тип",
+        help_text="Определяется по заголовку файла после первых частей."
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Пользователь"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата создания"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата последней части"
+    )
+
+    class Meta:
+        verbose_name = "Загрузка по частям"
+        verbose_name_plural = "Загрузки по частям"
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def path(self):
+        """
+        Путь к временному файлу загрузки.
+        """
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{self.pk}.part')
+
+    @property
+    def is_complete(self):
+        """
+        Все части приняты.
+        """
+        return self.offset >= self.size
@@ -0,0 +1,145 @@
+"""
+Уведомления о заявках с формы обратной связи: исходящая очередь (outbox) в БД.
+
+Форма не обращается к почтовому серверу или Telegram: вместе с заявкой в той же транзакции
+записываются сообщения OutboxMessage, и время ответа не зависит от способа доставки. Заявка
+без уведомлений (или уведомления без заявки) сохраниться не могут.
+
+Команда deliver_outbox выбирает наступившие сообщения пачками по OUTBOX_BATCH_SIZE
+(SELECT ... FOR UPDATE SKIP LOCKED: несколько процессов доставки не отправят одно сообщение дважды),
+письма пачки идут через одно соединение с почтовым сервером. После неудачи попытка откладывается
+на OUTBOX_RETRY_DELAY секунд с удвоением до OUTBOX_RETRY_MAX_DELAY, после OUTBOX_MAX_ATTEMPTS
+неудач сообщение помечается недоставленным.
+"""
+import json
+import logging
+import urllib.request
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxMessage, SiteContact
+from .singletons import get_singleton
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = 'https://api.telegram.org/bot{token}/sendMessage'
+
+
+def notification_recipients():
+    """
+    Возвращает получателей уведомлений: [(канал, получатель)].
+
+    Письма уходят на CONTACT_NOTIFY_EMAILS, а если список пуст — на e-mail из контактов сайта.
+    Для Telegram нужен бот и ID чата: ссылка t.me из контактов сайта для отправки не подходит.
+    """
+    emails = settings.CONTACT_NOTIFY_EMAILS
+    if not emails:
+        site_contact = get_singleton(SiteContact)
+        emails = [site_contact.email] if site_contact and site_contact.email else []
+    recipients = [(OutboxMessage.EMAIL, email) for email in emails]
+    if settings.TELEGRAM_BOT_TOKEN and settings.TELEGRAM_CHAT_ID:
+        recipients.append((OutboxMessage.TELEGRAM, settings.TELEGRAM_CHAT_ID))
+    return recipients
+
+
+def enqueue_contact_request(contact_request):
+    """
+    Записывает уведомления о заявке в очередь; вызывается в транзакции, сохраняющей заявку.
+    """
+    subject = f'Новая заявка с сайта: {contact_request.name}'
+    body = f'Имя: {contact_request.name}\nE-mail: {contact_request.email}\n\n{contact_request.message}'
+    return OutboxMessage.objects.bulk_create([
+        OutboxMessage(contact_request=contact_request, channel=channel, recipient=recipient,
+                      subject=subject, body=body)
+        for channel, recipient in notification_recipients()
+    ])
+
+
+def send_telegram(message):
+    """
+    Отправляет сообщение в чат Telegram через Bot API.
+    """
+    data = json.dumps({'chat_id': message.recipient, 'text': f'{message.subject}\n\n{message.body}'})
+    request = urllib.request.Request(
+        TELEGRAM_API_URL.format(token=settings.TELEGRAM_BOT_TOKEN),
+        data=data.encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=settings.OUTBOX_SEND_TIMEOUT) as response:
+        result = json.load(response)
+    if not result.get('ok'):
+        raise ValueError(result.get('description', 'Telegram не принял сообщение'))
+
+
+def retry_delay(attempts):
+    """
+    Пауза перед следующей попыткой после attempts неудачных.
+    """
+    return timedelta(seconds=min(settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), settings.OUTBOX_RETRY_MAX_DELAY))
+
+
+def deliver_batch(batch_size=None):
+    """
+    Отправляет одну пачку наступивших сообщений.
+
+    Возвращает словарь {'sent': ..., 'retried': ..., 'failed': ...}.
+    """
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.due().select_for_update(skip_locked=True)
+            .order_by('next_attempt_at', 'pk')[:batch_size or settings.OUTBOX_BATCH_SIZE]
+        )
+        if not messages:
+            return stats
+
+        connection = get_connection()
+        try:
+            for message in messages:
+                message.attempts += 1
+                try:
+                    if message.channel == OutboxMessage.EMAIL:
+                        connection.open()  # Открывается при первом письме пачки, дальше используется то же
+                        EmailMessage(message.subject, message.body, to=[message.recipient],
+                                     connection=connection).send()
+                    else:
+                        send_telegram(message)
+                except Exception as error:
+                    message.last_error = f'{type(error).__name__}: {error}'
+                    if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                        message.status = OutboxMessage.FAILED
+                        stats['failed'] += 1
+                        logger.error('Уведомление #%s не доставлено: %s', message.pk, message.last_error)
+                    else:
+                        message.next_attempt_at = timezone.now() + retry_delay(message.attempts)
+                        stats['retried'] += 1
+                        logger.warning('Уведомление #%s: ошибка отправки, повтор в %s',
+                                       message.pk, message.next_attempt_at)
+                else:
+                    message.status = OutboxMessage.SENT
+                    message.sent_at = timezone.now()
+                    message.last_error = ''
+                    stats['sent'] += 1
+        finally:
+            connection.close()
+
+        OutboxMessage.objects.bulk_update(
+            messages, ['attempts', 'status', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+    return stats
+
+
+def deliver_pending(batch_size=None):
+    """
+    Отправляет пачками все наступившие сообщения и возвращает суммарную статистику.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    total = {'sent': 0, 'retried': 0, 'failed': 0}
+    while True:
+        stats = deliver_batch(batch_size)
+        for key, value in stats.items():
+            total[key] += value
+        if sum(stats.values()) < batch_size:
+            return total
@@ -0,0 +1,109 @@
+"""
+Счетчики просмотров картин и рейтинг популярных работ.
+
+Просмотр регистрируется запросом-маяком со страницы картины (navigator.sendBeacon): сама страница
+отдается Nginx из экспортированного HTML и до Django не доходит. Маяк только увеличивает счетчик
+в памяти воркера — без обращения к БД. Раз в VIEW_COUNTER_FLUSH_INTERVAL секунд накопленные
+просмотры записываются одним запросом:
+
+    UPDATE core_painting SET views = views + CASE slug WHEN 'a' THEN 3 WHEN 'b' THEN 1 END
+    WHERE slug IN ('a', 'b')
+
+после чего пересчитывается топ POPULAR_PAINTINGS_COUNT картин и сохраняется в общем кэше.
+Перед остановкой воркера (gunicorn.conf.py, worker_exit) несохраненные просмотры записываются.
+"""
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Value, When
+from django.urls import reverse
+from .models import Painting
+from .site_export import schedule_export
+
+logger = logging.getLogger(__name__)
+
+POPULAR_KEY = 'paintings:popular'  # Ключ топа картин в кэше: список id по убыванию просмотров
+MAX_PENDING_SLUGS = 10_000  # Больше разных slug в памяти — запись без ожидания интервала
+
+# Несохраненные просмотры воркера: {slug: число}
+_pending = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record_view(slug):
+    """
+    Учитывает просмотр картины; при наступлении интервала записывает накопленное в БД.
+    """
+    with _lock:
+        _pending[slug] = _pending.get(slug, 0) + 1
+        due = (time.monotonic() - _last_flush >= settings.VIEW_COUNTER_FLUSH_INTERVAL
+               or len(_pending) >= MAX_PENDING_SLUGS)
+    if due:
+        flush_views()
+
+
+def flush_views():
+    """
+    Записывает накопленные просмотры одним UPDATE и обновляет топ картин.
+
+    Возвращает число обновленных картин. При ошибке БД просмотры возвращаются в буфер.
+    """
+    global _last_flush
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return 0
+
+    increment = Case(*(When(slug=slug, then=Value(count)) for slug, count in pending.items()),
+                     output_field=IntegerField())
+    try:
+        updated = Painting.objects.filter(slug__in=pending).update(views=F('views') + increment)
+    except Exception:
+        logger.exception('Не удалось записать просмотры картин')
+        with _lock:
+            for slug, count in pending.items():
+                _pending[slug] = _pending.get(slug, 0) + count
+        return 0
+
+    refresh_popular()
+    return updated
+
+
+def top_ids():
+    """
+    Возвращает id картин с наибольшим числом просмотров.
+    """
+    return list(
+        Painting.objects.filter(views__gt=0).order_by('-views', '-pk')
+        .values_list('pk', flat=True)[:settings.POPULAR_PAINTINGS_COUNT]
+    )
+
+
+def refresh_popular():
+    """
+    Пересчитывает топ картин по просмотрам и сохраняет его в кэше.
+
+    Если состав или порядок топа изменился, главная страница экспортируется заново.
+    """
+    ids = top_ids()
+    if cache.get(POPULAR_KEY) != ids:
+        schedule_export([reverse('home')])
+    cache.set(POPULAR_KEY, ids, timeout=None)
+    return ids
+
+
+def popular_paintings():
+    """
+    Возвращает картины из топа по просмотрам (один запрос по id из кэша).
+    """
+    ids = cache.get(POPULAR_KEY)
+    if ids is None:
+        ids = top_ids()
+        cache.set(POPULAR_KEY, ids, timeout=None)
+    paintings = Painting.objects.in_bulk(ids)
+    return [paintings[pk] for pk in ids if pk in paintings]
@@ -0,0 +1,79 @@
+"""
+Защита формы обратной связи от всплесков отправок и спама.
+
+Каждая отправка забирает токен из «корзины» в кэше: отдельно для IP-адреса (до разбора формы)
+и для e-mail отправителя (после проверки формы). Корзина вмещает capacity токенов, которые
+равномерно восстанавливаются за period секунд; пустая корзина — ответ 429 без записи в БД.
+Скрытое поле-ловушка (honeypot), которое заполняют боты, отсекается раньше всех проверок.
+
+С Redis (REDIS_URL) корзины общие для всех воркеров; чтение и запись корзины не атомарны,
+поэтому при одновременных запросах лимит может быть превышен на несколько отправок.
+Отсеченные запросы считаются в кэше, счетчики видны в админке (/<ADMIN_URL>/contact-stats/).
+"""
+import hashlib
+import time
+from django.core.cache import cache
+
+HONEYPOT_FIELD = 'website'
+
+# Причины отсечения запроса: (ключ, описание)
+SHED_REASONS = (
+    ('honeypot', 'Заполнено скрытое поле'),
+    ('ip', 'Лимит отправок с IP-адреса'),
+    ('email', 'Лимит отправок с e-mail'),
+)
+SHED_KEY = 'contact:shed:{reason}'
+
+
+def client_ip(request):
+    """
+    IP-адрес клиента. За Nginx берется X-Real-IP: Nginx перезаписывает заголовок адресом соединения.
+    """
+    return request.META.get('HTTP_X_REAL_IP') or request.META.get('REMOTE_ADDR', '')
+
+
+def bucket_key(scope, value):
+    """
+    Ключ корзины в кэше: значение хешируется (e-mail может содержать недопустимые для кэша символы).
+    """
+    digest = hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+    return f'ratelimit:{scope}:{digest}'
+
+
+def take_token(scope, value, capacity, period):
+    """
+    Забирает токен из корзины (scope, value). Возвращает False, если корзина пуста.
+    """
+    key = bucket_key(scope, value)
+    now = time.time()
+    tokens, updated = cache.get(key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    # За period секунд без отправок корзина наполняется полностью, поэтому дольше ее хранить не нужно
+    cache.set(key, (tokens, now), timeout=period)
+    return allowed
+
+
+def record_shed(reason):
+    """
+    Увеличивает счетчик отсеченных запросов по причине reason.
+    """
+    key = SHED_KEY.format(reason=reason)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:  # Ключ вытеснен из кэша между add и incr
+        cache.set(key, 1, timeout=None)
+
+
+def shed_stats():
+    """
+    Возвращает счетчики отсеченных запросов по причинам.
+    """
+    counts = cache.get_many([SHED_KEY.format(reason=reason) for reason, _ in SHED_REASONS])
+    return {
+        reason: {'description': description, 'count': counts.get(SHED_KEY.format(reason=reason), 0)}
+        for reason, description in SHED_REASONS
+    }
@@ -1,6 +1,14 @@
-from django.db.models.signals import pre_delete
+import os
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from .models import Artist, Painting, BlogPost, BlogPostImage
+from django.urls import reverse
+from django.utils import timezone
+from .models import Artist, Painting, BlogPost, BlogPostImage, ChunkedUpload, ImageHash, SiteContact
+from .autocomplete import update_index
+from .facets import invalidate_facets
+from .singletons import invalidate_singleton
+from .site_export import painting_paths, schedule_export
+from .tiles import delete_tiles
 
 
 @receiver(pre_delete, sender=Artist)
@@ -15,31 +23,149 @@ def delete_artist_photo(sender, instance, **kwargs):
 @receiver(pre_delete, sender=Painting)
 def delete_painting_images(sender, instance, **kwargs):
     """
-    Удаляет все изображения картины (оригинал и генерируемые версии) перед удалением экземпляра модели Painting.
+    Удаляет все изображения картины (оригинал, генерируемые версии и тайлы) перед удалением экземпляра модели Painting.
+
+    Файлы, общие с повторной загрузкой того же изображения, остаются до удаления последней картины.
     """
-    if instance.image:
-        instance.image.delete(save=False)
-    if instance.small_image:
-        instance.small_image.delete(save=False)
-    if instance.medium_image:
-        instance.medium_image.delete(save=False)
-    if instance.large_image:
-        instance.large_image.delete(save=False)
+    instance.delete_image_file('image')
+    instance.delete_image_file('small_image')
+    instance.delete_image_file('medium_image')
+    instance.delete_image_file('large_image')
+    delete_tiles(instance.image.storage, instance.pk)
 
 
 @receiver(pre_delete, sender=BlogPost)
 def delete_blog_post_cover(sender, instance, **kwargs):
     """
-    Удаляет обложку поста в блоге перед удалением экземпляра модели BlogPost.
+    Удаляет обложку поста в блоге перед удалением экземпляра модели BlogPost (если она не общая с другим постом).
     """
-    if instance.cover_image:
-        instance.cover_image.delete(save=False)
+    instance.delete_image_file('cover_image')
 
 
 @receiver(pre_delete, sender=BlogPostImage)
 def delete_blog_post_image_files(sender, instance, **kwargs):
     """
-    Удаляет дополнительное изображение поста в блоге перед удалением экземпляра модели BlogPostImage.
+    Удаляет дополнительное изображение поста в блоге перед удалением экземпляра модели BlogPostImage
+    (если оно не общее с другим изображением).
+    """
+    instance.delete_image_file('image')
+
+
+@receiver(pre_delete, sender=ChunkedUpload)
+def delete_chunked_upload_file(sender, instance, **kwargs):
+    """
+    Удаляет временный файл загрузки по частям перед удалением экземпляра модели ChunkedUpload.
+    """
+    if os.path.exists(instance.path):
+        os.remove(instance.path)
+
+
+@receiver(post_delete, sender=Painting)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_delete, sender=BlogPostImage)
+def delete_image_hashes(sender, instance, **kwargs):
+    """
+    Удаляет перцептивные хеши изображений удаленной записи.
+    """
+    ImageHash.objects.filter(model_label=sender._meta.label_lower, object_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Artist)
+@receiver(post_delete, sender=Artist)
+@receiver(post_save, sender=SiteContact)
+@receiver(post_delete, sender=SiteContact)
+def invalidate_singletons(sender, instance, **kwargs):
+    """
+    Сбрасывает закэшированную запись-одиночку во всех воркерах.
+    """
+    if kwargs.get('raw'):  # loaddata, import_catalog: кэши сбрасываются один раз после загрузки
+        return
+    invalidate_singleton(sender)
+
+
+@receiver(post_save, sender=SiteContact)
+@receiver(post_delete, sender=SiteContact)
+def export_all_pages(sender, instance, **kwargs):
+    """
+    Обновляет все экспортированные страницы: контакты выводятся в футере.
+    """
+    if kwargs.get('raw'):
+        return
+    schedule_export()
+
+
+@receiver(post_save, sender=BlogPostImage)
+@receiver(post_delete, sender=BlogPostImage)
+def touch_blog_post(sender, instance, **kwargs):
+    """
+    Обновляет версию поста при изменении его изображений, чтобы карточка поста перерисовалась.
+    """
+    if kwargs.get('raw'):  # Дата изменения поста загружается вместе с ним
+        return
+    BlogPost.objects.filter(pk=instance.post_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Painting)
+@receiver(post_delete, sender=Painting)
+def reset_painting_facets(sender, instance, **kwargs):
+    """
+    Сбрасывает закэшированные счетчики фасетов каталога.
+    """
+    if kwargs.get('raw'):
+        return
+    invalidate_facets()
+
+
+@receiver(post_save, sender=Painting)
+@receiver(post_save, sender=BlogPost)
+def index_title(sender, instance, **kwargs):
+    """
+    Обновляет название в индексе подсказок поиска.
+    """
+    if kwargs.get('raw'):
+        return
+    update_index(instance)
+
+
+@receiver(post_delete, sender=Painting)
+@receiver(post_delete, sender=BlogPost)
+def unindex_title(sender, instance, **kwargs):
+    """
+    Удаляет название из индекса подсказок поиска.
+    """
+    update_index(instance, deleted=True)
+
+
+@receiver(post_save, sender=Painting)
+@receiver(post_delete, sender=Painting)
+def export_painting_pages(sender, instance, **kwargs):
+    """
+    Обновляет экспортированные страницы с картиной (страница удаленной картины удаляется при экспорте).
+    """
+    if kwargs.get('raw'):
+        return
+    schedule_export(painting_paths(instance))
+
+
+@receiver(post_save, sender=Artist)
+@receiver(post_delete, sender=Artist)
+def export_artist_pages(sender, instance, **kwargs):
+    """
+    Обновляет экспортированную главную страницу с информацией о художнике.
+    """
+    if kwargs.get('raw'):
+        return
+    schedule_export([reverse('home')])
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_save, sender=BlogPostImage)
+@receiver(post_delete, sender=BlogPostImage)
+def export_blog_pages(sender, instance, **kwargs):
+    """
+    Обновляет экспортированную страницу блога.
     """
-    if instance.image:
-        instance.image.delete(save=False)
\ No newline at end of file
+    if kwargs.get('raw'):
+        return
+    schedule_export([reverse('blog_list')])
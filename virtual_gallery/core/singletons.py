@@ -0,0 +1,58 @@
+"""
+Кэш записей-одиночек (Artist, SiteContact): админка разрешает только одну запись каждой модели.
+
+Запись хранится в памяти процесса вместе с версией. Версия лежит в общем кэше (Redis при REDIS_URL)
+под ключом singletons:<модель>; сохранение или удаление записи меняет версию (см. signals.py),
+и каждый воркер при следующем обращении перечитывает запись из БД. Обычное обращение — одно чтение
+из кэша вместо запроса к БД.
+
+Возвращаемый объект общий для всех запросов процесса: его нельзя изменять.
+"""
+import uuid
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# Записи процесса: {метка модели: (версия, объект или None)}
+_local = {}
+
+
+def version_key(model):
+    """
+    Возвращает ключ версии модели в общем кэше.
+    """
+    return f'singletons:{model._meta.label_lower}'
+
+
+def get_singleton(model):
+    """
+    Возвращает единственную запись модели или None, если ее нет.
+    """
+    key = version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # Версии нет (кэш очищен или вытеснен): заводим новую, и все процессы перечитают запись.
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+
+    cached = _local.get(model._meta.label_lower)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    # Из основной БД: с отстающей реплики старая запись закэшировалась бы под новой версией
+    obj = model.objects.using(DEFAULT_DB_ALIAS).order_by('pk').first()
+    _local[model._meta.label_lower] = (version, obj)
+    return obj
+
+
+def invalidate_singleton(model):
+    """
+    Меняет версию модели сразу и еще раз после фиксации транзакции.
+
+    Повторная смена нужна, если другой воркер успел перечитать запись между изменением и коммитом
+    и закэшировал старые данные под новой версией.
+    """
+    def bump():
+        cache.set(version_key(model), uuid.uuid4().hex, timeout=None)
+
+    bump()
+    transaction.on_commit(bump)
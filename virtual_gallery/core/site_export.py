@@ -0,0 +1,227 @@
+"""
+Экспорт публичных страниц в статические HTML-файлы, которые Nginx отдает без обращения к Django.
+
+Страница /paintings/<slug>/ сохраняется как <SITE_EXPORT_DIR>/paintings/<slug>/index.html.
+Nginx проверяет наличие файла (try_files) для GET-запросов без параметров и только при его отсутствии
+проксирует запрос в Django. Страница контактов экспортируется без CSRF-токена: токен и сообщения
+подгружаются скриптом страницы (/contacts/state/), а отправка формы (POST) идет в Django.
+
+Экспорт инкрементальный: в манифесте хранится хеш содержимого каждой страницы, файл перезаписывается
+только при изменении, а страницы удаленных картин удаляются. Запись атомарная (временный файл +
+os.replace), поэтому Nginx никогда не отдает недописанную страницу.
+
+После сохранения моделей экспорт затронутых страниц запускается в фоновом потоке (см. signals.py).
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = '.manifest.json'  # Хеши экспортированных страниц: {путь: sha256}
+
+# Фоновый экспорт: пути, ожидающие экспорта (None в наборе — все страницы), и флаг работающего потока.
+_pending = set()
+_pending_lock = threading.Lock()
+_running = False
+
+
+def public_paths():
+    """
+    Возвращает пути всех экспортируемых страниц.
+    """
+    from .models import Painting
+
+    paths = [reverse('home'), reverse('painting_list'), reverse('blog_list'), reverse('contacts')]
+    for slug in Painting.objects.order_by('pk').values_list('slug', flat=True):
+        paths.append(reverse('painting_detail', kwargs={'slug': slug}))
+    return paths
+
+
+def export_host():
+    """
+    Возвращает имя хоста для запросов экспорта: первый конкретный хост из ALLOWED_HOSTS.
+    """
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != '*' and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+def render_path(path):
+    """
+    Рендерит страницу без HTTP-запроса и возвращает кортеж (код ответа, байты HTML).
+    """
+    request = RequestFactory().get(path, HTTP_HOST=export_host(), secure=not settings.DEBUG)
+    match = resolve(path)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response.status_code, response.content
+
+
+def _render_in_thread(path):
+    """
+    Вспомогательная функция: рендер в потоке пула с закрытием соединения потока с БД.
+    """
+    try:
+        return render_path(path)
+    finally:
+        connections.close_all()
+
+
+def output_file(root, path):
+    """
+    Возвращает имя файла страницы в каталоге экспорта.
+    """
+    parts = [part for part in path.split('/') if part]
+    return os.path.join(root, *parts, 'index.html')
+
+
+def write_atomic(filename, content):
+    """
+    Записывает файл через временный файл в том же каталоге и os.replace.
+    """
+    directory = os.path.dirname(filename)
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(content)
+        os.chmod(temporary, 0o644)  # mkstemp создает файл 0600, а читает его процесс Nginx
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def load_manifest(root):
+    """
+    Загружает манифест экспорта или возвращает пустой словарь.
+    """
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding='utf-8') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def remove_page(root, path):
+    """
+    Удаляет файл страницы и опустевшие каталоги над ним.
+    """
+    filename = output_file(root, path)
+    if os.path.exists(filename):
+        os.remove(filename)
+    directory = os.path.dirname(filename)
+    while os.path.abspath(directory) != os.path.abspath(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def export_site(paths=None, root=None, workers=None, force=False):
+    """
+    Экспортирует страницы в каталог root.
+
+    Аргументы:
+    paths -- пути для экспорта (по умолчанию все публичные страницы).
+    root -- каталог экспорта (по умолчанию SITE_EXPORT_DIR).
+    workers -- число потоков рендеринга (по умолчанию SITE_EXPORT_WORKERS, 1 — в текущем потоке).
+    force -- перезаписать файлы, даже если содержимое не изменилось.
+
+    Страницы, которых больше нет среди публичных (удаленные картины), удаляются при любом вызове.
+    Возвращает словарь со счетчиками written, unchanged, removed и failed.
+    """
+    root = root or settings.SITE_EXPORT_DIR
+    all_paths = public_paths()
+    paths = all_paths if paths is None else [path for path in paths if path in all_paths]
+    manifest = load_manifest(root)
+    stats = {'written': 0, 'unchanged': 0, 'removed': 0, 'failed': 0}
+
+    workers = workers or settings.SITE_EXPORT_WORKERS
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = map(render_path, paths) if workers == 1 else executor.map(_render_in_thread, paths)
+        for path, (status, content) in zip(paths, results):
+            if status != 200:
+                logger.warning('Экспорт %s: код ответа %s, страница не сохранена', path, status)
+                stats['failed'] += 1
+                continue
+            digest = hashlib.sha256(content).hexdigest()
+            filename = output_file(root, path)
+            if not force and manifest.get(path) == digest and os.path.exists(filename):
+                stats['unchanged'] += 1
+                continue
+            write_atomic(filename, content)
+            manifest[path] = digest
+            stats['written'] += 1
+
+    for path in set(manifest) - set(all_paths):
+        remove_page(root, path)
+        del manifest[path]
+        stats['removed'] += 1
+
+    write_atomic(os.path.join(root, MANIFEST_NAME), json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    return stats
+
+
+def _export_pending():
+    """
+    Вспомогательная функция: точка входа фонового потока, экспортирует накопленные пути.
+
+    Сохранения, пришедшие во время экспорта, обрабатываются следующим проходом того же потока.
+    Страниц после одного сохранения немного, поэтому они рендерятся в этом же потоке, без пула:
+    пул нельзя создать, если поток заканчивает работу при завершении интерпретатора (команды управления).
+    """
+    global _running
+    while True:
+        with _pending_lock:
+            if not _pending:
+                _running = False
+                return
+            paths = None if None in _pending else sorted(_pending)
+            _pending.clear()
+        try:
+            export_site(paths, workers=1)
+        except Exception:
+            logger.exception('Не удалось экспортировать страницы сайта')
+        finally:
+            connections.close_all()
+
+
+def painting_paths(painting):
+    """
+    Возвращает пути страниц, на которых показывается картина.
+    """
+    return [reverse('home'), reverse('painting_list'), reverse('painting_detail', kwargs={'slug': painting.slug})]
+
+
+def schedule_export(paths=None):
+    """
+    Ставит экспорт страниц paths (None — всех) в фоновый поток после фиксации транзакции.
+
+    Ничего не делает, если SITE_EXPORT_DIR не задан (разработка, тесты).
+    """
+    if not settings.SITE_EXPORT_DIR:
+        return
+
+    def start():
+        global _running
+        with _pending_lock:
+            _pending.update([None] if paths is None else paths)
+            if _running:
+                return
+            _running = True
+        threading.Thread(target=_export_pending, name='site-export').start()
+
+    transaction.on_commit(start)
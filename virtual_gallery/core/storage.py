@@ -1,6 +1,25 @@
-from django.core.files.storage import FileSystemStorage
+import gzip
 import os
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, InvalidStorageError, storages
+
+try:
+    import brotli
+except ImportError:  # Brotli-версии не создаются, остается только gzip
+    brotli = None
+
+try:
+    from rcssmin import cssmin
+except ImportError:
+    cssmin = None
+
+try:
+    from rjsmin import jsmin
+except ImportError:
+    jsmin = None
 
 
 class OverwriteStorage(FileSystemStorage):
@@ -8,11 +27,122 @@ class OverwriteStorage(FileSystemStorage):
     Кастомный storage для перезаписи файлов с одинаковыми именами.
 
     Удаляет существующий файл перед сохранением нового, чтобы избежать дубликатов с суффиксами.
+    Работает только через API хранилища (exists/delete), без путей от MEDIA_ROOT.
     """
 
     def get_available_name(self, name, max_length=None):
         # Если файл с таким именем существует, удаляем его.
-        full_path = os.path.join(settings.MEDIA_ROOT, name)
         if self.exists(name):
-            os.remove(full_path)
+            self.delete(name)
         return name
+
+
+def overwrite_storage():
+    """
+    Хранилище полей, где новый файл заменяет прежний с тем же именем (фото художника, изображения постов).
+
+    Берется из STORAGES['overwrite']: OverwriteStorage на диске или S3 с file_overwrite=True
+    (см. settings/storage.py). Передается в поле как функция, поэтому в миграции не попадают
+    настройки конкретного хранилища.
+    """
+    try:
+        return storages['overwrite']
+    except InvalidStorageError:  # STORAGES без алиаса overwrite
+        return OverwriteStorage()
+
+
+def run_parallel(calls, workers=None):
+    """
+    Выполняет операции с хранилищем calls (функции без аргументов) в нескольких потоках.
+
+    Для S3 каждое сохранение или удаление файла — отдельный HTTP-запрос, и общее время определяется
+    самым долгим из них, а не суммой. Возвращает результаты в порядке calls; первая ошибка
+    передается вызывающему после завершения остальных операций.
+    """
+    calls = list(calls)
+    workers = min(workers or settings.MEDIA_WRITE_WORKERS, len(calls))
+    if workers <= 1:
+        return [call() for call in calls]
+    tail = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for position, call in enumerate(calls):
+            try:
+                futures.append(executor.submit(call))
+            except RuntimeError:
+                # Интерпретатор завершается (фоновый поток команды управления): новые потоки
+                # не запускаются, оставшиеся операции выполняются в текущем потоке
+                tail = [call() for call in calls[position:]]
+                break
+    return [future.result() for future in futures] + tail
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Storage для collectstatic: минификация, хеш содержимого в имени и предсжатые копии.
+
+    Порядок обработки:
+    1. CSS и JS минифицируются до хеширования (хеш считается от итогового содержимого).
+    2. ManifestStaticFilesStorage создает файлы вида styles.<hash>.css и staticfiles.json.
+    3. Для текстовых файлов с хешем рядом сохраняются .gz и .br (для gzip_static/brotli_static в Nginx).
+    """
+    compress_extensions = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map', '.ico')
+    min_compress_size = 256  # Байт: меньшие файлы сжатие не ускоряет
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+
+        self._minify_files(paths)
+
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        for hashed_name in sorted(hashed_names):
+            self._compress_file(hashed_name)
+
+    def _minify_files(self, paths):
+        """
+        Минифицирует скопированные CSS/JS прямо в STATIC_ROOT и перенаправляет хеширование на них.
+
+        Уже минифицированные файлы (*.min.css, *.min.js) не трогаются.
+        """
+        minifiers = {'.css': cssmin, '.js': jsmin}
+        for path in list(paths):
+            minify = minifiers.get(os.path.splitext(path)[1])
+            if minify is None or '.min.' in path:
+                continue
+
+            source_storage, source_path = paths[path]
+            with source_storage.open(source_path) as source:
+                content = source.read().decode('utf-8')
+
+            self.delete(path)
+            self._save(path, ContentFile(minify(content).encode('utf-8')))
+            paths[path] = (self, path)  # Хешируем минифицированную копию, а не исходник.
+
+    def _compress_file(self, name):
+        """
+        Сохраняет рядом с файлом его gzip- и brotli-версии, если они меньше оригинала.
+        """
+        if not name.endswith(self.compress_extensions):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < self.min_compress_size:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+
+        for suffix, compressed in variants:
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
@@ -0,0 +1,15 @@
+from django import template
+from django.utils.safestring import mark_safe
+from ..cards import CARDS
+
+register = template.Library()
+
+
+@register.simple_tag
+def cards(objects, name):
+    """
+    Выводит карточки объектов из кэша фрагментов; отсутствующие в кэше рендерятся и сохраняются.
+
+    Пример: {% cards paintings 'painting' %}
+    """
+    return mark_safe(''.join(CARDS[name].render_many(objects)))
@@ -0,0 +1,53 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+STYLESHEET = 'css/styles.css'
+
+# Прочитанные файлы критического CSS (в рамках процесса; при DEBUG не кешируются).
+_cache = {}
+
+
+def load_critical_css(page):
+    """
+    Возвращает содержимое static/css/critical/<page>.css или None, если файл не собран.
+    """
+    if page in _cache and not settings.DEBUG:
+        return _cache[page]
+    path = finders.find(f'css/critical/{page}.css')
+    content = None
+    if path:
+        with open(path, encoding='utf-8') as file:
+            content = file.read()
+    _cache[page] = content
+    return content
+
+
+@register.simple_tag
+def critical_css(page=None):
+    """
+    Встраивает критический CSS страницы и подключает основную таблицу стилей без блокировки отрисовки.
+
+    Если для страницы нет собранного файла (команда build_critical_css не запускалась),
+    styles.css подключается обычным блокирующим <link>.
+
+    Пример: {% critical_css 'home' %}
+    """
+    href = static(STYLESHEET)
+    content = load_critical_css(page) if page else None
+    if not content:
+        return format_html('<link rel="stylesheet" href="{}">', href)
+
+    # </style> внутри CSS не встречается, но на всякий случай не даем закрыть тег раньше времени.
+    content = content.replace('</', '<\\/')
+    return format_html(
+        '<style>{}</style>\n'
+        '    <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '    <noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(content), href, href
+    )
@@ -0,0 +1,39 @@
+from django import template
+from django.utils.html import format_html
+
+register = template.Library()
+
+
+@register.filter
+def placeholder_style(obj):
+    """
+    Возвращает inline-стиль с доминирующим цветом и размытым плейсхолдером объекта.
+
+    Стиль ставится на сам <img>: фон виден, пока загружается изображение, и перекрывается им.
+    Пример: <img src="..." style="{{ painting|placeholder_style }}">
+    """
+    color = getattr(obj, 'dominant_color', '')
+    placeholder = getattr(obj, 'placeholder', '')
+    if not color and not placeholder:
+        return ''
+    if not placeholder:
+        return format_html('background-color: {};', color)
+    return format_html(
+        'background: {} url({}) center / cover no-repeat;',
+        color or 'transparent', placeholder
+    )
+
+
+@register.filter
+def dimension_attrs(obj, field_name):
+    """
+    Возвращает атрибуты width и height для <img> из сохраненных размеров поля field_name.
+
+    Браузер резервирует место под изображение до его загрузки, файл при этом не открывается.
+    Пример: <img src="{{ painting.small_image.url }}" {{ painting|dimension_attrs:'small_image' }}>
+    """
+    width = getattr(obj, f'{field_name}_width', None)
+    height = getattr(obj, f'{field_name}_height', None)
+    if not width or not height:
+        return ''
+    return format_html('width="{}" height="{}"', width, height)
@@ -1,13 +1,63 @@
+import gzip
 import os
-from io import BytesIO
-from django.test import TestCase
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+import numpy as np
+from unittest import mock, skipUnless
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.http import QueryDict
 from django.urls import reverse
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
 from PIL import Image
 from django.conf import settings
-from django.core.files.storage import default_storage
-from .models import Artist, Painting, BlogPost, BlogPostImage, ContactRequest, SiteContact
+from django.core.cache import cache
+from django.core.files.storage import default_storage, FileSystemStorage, storages
+from django.core import mail
+from django.utils import timezone
+from virtual_gallery.settings.database import build_database, pool_size
+from virtual_gallery.settings.storage import MB, build_storages
+from .autocomplete import VERSION_KEY, suggest
+from .catalog_archive import MANIFEST_NAME as CATALOG_MANIFEST, MEDIA_DIR, stream_catalog
+from .colors import get_index, rank_paintings
+from .cards import CARDS
+from .contact_export import stream_csv
+from .content import render_content
+from .critical_css import extract_critical_css
+from .admin import PaintingAdminForm
+from .db import PIN_COOKIE, ReplicaRouter, connection_stats, replica_available, replica_reads
+from .duplicates import hamming_distance
+from .image_guard import check_image
+from .images import dominant_color, hash_image, placeholder_data_uri
+from .singletons import get_singleton, invalidate_singleton
+from .facets import FACETS_KEY, build_facets
+from .outbox import deliver_batch, deliver_pending
+from .ratelimit import shed_stats
+from .popularity import POPULAR_KEY, flush_views, popular_paintings, record_view
+from .site_export import MANIFEST_NAME, export_site
+from .models import (
+    Artist, Painting, BlogPost, BlogPostImage, ChunkedUpload, ContactRequest, ImageHash, OutboxMessage, SiteContact
+)
 from .forms import ContactForm
+from .storage import CompressedManifestStaticFilesStorage, OverwriteStorage, brotli, cssmin, overwrite_storage, run_parallel
+from .templatetags.critical_css import critical_css
+from .tiles import build_painting_tiles, build_pyramid, tiles_dir
+from .uploads import open_upload
+
+try:
+    import boto3
+    from moto import mock_aws
+except ImportError:  # Тесты S3 пропускаются
+    mock_aws = None
 
 
 class BaseTestCase(TestCase):
@@ -463,7 +513,7 @@ class ViewTestCase(BaseTestCase):
         data = {'name': 'Test', 'email': 'test@example.com', 'message': 'Test msg'}
         response = self.client.post(reverse('contacts'), data)
         self.assertEqual(response.status_code, 302)
-        self.assertEqual(response.url, reverse('home'))
+        self.assertEqual(response.url, reverse('contacts'))
         self.assertTrue(ContactRequest.objects.exists())
         cr = ContactRequest.objects.first()
         self.assertEqual(cr.name, 'Test')
@@ -476,3 +526,1599 @@ class ViewTestCase(BaseTestCase):
         self.assertFalse(ContactRequest.objects.exists())
         self.assertIn('form', response.context)
         self.assertTrue(response.context['form'].errors)
+
+
+class DatabaseSettingsTest(TestCase):
+    """
+    Тесты для настроек соединений с БД и их статистики.
+    """
+
+    def test_pool_size_limited_by_server_budget(self):
+        """Тест расчета пула: не больше потоков + 1 и не больше доли лимита сервера на воркер."""
+        self.assertEqual(pool_size(workers=3, threads=4, max_connections=100, reserved=10), 5)
+        self.assertEqual(pool_size(workers=8, threads=4, max_connections=30, reserved=10), 2)
+        self.assertEqual(pool_size(workers=50, threads=1, max_connections=20, reserved=10), 1)
+
+    def test_build_database_with_pool(self):
+        """Тест psycopg 3: пул вместо постоянных соединений, размер из WEB_CONCURRENCY."""
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '4', 'GUNICORN_THREADS': '2'}):
+            config = build_database('db', 'user', 'pass', 'localhost', '5432', driver='psycopg-pool')
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 3)
+        self.assertEqual(config['OPTIONS']['pool']['min_size'], 1)
+
+    def test_build_database_persistent_for_psycopg2(self):
+        """Тест psycopg2: постоянные соединения с проверкой живости, без пула."""
+        with mock.patch.dict(os.environ, {'DB_CONN_MAX_AGE': '300'}):
+            config = build_database('db', 'user', 'pass', 'localhost', '5432', driver='psycopg2')
+        self.assertEqual(config['CONN_MAX_AGE'], 300)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', config['OPTIONS'])
+
+    def test_connection_stats_view_requires_staff(self):
+        """Тест статистики соединений: доступна только из админки."""
+        url = reverse('custom_admin:db_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['mode'], connection_stats()['mode'])
+
+
+class StaticFilesStorageTest(TestCase):
+    """
+    Тесты для storage статики: минификация, хеширование и предсжатие.
+    """
+
+    def setUp(self):
+        self.source_dir = tempfile.TemporaryDirectory()
+        self.static_root = tempfile.TemporaryDirectory()
+        self.source = FileSystemStorage(location=self.source_dir.name)
+        self.storage = CompressedManifestStaticFilesStorage(location=self.static_root.name)
+
+        css = '/* Карточки */\n.card {\n    color: red;\n    margin: 0 auto;\n}\n' * 40
+        css += '.dot {\n    background: url("../img/dot.png");\n}\n'
+        self.source.save('css/site.css', ContentFile(css.encode()))
+        self.source.save('img/dot.png', ContentFile(b'png'))
+
+    def tearDown(self):
+        self.source_dir.cleanup()
+        self.static_root.cleanup()
+
+    def collect(self):
+        """Повторяет collectstatic: копирует исходники в STATIC_ROOT и запускает post_process."""
+        paths = {}
+        for name in ('css/site.css', 'img/dot.png'):
+            with self.source.open(name) as source:
+                self.storage.save(name, source)
+            paths[name] = (self.source, name)
+        return list(self.storage.post_process(paths))
+
+    def test_css_is_hashed_and_precompressed(self):
+        """Тест: хешированный CSS ссылается на хешированные файлы, рядом лежат .gz/.br."""
+        self.collect()
+        hashed_name = self.storage.stored_name('css/site.css')
+        self.assertRegex(hashed_name, r'^css/site\.[0-9a-f]{12}\.css$')
+
+        with self.storage.open(hashed_name) as hashed_file:
+            content = hashed_file.read()
+        self.assertIn(self.storage.stored_name('img/dot.png').split('/')[-1].encode(), content)
+
+        with self.storage.open(hashed_name + '.gz') as gz_file:
+            self.assertEqual(gzip.decompress(gz_file.read()), content)
+        self.assertEqual(self.storage.exists(hashed_name + '.br'), brotli is not None)
+        self.assertFalse(self.storage.exists(self.storage.stored_name('img/dot.png') + '.gz'))
+
+    @skipUnless(cssmin, 'rcssmin не установлен')
+    def test_css_is_minified_before_hashing(self):
+        """Тест: в хешированной версии нет комментариев и лишних пробелов."""
+        self.collect()
+        with self.storage.open(self.storage.stored_name('css/site.css')) as hashed_file:
+            content = hashed_file.read().decode()
+        self.assertNotIn('Карточки', content)
+        self.assertNotIn('\n    ', content)
+        self.assertLess(len(content), self.source.size('css/site.css'))
+
+
+class CriticalCssTest(TestCase):
+    """
+    Тесты для извлечения и встраивания критического CSS.
+    """
+
+    css = """
+        /* Шапка */
+        .hero { height: 100vh; animation: fade 1s; }
+        .hero:hover { opacity: 0.9; }
+        .footer, .hero-title { color: red; }
+        #unused, table td { color: blue; }
+        [data-aos] { opacity: 0; }
+        @media (max-width: 767px) { .hero { height: 50vh; } .card { margin: 0; } }
+        @keyframes fade { from { opacity: 0; } to { opacity: 1; } }
+        @keyframes spin { to { transform: rotate(360deg); } }
+    """
+
+    def test_extract_keeps_only_used_rules(self):
+        """Тест: остаются правила для классов разметки, @media и используемые @keyframes."""
+        html = '<section class="hero {% if x %}dark{% endif %}"><h1 class="hero-title">{{ title }}</h1></section>'
+        critical = extract_critical_css(self.css, html)
+        self.assertIn('.hero{height: 100vh', critical)
+        self.assertIn('.hero-title{color: red;}', critical)
+        self.assertIn('@media (max-width: 767px){.hero{height: 50vh;}}', critical)
+        self.assertIn('@keyframes fade', critical)
+        for unused in ('.footer', ':hover', '#unused', 'td', '[data-aos]', '.card', 'spin', 'Шапка'):
+            self.assertNotIn(unused, critical)
+
+    def test_extract_matches_attribute_selectors(self):
+        """Тест: селекторы атрибутов сохраняются, если атрибут есть в разметке."""
+        critical = extract_critical_css(self.css, '<div class="card" data-aos="fade-up"></div>')
+        self.assertIn('[data-aos]{opacity: 0;}', critical)
+
+    def test_tag_falls_back_to_blocking_stylesheet(self):
+        """Тест: без собранного файла тег подключает styles.css обычной ссылкой."""
+        html = critical_css('missing-page')
+        self.assertIn('rel="stylesheet"', html)
+        self.assertIn('css/styles.css', html)
+        self.assertNotIn('<style>', html)
+
+    def test_tag_inlines_critical_css(self):
+        """Тест: собранный CSS встраивается, а styles.css загружается через preload."""
+        with mock.patch('core.templatetags.critical_css.load_critical_css', return_value='.hero{color:red}'):
+            html = critical_css('home')
+        self.assertIn('<style>.hero{color:red}</style>', html)
+        self.assertIn('rel="preload"', html)
+        self.assertIn('<noscript>', html)
+
+    def test_command_includes_card_templates(self):
+        """Тест: разметка карточек из {% cards %} и фильтры каталога попадают в критический CSS."""
+        with tempfile.TemporaryDirectory() as output:
+            call_command('build_critical_css', output=output, stdout=StringIO())
+            with open(os.path.join(output, 'painting_list.css'), encoding='utf-8') as file:
+                critical = file.read()
+        self.assertIn('.painting-card', critical)
+        self.assertIn('.filter-chip', critical)
+
+
+class ImageMetadataTest(BaseTestCase):
+    """
+    Тесты для плейсхолдеров и доминирующего цвета изображений.
+    """
+
+    def test_dominant_color_picks_most_frequent_color(self):
+        """Тест: доминирующий цвет — самый частый, а не средний."""
+        img = Image.new('RGB', (100, 100), color=(20, 60, 200))
+        img.paste((250, 10, 10), (0, 0, 30, 100))
+        self.assertEqual(dominant_color(img), '#143cc8')
+
+    def test_placeholder_is_tiny_webp(self):
+        """Тест: плейсхолдер — WEBP шириной 16 пикселей в виде data URI."""
+        uri = placeholder_data_uri(Image.new('RGB', (1600, 900), color='green'))
+        self.assertTrue(uri.startswith('data:image/webp;base64,'))
+        self.assertLess(len(uri), 300)
+
+    def test_models_store_metadata(self):
+        """Тест: метаданные заполняются при обработке и очищаются вместе с изображением."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+        )
+        self.assertTrue(painting.placeholder.startswith('data:image/webp;base64,'))
+        self.assertRegex(painting.dominant_color, r'^#f[0-9a-f]0[0-9a-f]0[0-9a-f]$')
+
+        post = BlogPost.objects.create(title='Post', content='Text', cover_image=self.create_sample_image())
+        self.assertTrue(post.placeholder)
+        post.cover_image = None
+        post.save()
+        self.assertEqual((post.placeholder, post.dominant_color), ('', ''))
+
+    def test_backfill_command_fills_empty_metadata(self):
+        """Тест: команда backfill_image_metadata заполняет записи без метаданных."""
+        image = BlogPostImage.objects.create(
+            post=BlogPost.objects.create(title='Post', content='Text'), image=self.create_sample_image()
+        )
+        BlogPostImage.objects.filter(pk=image.pk).update(placeholder='', dominant_color='')
+        call_command('backfill_image_metadata', stdout=StringIO())
+        image.refresh_from_db()
+        self.assertTrue(image.placeholder.startswith('data:image/webp;base64,'))
+        self.assertTrue(image.dominant_color)
+
+    def test_templates_inline_placeholder(self):
+        """Тест: каталог встраивает цвет и плейсхолдер в стиль изображения."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+        )
+        response = self.client.get(reverse('painting_list'))
+        self.assertContains(response, f'background: {painting.dominant_color} url(data:image/webp;base64,')
+
+    def test_models_store_dimensions_and_sizes(self):
+        """Тест: размеры, объем и MIME-тип оригинала и версий сохраняются без повторного чтения файлов."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image(width=1000, height=500)
+        )
+        self.assertEqual((painting.image_width, painting.image_height, painting.image_mime), (1000, 500, 'image/jpeg'))
+        self.assertEqual((painting.small_image_width, painting.small_image_height), (400, 300))
+        self.assertEqual((painting.medium_image_width, painting.medium_image_height), (800, 600))
+        self.assertEqual((painting.large_image_width, painting.large_image_height), (1000, 500))
+        self.assertEqual(painting.large_image_mime, 'image/webp')
+        self.assertEqual(painting.small_image_bytes, painting.small_image.size)
+
+        artist = Artist.objects.create(name='Artist', photo=self.create_sample_image(width=1600, height=1200))
+        self.assertEqual((artist.photo_width, artist.photo_height, artist.photo_mime), (800, 600, 'image/webp'))
+        self.assertEqual(artist.photo_bytes, artist.photo.size)
+
+    def test_backfill_command_fills_dimensions(self):
+        """Тест: команда заполняет размеры версий, которых нет в БД."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+        )
+        expected = (painting.medium_image_width, painting.medium_image_height, painting.medium_image_bytes)
+        Painting.objects.filter(pk=painting.pk).update(medium_image_width=None, medium_image_height=None,
+                                                       medium_image_bytes=None, medium_image_mime='')
+        call_command('backfill_image_metadata', stdout=StringIO())
+        painting.refresh_from_db()
+        self.assertEqual((painting.medium_image_width, painting.medium_image_height, painting.medium_image_bytes),
+                         expected)
+        self.assertEqual(painting.medium_image_mime, 'image/webp')
+
+    def test_templates_emit_dimensions(self):
+        """Тест: каталог выводит width/height изображений из БД, не открывая файлы."""
+        Painting.objects.create(title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image())
+        with mock.patch('PIL.Image.open', side_effect=AssertionError('файл не должен открываться')):
+            response = self.client.get(reverse('painting_list'))
+        self.assertContains(response, 'width="400" height="300"')
+
+
+class DeepZoomTilesTest(BaseTestCase):
+    """
+    Тесты для пирамиды тайлов картины.
+    """
+
+    def test_pyramid_levels_and_tiles(self):
+        """Тест: уровни от 1x1 до оригинала, тайлы 256px с перекрытием, дескриптор DZI."""
+        with tempfile.TemporaryDirectory() as location:
+            storage = FileSystemStorage(location=location)
+            count = build_pyramid(Image.new('RGB', (600, 300), color='blue'), storage, 'tiles')
+
+            # Уровень 10 (600x300): 3x2 тайла, уровень 9 (300x150): 2x1, уровни 0-8 — по одному тайлу.
+            self.assertEqual(count, 6 + 2 + 9)
+            with Image.open(storage.path('tiles/image_files/10/0_0.webp')) as tile:
+                self.assertEqual(tile.size, (257, 257))
+            with Image.open(storage.path('tiles/image_files/10/2_1.webp')) as tile:
+                self.assertEqual(tile.size, (89, 45))
+            with Image.open(storage.path('tiles/image_files/0/0_0.webp')) as tile:
+                self.assertEqual(tile.size, (1, 1))
+            with storage.open('tiles/image.dzi') as descriptor:
+                self.assertIn(b'<Size Width="600" Height="300"/>', descriptor.read())
+
+    def test_save_schedules_background_build(self):
+        """Тест: сохранение картины ставит нарезку тайлов после коммита, флаг готовности сброшен."""
+        with mock.patch('core.tiles.threading') as threading:
+            with self.captureOnCommitCallbacks() as callbacks:
+                painting = Painting.objects.create(
+                    title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+                )
+            threading.Thread.assert_not_called()
+            for callback in callbacks:
+                callback()
+        threading.Thread.assert_called_once()
+        self.assertEqual(threading.Thread.call_args.kwargs['args'], (painting.pk,))
+        self.assertFalse(painting.tiles_ready)
+
+    def test_edit_without_new_image_keeps_files_and_tiles(self):
+        """Тест: правка названия не пересоздает версии и не перестраивает тайлы."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+        )
+        Painting.objects.filter(pk=painting.pk).update(tiles_ready=True)
+        names = [painting.image.name, painting.small_image.name, painting.medium_image.name, painting.large_image.name]
+
+        painting = Painting.objects.get(pk=painting.pk)
+        painting.title = 'Renamed Painting'
+        with mock.patch('core.models.schedule_tiles') as schedule, mock.patch('core.models.delete_tiles') as delete:
+            painting.save()
+        schedule.assert_not_called()
+        delete.assert_not_called()
+        painting.refresh_from_db()
+        self.assertTrue(painting.tiles_ready)
+        self.assertEqual(
+            [painting.image.name, painting.small_image.name, painting.medium_image.name, painting.large_image.name], names
+        )
+        self.assertEqual(default_storage.listdir('paintings/small')[1], [os.path.basename(names[1])])
+
+    def test_build_marks_ready_and_delete_removes_tiles(self):
+        """Тест: после нарезки лайтбокс использует тайлы, удаление картины удаляет каталог тайлов."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+        )
+        self.assertGreater(build_painting_tiles(painting.pk), 0)
+        painting.refresh_from_db()
+        self.assertTrue(painting.tiles_ready)
+
+        response = self.client.get(reverse('painting_detail', kwargs={'slug': painting.slug}))
+        self.assertContains(response, f'data-tiles-url="{painting.tiles_url}"')
+        self.assertContains(response, 'js/deepzoom.js')
+
+        tiles_path = default_storage.path(tiles_dir(painting.pk))
+        self.assertTrue(os.path.isdir(tiles_path))
+        painting.delete()
+        self.assertFalse(os.path.exists(tiles_path))
+
+
+class ChunkedUploadTest(BaseTestCase):
+    """
+    Тесты для загрузки изображений по частям из админки.
+    """
+
+    def setUp(self):
+        """
+        Временный каталог для частей и вход под администратором.
+        """
+        self.upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.upload_dir.cleanup)
+        settings_override = override_settings(CHUNKED_UPLOAD_DIR=self.upload_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+
+    def create_upload(self, size):
+        """
+        Создает загрузку и возвращает ее адрес.
+        """
+        response = self.client.post(
+            reverse('custom_admin:chunked_upload_create'),
+            HTTP_UPLOAD_LENGTH=str(size), HTTP_UPLOAD_METADATA='filename dGVzdC5wbmc=',  # test.png
+        )
+        self.assertEqual(response.status_code, 201)
+        return response['Location']
+
+    def patch(self, url, offset, data):
+        """
+        Отправляет очередную часть загрузки.
+        """
+        return self.client.generic(
+            'PATCH', url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def sample_png(self):
+        """
+        Возвращает байты PNG-изображения.
+        """
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800), color='green').save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def test_upload_in_chunks_and_resume(self):
+        """Тест: части дописываются последовательно, HEAD возвращает смещение, устаревшее смещение — 409."""
+        data = self.sample_png()
+        url = self.create_upload(len(data))
+        middle = len(data) // 2
+
+        self.assertEqual(self.patch(url, 0, data[:middle]).status_code, 204)
+        self.assertEqual(self.client.head(url)['Upload-Offset'], str(middle))
+        conflict = self.patch(url, 0, data[:middle])
+        self.assertEqual(conflict.status_code, 409)
+        self.assertEqual(conflict['Upload-Offset'], str(middle))
+
+        response = self.patch(url, middle, data[middle:])
+        self.assertEqual(response['Upload-Offset'], str(len(data)))
+        upload = ChunkedUpload.objects.get()
+        self.assertTrue(upload.is_complete)
+        self.assertEqual(upload.mime, 'image/png')
+        with open(upload.path, 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def test_rejects_non_image_by_header(self):
+        """Тест: файл, не являющийся изображением, отклоняется по заголовку и удаляется."""
+        url = self.create_upload(1024 * 1024)
+        response = self.patch(url, 0, b'not an image' * 30000)
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertEqual(os.listdir(self.upload_dir.name), [])
+
+    def test_other_staff_cannot_access_upload(self):
+        """Тест: чужая загрузка для другого сотрудника не существует — HEAD, PATCH и DELETE отвечают 404."""
+        data = self.sample_png()
+        url = self.create_upload(len(data))
+        other = get_user_model().objects.create_superuser('editor', 'editor@example.com', 'password')
+        self.client.force_login(other)
+
+        self.assertEqual(self.client.head(url).status_code, 404)
+        self.assertEqual(self.patch(url, 0, data).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 404)
+        self.assertEqual(ChunkedUpload.objects.get().offset, 0)
+
+    def test_admin_form_rejects_other_staff_upload(self):
+        """Тест: идентификатор чужой загрузки в форме картины — ошибка поля, загрузка остается владельцу."""
+        data = self.sample_png()
+        url = self.create_upload(len(data))
+        self.patch(url, 0, data)
+        upload = ChunkedUpload.objects.get()
+        other = get_user_model().objects.create_superuser('editor', 'editor@example.com', 'password')
+        self.client.force_login(other)
+
+        response = self.client.post(reverse('custom_admin:core_painting_add'), {
+            'title': 'Large painting', 'slug': 'large-painting', 'description': '',
+            'creation_date': '2023-01-01', 'price': '', 'image_upload': str(upload.pk),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('image', response.context['adminform'].form.errors)
+        self.assertFalse(Painting.objects.exists())
+        self.assertTrue(ChunkedUpload.objects.filter(pk=upload.pk).exists())
+        self.assertTrue(os.path.exists(upload.path))
+
+    def test_admin_form_closes_upload_on_errors(self):
+        """Тест: при ошибке в форме файл загрузки закрывается, а загрузка остается для повторной отправки."""
+        data = self.sample_png()
+        url = self.create_upload(len(data))
+        self.patch(url, 0, data)
+        upload = ChunkedUpload.objects.get()
+        files = []
+
+        def record(upload):
+            files.append(open_upload(upload))
+            return files[-1]
+
+        with mock.patch('core.admin.open_upload', side_effect=record):
+            response = self.client.post(reverse('custom_admin:core_painting_add'), {
+                'title': '', 'slug': 'large-painting', 'description': '',
+                'creation_date': '2023-01-01', 'price': '', 'image_upload': str(upload.pk),
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('title', response.context['adminform'].form.errors)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].closed)
+        self.assertTrue(ChunkedUpload.objects.filter(pk=upload.pk).exists())
+        self.assertTrue(os.path.exists(upload.path))
+
+    def test_admin_form_attaches_upload(self):
+        """Тест: форма картины в админке берет оригинал из завершенной загрузки и удаляет временный файл."""
+        data = self.sample_png()
+        url = self.create_upload(len(data))
+        self.patch(url, 0, data)
+        upload = ChunkedUpload.objects.get()
+
+        response = self.client.post(reverse('custom_admin:core_painting_add'), {
+            'title': 'Большая картина', 'slug': 'bolshaya-kartina', 'description': '',
+            'creation_date': '2023-01-01', 'price': '', 'image_upload': str(upload.pk),
+        })
+        self.assertEqual(response.status_code, 302)
+        painting = Painting.objects.get()
+        self.assertEqual((painting.image_width, painting.image_height), (1200, 800))
+        self.assertTrue(painting.large_image)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(os.path.exists(upload.path))
+
+
+class ImageGuardTest(BaseTestCase):
+    """
+    Тесты для проверки бюджета обработки изображений.
+    """
+
+    @override_settings(IMAGE_MAX_PIXELS=100_000)
+    def test_rejects_by_header(self):
+        """Тест: изображение больше бюджета отклоняется ошибкой поля до декодирования."""
+        painting = Painting(title='Огромная картина', creation_date='2023-01-01', image=self.create_sample_image())
+        with mock.patch('core.image_guard.render_image') as render:
+            with self.assertRaises(ValidationError) as context:
+                painting.full_clean()
+        self.assertIn('image', context.exception.message_dict)
+        render.assert_not_called()
+
+    def test_rejects_unsupported_format(self):
+        """Тест: формат вне списка разрешенных отклоняется, позиция чтения файла восстанавливается."""
+        file = self.create_sample_image(format='GIF')
+        with self.assertRaises(ValidationError) as context:
+            check_image(file)
+        self.assertEqual(context.exception.code, 'invalid_format')
+        self.assertEqual(file.tell(), 0)
+
+    @override_settings(IMAGE_SUBPROCESS_PIXELS=0)
+    def test_heavy_image_processed_in_subprocess(self):
+        """Тест: версии тяжелого изображения создаются в отдельном процессе с тем же результатом."""
+        with mock.patch('core.image_guard.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as executor:
+            painting = Painting.objects.create(
+                title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image(1000, 500)
+            )
+        executor.assert_called_once()
+        self.assertEqual((painting.image_width, painting.image_height), (1000, 500))
+        self.assertEqual((painting.small_image_width, painting.small_image_height), (400, 300))
+        self.assertEqual(painting.large_image_width, 1000)
+        self.assertTrue(painting.placeholder.startswith('data:image/webp;base64,'))
+
+    def test_heavy_image_tiles_built_in_subprocess(self):
+        """Тест: тайлы тяжелого изображения нарезаются в отдельном процессе, результат тот же."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image(600, 300)
+        )
+        with override_settings(IMAGE_SUBPROCESS_PIXELS=0), \
+                mock.patch('core.image_guard.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as executor, \
+                mock.patch('core.tiles.build_pyramid') as build_in_process:
+            self.assertEqual(build_painting_tiles(painting.pk), 6 + 2 + 9)
+        executor.assert_called_once()
+        build_in_process.assert_not_called()
+        with default_storage.open(f'{tiles_dir(painting.pk)}/image_files/10/2_1.webp') as file, Image.open(file) as tile:
+            self.assertEqual(tile.size, (89, 45))
+        with default_storage.open(f'{tiles_dir(painting.pk)}/image.dzi') as descriptor:
+            self.assertIn(b'<Size Width="600" Height="300"/>', descriptor.read())
+
+
+class SiteExportTest(BaseTestCase):
+    """
+    Тесты для экспорта публичных страниц в HTML.
+    """
+
+    def setUp(self):
+        """
+        Временный каталог экспорта и картина для страниц каталога.
+        """
+        self.export_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.export_dir.cleanup)
+        self.painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+        )
+
+    def read_page(self, *parts):
+        """
+        Возвращает содержимое экспортированной страницы.
+        """
+        with open(os.path.join(self.export_dir.name, *parts, 'index.html'), encoding='utf-8') as file:
+            return file.read()
+
+    def test_exports_public_pages_incrementally(self):
+        """Тест: страницы записываются в <путь>/index.html, повторный экспорт не перезаписывает файлы."""
+        stats = export_site(root=self.export_dir.name, workers=1)
+        self.assertEqual(stats, {'written': 5, 'unchanged': 0, 'removed': 0, 'failed': 0})
+        self.assertIn('Test Painting', self.read_page('paintings', 'test-painting'))
+        self.assertIn('Test Painting', self.read_page('paintings'))
+        self.assertTrue(os.path.exists(os.path.join(self.export_dir.name, 'index.html')))
+        self.assertIn('name="csrfmiddlewaretoken" value=""', self.read_page('contacts'))  # Токен — из /contacts/state/
+
+        stats = export_site(root=self.export_dir.name, workers=1)
+        self.assertEqual((stats['written'], stats['unchanged']), (0, 5))
+
+    def test_removes_pages_of_deleted_paintings(self):
+        """Тест: страница удаленной картины удаляется вместе с каталогом и записью манифеста."""
+        export_site(root=self.export_dir.name, workers=1)
+        self.painting.delete()
+        stats = export_site(root=self.export_dir.name, workers=1)
+        self.assertEqual(stats['removed'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.export_dir.name, 'paintings', 'test-painting')))
+        with open(os.path.join(self.export_dir.name, MANIFEST_NAME), encoding='utf-8') as file:
+            self.assertNotIn('/paintings/test-painting/', file.read())
+
+    def test_save_schedules_export_of_affected_pages(self):
+        """Тест: сохранение картины ставит экспорт после коммита, только если задан каталог экспорта."""
+        with mock.patch('core.site_export.threading.Thread') as thread:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.painting.save()
+        thread.assert_not_called()
+
+        with override_settings(SITE_EXPORT_DIR=self.export_dir.name), \
+                mock.patch('core.site_export._running', False), mock.patch('core.site_export._pending', set()):
+            with mock.patch('core.site_export.threading.Thread') as thread:
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.painting.save()
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+
+class ApiTest(BaseTestCase):
+    """
+    Тесты для JSON API только для чтения.
+    """
+
+    def setUp(self):
+        """
+        Три картины, две из них с одной датой (порядок между ними задает id), и пост с изображением.
+        """
+        self.paintings = [
+            Painting.objects.create(title=title, creation_date=date, is_featured=True, image=self.create_sample_image())
+            for title, date in (('First', '2023-01-01'), ('Second', '2023-02-01'), ('Third', '2023-02-01'))
+        ]
+        self.post = BlogPost.objects.create(title='Post', content='Content')
+        BlogPostImage.objects.create(post=self.post, image=self.create_sample_image())
+
+    def test_sparse_fields_and_cursor_pagination(self):
+        """Тест: в ответе только запрошенные поля, страницы по курсору идут без пропусков и повторов."""
+        url = reverse('api_painting_list') + '?fields=slug,medium_image&limit=2'
+        first = self.client.get(url).json()
+        self.assertEqual(set(first['results'][0]), {'slug', 'medium_image'})
+        self.assertEqual(first['results'][0]['medium_image']['width'], 800)
+        second = self.client.get(first['next']).json()
+        self.assertIsNone(second['next'])
+        slugs = [item['slug'] for item in first['results'] + second['results']]
+        self.assertEqual(slugs, ['third', 'second', 'first'])
+
+    def test_unknown_field_and_bad_cursor(self):
+        """Тест: неизвестное поле и некорректный курсор — ответ 400 с описанием ошибки."""
+        response = self.client.get(reverse('api_painting_list') + '?fields=slug,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['error'])
+        self.assertEqual(self.client.get(reverse('api_painting_list') + '?cursor=xyz').status_code, 400)
+        self.assertEqual(self.client.get(reverse('api_painting_detail', args=['missing'])).status_code, 404)
+
+    def test_etag_returns_not_modified(self):
+        """Тест: повторный запрос с If-None-Match получает 304, после изменения — новые данные."""
+        url = reverse('api_painting_detail', args=['first'])
+        response = self.client.get(url)
+        self.assertEqual(response.json()['title'], 'First')
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        Painting.objects.filter(pk=self.paintings[0].pk).update(title='Renamed')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_posts_attach_images_in_one_query(self):
+        """Тест: изображения постов выбираются одним запросом на страницу."""
+        BlogPost.objects.create(title='Other', content='Content')
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('api_post_list') + '?fields=title,images').json()
+        self.assertEqual(len(queries), 2)
+        images = {item['title']: item['images'] for item in data['results']}
+        self.assertEqual(images['Other'], [])
+        self.assertEqual(len(images['Post']), 1)
+        self.assertTrue(images['Post'][0]['image']['url'].startswith(settings.MEDIA_URL))
+
+    def test_home_carousel_uses_api_format(self):
+        """Тест: данные карусели на главной в формате API, без HTML-экранирования внутри JSON."""
+        Painting.objects.create(
+            title='<b>Fourth</b>', creation_date='2023-03-01', is_featured=True, image=self.create_sample_image()
+        )
+        response = self.client.get(reverse('home'))
+        carousel = response.context['carousel_paintings']
+        self.assertEqual(carousel[0]['url'], reverse('painting_detail', args=[carousel[0]['slug']]))
+        self.assertEqual(set(carousel[0]['medium_image']), {'url', 'width', 'height'})
+        self.assertContains(response, 'id="featured-paintings-data"')
+        self.assertNotContains(response, '<b>Fourth</b>')
+
+
+class CardCacheTest(BaseTestCase):
+    """
+    Тесты для кэша HTML-карточек картин и постов.
+    """
+
+    def setUp(self):
+        """
+        Пустой кэш и картина для каталога.
+        """
+        cache.clear()
+        self.painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', price=1000, image=self.create_sample_image()
+        )
+
+    def test_cards_are_cached_and_invalidated_on_save(self):
+        """Тест: повторный показ каталога читает карточку из кэша, сохранение картины меняет ее ключ."""
+        card = CARDS['painting']
+        hits, misses = card.hits, card.misses
+        self.client.get(reverse('painting_list'))
+        response = self.client.get(reverse('painting_list'))
+        self.assertContains(response, 'Test Painting')
+        self.assertEqual((card.hits - hits, card.misses - misses), (1, 1))
+
+        self.painting.title = 'Renamed Painting'
+        self.painting.save()
+        response = self.client.get(reverse('painting_list'))
+        self.assertContains(response, 'Renamed Painting')
+        self.assertNotContains(response, 'Test Painting')
+        self.assertEqual(card.misses - misses, 2)
+
+    def test_post_images_loaded_only_for_missing_cards(self):
+        """Тест: изображения поста запрашиваются только при рендеринге карточки, новое изображение обновляет ее."""
+        post = BlogPost.objects.create(title='Post', content='Content')
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(reverse('blog_list'))
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(reverse('blog_list'))
+        image_queries = lambda queries: [query for query in queries if 'core_blogpostimage' in query['sql']]
+        self.assertEqual((len(image_queries(first)), len(image_queries(second))), (1, 0))
+
+        BlogPostImage.objects.create(post=post, image=self.create_sample_image())
+        response = self.client.get(reverse('blog_list'))
+        self.assertContains(response, 'blog/images/')
+
+    def test_card_stats_view_requires_staff(self):
+        """Тест статистики кэша карточек: доступна только из админки, содержит долю попаданий."""
+        url = reverse('custom_admin:card_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.get(reverse('painting_list'))
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        stats = self.client.get(url).json()
+        self.assertIn('hit_rate', stats['cards']['painting'])
+        self.assertGreater(stats['cards']['painting']['misses'], 0)
+
+
+class SingletonCacheTest(BaseTestCase):
+    """
+    Тесты для кэша записей-одиночек (художник, контакты сайта).
+    """
+
+    def setUp(self):
+        """
+        Контакты сайта со ссылками для футера.
+        """
+        self.site_contact = SiteContact.objects.create(email='site@example.com', vk_link='https://vk.com/test')
+
+    def test_cached_until_saved(self):
+        """Тест: повторное обращение без запроса к БД, сохранение записи сбрасывает кэш."""
+        self.assertEqual(get_singleton(SiteContact), self.site_contact)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_singleton(SiteContact).email, 'site@example.com')
+
+        self.site_contact.email = 'new@example.com'
+        self.site_contact.save()
+        self.assertEqual(get_singleton(SiteContact).email, 'new@example.com')
+
+    def test_version_key_invalidates_other_workers(self):
+        """Тест: изменение в обход сигналов видно только после смены версии (как в другом воркере)."""
+        get_singleton(SiteContact)
+        SiteContact.objects.update(email='other@example.com')
+        self.assertEqual(get_singleton(SiteContact).email, 'site@example.com')
+        invalidate_singleton(SiteContact)
+        self.assertEqual(get_singleton(SiteContact).email, 'other@example.com')
+
+        cache.clear()  # Потеря версии в кэше тоже приводит к перечитыванию
+        SiteContact.objects.update(email='third@example.com')
+        self.assertEqual(get_singleton(SiteContact).email, 'third@example.com')
+
+    def test_footer_links_without_queries(self):
+        """Тест: ссылки из контактов выводятся в футере любой страницы без лишних запросов."""
+        self.client.get(reverse('blog_list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog_list'))
+        self.assertContains(response, 'href="https://vk.com/test"')
+        self.assertContains(response, 'mailto:site@example.com')
+        self.assertFalse([query for query in queries if 'core_sitecontact' in query['sql']])
+
+
+class PopularityTest(BaseTestCase):
+    """
+    Тесты для счетчиков просмотров и топа популярных картин.
+    """
+
+    def setUp(self):
+        """
+        Две картины и пустые буфер просмотров и кэш.
+        """
+        cache.clear()
+        flush_views()
+        self.first = Painting.objects.create(title='First', creation_date='2023-01-01', image=self.create_sample_image())
+        self.second = Painting.objects.create(title='Second', creation_date='2023-02-01', image=self.create_sample_image())
+
+    def test_beacon_buffers_views_without_queries(self):
+        """Тест: маяк не обращается к БД, просмотры записываются одним UPDATE при сбросе буфера."""
+        url = reverse('painting_view_beacon', args=['second'])
+        with self.assertNumQueries(0):
+            for _ in range(3):
+                self.assertEqual(self.client.post(url).status_code, 204)
+        record_view('first')
+        record_view('missing')
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(flush_views(), 2)
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+        self.second.refresh_from_db()
+        self.assertEqual(self.second.views, 3)
+
+    def test_flush_after_interval(self):
+        """Тест: после интервала очередной просмотр записывает накопленное в БД."""
+        with override_settings(VIEW_COUNTER_FLUSH_INTERVAL=3600):
+            record_view('first')
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 0)
+        with override_settings(VIEW_COUNTER_FLUSH_INTERVAL=0):
+            record_view('first')
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.views, 2)
+
+    def test_popular_paintings_on_home(self):
+        """Тест: топ хранится в кэше и выводится на главной в порядке просмотров."""
+        for slug in ('first', 'second', 'second'):
+            record_view(slug)
+        flush_views()
+        self.assertEqual(cache.get(POPULAR_KEY), [self.second.pk, self.first.pk])
+        with self.assertNumQueries(1):
+            self.assertEqual(popular_paintings(), [self.second, self.first])
+
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Популярные работы')
+        self.assertEqual(response.context['popular_paintings'], [self.second, self.first])
+
+
+class CatalogFacetsTest(BaseTestCase):
+    """
+    Тесты для фасетного фильтра каталога.
+    """
+
+    def setUp(self):
+        """
+        Картины разных лет, цен и статуса, пустой кэш фасетов.
+        """
+        cache.clear()
+        for title, date, price, featured in (
+            ('Cheap', '2022-05-01', 3000, False),
+            ('Middle', '2023-05-01', 7000, True),
+            ('Private', '2023-06-01', None, True),
+        ):
+            Painting.objects.create(
+                title=title, creation_date=date, price=price, is_featured=featured, image=self.create_sample_image()
+            )
+
+    def titles(self, query=''):
+        response = self.client.get(reverse('painting_list') + query)
+        return [painting.title for painting in response.context['paintings']]
+
+    def test_filters(self):
+        """Тест: фильтры по году, цене, наличию и избранному; некорректные значения игнорируются."""
+        self.assertEqual(self.titles('?year=2023'), ['Private', 'Middle'])
+        self.assertEqual(self.titles('?price=5000-10000'), ['Middle'])
+        self.assertEqual(self.titles('?available=0'), ['Private'])
+        self.assertEqual(self.titles('?featured=1&available=1'), ['Middle'])
+        self.assertEqual(len(self.titles('?year=abc&price=1-2')), 3)
+        self.assertEqual(len(self.titles('?year=99999')), 3)  # Год вне диапазона дат
+        self.assertEqual(len(self.titles('?year=0')), 3)
+
+    def test_facet_counts_from_one_cached_query(self):
+        """Тест: счетчики считаются одним запросом, учитывают фильтры других групп и сбрасываются при изменении."""
+        with self.assertNumQueries(1):
+            facets = {facet['name']: facet['options'] for facet in build_facets({}, QueryDict())}
+        self.assertEqual([(option['label'], option['count']) for option in facets['Год']], [(2023, 2), (2022, 1)])
+        with self.assertNumQueries(0):
+            facets = build_facets({'year': 2023}, QueryDict('year=2023'))
+        availability = {option['label']: option['count'] for option in facets[2]['options']}
+        self.assertEqual(availability, {'В продаже': 1, 'Не продается': 1})
+        self.assertEqual(facets[0]['options'][0]['query'], '')  # Повторный выбор снимает фильтр
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Painting.objects.get(title='Cheap').delete()
+            self.assertIsNone(cache.get(FACETS_KEY))
+            build_facets({}, QueryDict())  # Другой запрос до коммита кэширует старые счетчики
+        self.assertIsNone(cache.get(FACETS_KEY))  # Сброшены еще раз после коммита
+
+    def test_filter_ui_and_pagination_links(self):
+        """Тест: страница выводит фасеты со счетчиками и кнопку сброса выбранных фильтров."""
+        response = self.client.get(reverse('painting_list') + '?year=2023&page=1')
+        self.assertContains(response, 'Сбросить фильтры')
+        self.assertContains(response, 'href="?year=2023&amp;price=5000-10000"')
+        self.assertEqual(response.context['filter_query'], 'year=2023&')
+
+
+class AutocompleteTest(BaseTestCase):
+    """
+    Тесты для подсказок поиска по префиксу названия.
+    """
+
+    def setUp(self):
+        """
+        Картина и пост блога, пустой кэш (индекс перестраивается при первом запросе).
+        """
+        cache.clear()
+        self.painting = Painting.objects.create(
+            title='Берёзы у реки', slug='berezy', creation_date='2023-05-01', image=self.create_sample_image()
+        )
+        self.post = BlogPost.objects.create(title='Новая выставка', slug='vystavka', content='Текст')
+
+    def titles(self, prefix):
+        return [entry['title'] for entry in suggest(prefix)]
+
+    def test_prefix_matching(self):
+        """Тест: поиск по началу названия и слов, с «е» вместо «ё» и латиницей; короткий префикс не ищется."""
+        self.assertEqual(self.titles('бер'), ['Берёзы у реки'])
+        self.assertEqual(self.titles('БЕРЕЗЫ У Р'), ['Берёзы у реки'])
+        self.assertEqual(self.titles('рек'), ['Берёзы у реки'])
+        self.assertEqual(self.titles('berez'), ['Берёзы у реки'])
+        self.assertEqual(self.titles('vyst'), ['Новая выставка'])
+        self.assertEqual(self.titles('б'), [])
+        self.assertEqual(suggest('выс')[0]['url'], f"{reverse('blog_list')}#post-{self.post.slug}")
+
+    def test_index_updates_without_queries(self):
+        """Тест: после построения индекса подсказки не обращаются к БД; сигналы обновляют индекс."""
+        self.titles('бер')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles('берез'), ['Берёзы у реки'])
+        self.painting.title = 'Сосны у реки'
+        self.painting.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles('бер'), [])
+            self.assertEqual(self.titles('сосн'), ['Сосны у реки'])
+        self.post.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles('нов'), [])
+
+        # Изменение в другом воркере меняет версию в общем кэше: индекс строится заново
+        cache.set(VERSION_KEY, 'other-worker')
+        with self.assertNumQueries(2):
+            self.assertEqual(self.titles('сосн'), ['Сосны у реки'])
+
+    def test_version_changes_again_after_commit(self):
+        """Тест: версия меняется еще раз после коммита, индекс текущего процесса при этом не перестраивается."""
+        self.titles('бер')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.painting.title = 'Сосны у реки'
+            self.painting.save()
+            # Другой воркер перестроил индекс до коммита и запомнил эту версию со старым названием
+            stale_version = cache.get(VERSION_KEY)
+        self.assertNotEqual(cache.get(VERSION_KEY), stale_version)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles('сосн'), ['Сосны у реки'])
+
+    def test_suggest_endpoint(self):
+        """Тест: эндпоинт возвращает подсказки в JSON; ссылка на картину ведет на ее страницу."""
+        response = self.client.get(reverse('api_suggest'), {'q': 'Берёз'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{
+            'kind': 'painting', 'title': 'Берёзы у реки',
+            'url': reverse('painting_detail', args=[self.painting.slug]),
+        }])
+        self.assertEqual(self.client.get(reverse('api_suggest')).json(), {'results': []})
+
+
+class BlogContentTest(BaseTestCase):
+    """
+    Тесты для подготовки текста постов блога при сохранении.
+    """
+
+    def test_render_content(self):
+        """Тест: абзацы, переносы строк, разметка и ссылки; HTML из текста экранируется."""
+        html = render_content(
+            'Первый **жирный** и *курсив*, `a*b*c`.\nСайт: https://example.com/?a=1&b=2.\n\n'
+            '## Раздел <b>\n- [ссылка](https://vk.com/page)\n- www.test.ru'
+        )
+        self.assertEqual(html, (
+            '<p>Первый <strong>жирный</strong> и <em>курсив</em>, <code>a*b*c</code>.<br>'
+            'Сайт: <a href="https://example.com/?a=1&amp;b=2">https://example.com/?a=1&amp;b=2</a>.</p>\n'
+            '<h4>Раздел &lt;b&gt;</h4><ul><li><a href="https://vk.com/page">ссылка</a></li>'
+            '<li><a href="http://www.test.ru">www.test.ru</a></li></ul>'
+        ))
+
+    def test_fields_computed_on_save(self):
+        """Тест: HTML, отрывок, число слов и время чтения сохраняются и пересчитываются при изменении текста."""
+        post = BlogPost.objects.create(title='Test Post', content='Осенний **этюд** у реки.')
+        self.assertEqual(post.content_html, '<p>Осенний <strong>этюд</strong> у реки.</p>')
+        self.assertEqual(post.excerpt, 'Осенний этюд у реки.')
+        self.assertEqual((post.word_count, post.reading_time), (4, 1))
+
+        post.content = ' '.join(['слово'] * 400)
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual((post.word_count, post.reading_time), (400, 3))
+        self.assertTrue(post.excerpt.endswith('слово…'))
+        self.assertEqual(len(post.excerpt.split()), 40)
+
+    def test_blog_list_uses_stored_html(self):
+        """Тест: лента выводит сохраненный HTML и время чтения, исходный текст из БД не загружается."""
+        BlogPost.objects.create(title='Test Post', content='Текст с **разметкой**.')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('blog_list'))
+        self.assertContains(response, '<p>Текст с <strong>разметкой</strong>.</p>', html=True)
+        self.assertContains(response, '1 мин чтения')
+        self.assertFalse(any('"core_blogpost"."content"' in query['sql'] for query in queries.captured_queries))
+
+    def test_render_blog_posts_command(self):
+        """Тест: команда пересчитывает только устаревшие посты."""
+        post = BlogPost.objects.create(title='Test Post', content='Старый текст')
+        BlogPost.objects.filter(pk=post.pk).update(content='Новый *текст*')
+        out = StringIO()
+        call_command('render_blog_posts', stdout=out)
+        self.assertIn('обновлено постов: 1', out.getvalue())
+        post.refresh_from_db()
+        self.assertEqual(post.content_html, '<p>Новый <em>текст</em></p>')
+        out = StringIO()
+        call_command('render_blog_posts', stdout=out)
+        self.assertIn('обновлено постов: 0', out.getvalue())
+
+
+class DuplicateImageTest(BaseTestCase):
+    """
+    Тесты для поиска повторных загрузок по перцептивному хешу.
+    """
+
+    def create_scan(self, seed, width=1000, height=750, quality=90):
+        """
+        Создает «скан» с плавным узором: одинаковый seed — то же изображение в другом размере и качестве.
+        """
+        pattern = np.random.default_rng(seed).integers(0, 256, (6, 8, 3), dtype=np.uint8)
+        image = Image.fromarray(pattern).resize((width, height), Image.Resampling.BICUBIC)
+        buffer = BytesIO()
+        image.save(buffer, format='JPEG', quality=quality)
+        return SimpleUploadedFile(f'scan-{seed}.jpg', buffer.getvalue(), 'image/jpeg')
+
+    def submit(self, image, mode=None):
+        data = {'title': 'Copy', 'slug': 'copy', 'creation_date': '2024-01-01'}
+        if mode:
+            data['duplicate_mode'] = mode
+        return PaintingAdminForm(data=data, files={'image': image})
+
+    def test_hash_survives_resize_and_search_uses_bands(self):
+        """Тест: хеш копии почти совпадает с оригиналом, поиск находит до 3 отличающихся бит одним запросом."""
+        original = hash_image(self.create_scan(1).file)
+        self.assertLessEqual(hamming_distance(original, hash_image(self.create_scan(1, 640, 480, 60).file)), 3)
+        self.assertGreater(hamming_distance(original, hash_image(self.create_scan(2).file)), 10)
+
+        painting = Painting.objects.create(title='Original', creation_date='2023-01-01', image=self.create_scan(1))
+        stored = ImageHash.objects.get(model_label='core.painting', object_id=painting.pk)
+        self.assertEqual(stored.hash, original)
+        near = f'{int(original, 16) ^ 0b111:016x}'  # 3 бита в одной части хеша
+        spread = f'{int(original, 16) ^ 0x0001000100010001:016x}'  # по биту в каждой части
+        with self.assertNumQueries(1):
+            self.assertEqual([(match.pk, match.distance) for match in ImageHash.objects.similar(near)],
+                             [(stored.pk, 3)])
+        self.assertEqual(ImageHash.objects.similar(spread), [])
+
+        painting.delete()
+        self.assertFalse(ImageHash.objects.exists())
+
+    def test_admin_warns_before_processing(self):
+        """Тест: форма админки сообщает о похожей картине до обработки, режим «загрузить» обрабатывает файл."""
+        Painting.objects.create(title='Original', creation_date='2023-01-01', image=self.create_scan(1))
+        form = self.submit(self.create_scan(1, 800, 600, 70))
+        with mock.patch('core.image_guard.render_image') as render:
+            self.assertFalse(form.is_valid())
+        render.assert_not_called()
+        self.assertIn('Похожее изображение уже загружено', form.errors['image'][0])
+        self.assertIn('«Original»', form.errors['image'][1])
+
+        self.assertTrue(self.submit(self.create_scan(2)).is_valid())  # Непохожее изображение
+        form = self.submit(self.create_scan(1, 800, 600, 70), mode='upload')
+        self.assertTrue(form.is_valid())
+        self.assertNotEqual(form.save().small_image.name, Painting.objects.get(title='Original').small_image.name)
+
+    def test_reuse_shares_files_until_last_owner_deleted(self):
+        """Тест: режим «использовать копию» берет файлы без обработки, файлы удаляются с последней картиной."""
+        original = Painting.objects.create(title='Original', creation_date='2023-01-01', image=self.create_scan(1))
+        form = self.submit(self.create_scan(1, 800, 600, 70), mode='reuse')
+        with mock.patch('core.image_guard.render_image') as render:
+            self.assertTrue(form.is_valid())
+            copy = form.save()
+        render.assert_not_called()
+        for field_name in ('image', 'small_image', 'medium_image', 'large_image'):
+            self.assertEqual(getattr(copy, field_name).name, getattr(original, field_name).name)
+        self.assertEqual(copy.small_image_width, 400)
+        self.assertEqual(copy.placeholder, original.placeholder)
+        self.assertTrue(ImageHash.objects.filter(model_label='core.painting', object_id=copy.pk).exists())
+
+        storage, name = original.small_image.storage, original.small_image.name
+        original.delete()
+        self.assertTrue(storage.exists(name))
+        copy.delete()
+        self.assertFalse(storage.exists(name))
+
+
+class ColorSearchTest(BaseTestCase):
+    """
+    Тесты для поиска картин по цвету.
+    """
+
+    def setUp(self):
+        """
+        Временный файл индекса сигнатур, синяя и красная картины.
+        """
+        index_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(index_dir.cleanup)
+        override = override_settings(COLOR_INDEX_PATH=os.path.join(index_dir.name, 'color_index.npy'))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.blue = Painting.objects.create(
+            title='Blue', creation_date='2023-01-01', image=self.create_color_image('#3a6ea5')
+        )
+        self.red = Painting.objects.create(
+            title='Red', creation_date='2024-01-01', image=self.create_color_image('#c0392b')
+        )
+
+    def create_color_image(self, color):
+        img = Image.new('RGB', (1000, 750), color=color)
+        img_io = BytesIO()
+        img.save(img_io, format='JPEG')
+        return SimpleUploadedFile('color.jpg', img_io.getvalue(), 'image/jpeg')
+
+    def test_signature_and_ranking(self):
+        """Тест: сигнатура считается по среднему изображению, картины упорядочены по близости к цвету."""
+        signature = np.frombuffer(Painting.objects.get(pk=self.blue.pk).color_signature, dtype='<f4')
+        self.assertEqual(signature.shape, (144,))
+        self.assertAlmostEqual(float(signature.sum()), 1, places=5)
+        self.assertEqual(rank_paintings('#3a6ea5'), [self.blue.pk])
+        self.assertEqual(rank_paintings('#b03a2e'), [self.red.pk])
+        self.assertEqual(rank_paintings('#4e8f3a'), [])
+
+    def test_index_is_memory_mapped_and_rebuilt_after_changes(self):
+        """Тест: матрица читается из файла через mmap, файл пересобирается только после изменения картин."""
+        index = get_index()
+        self.assertIsInstance(index, np.memmap)
+        self.assertEqual(sorted(index['id']), [self.blue.pk, self.red.pk])
+        mtime = os.stat(settings.COLOR_INDEX_PATH).st_mtime_ns
+        with self.assertNumQueries(1):
+            self.assertIs(get_index(), index)
+        self.assertEqual(os.stat(settings.COLOR_INDEX_PATH).st_mtime_ns, mtime)
+
+        self.red.image = self.create_color_image('#3a6ea5')
+        self.red.save()
+        self.assertEqual(rank_paintings('#3a6ea5'), [self.blue.pk, self.red.pk])
+        self.red.delete()
+        self.assertEqual(len(get_index()), 1)
+
+    def test_catalog_color_filter(self):
+        """Тест: каталог с параметром color выводит похожие картины, некорректный цвет игнорируется."""
+        response = self.client.get(reverse('painting_list') + '?color=%233A6EA5')
+        self.assertEqual(list(response.context['paintings']), [self.blue])
+        self.assertEqual(response.context['color'], '#3a6ea5')
+        self.assertContains(response, 'class="color-swatch active"')
+        self.assertContains(response, 'Сбросить фильтры')
+        response = self.client.get(reverse('painting_list') + '?color=c0392b&year=2023')
+        self.assertEqual(list(response.context['paintings']), [])
+        response = self.client.get(reverse('painting_list') + '?color=blue')
+        self.assertEqual(len(response.context['paintings']), 2)
+
+
+@override_settings(CONTACT_NOTIFY_EMAILS=[], TELEGRAM_BOT_TOKEN='token', TELEGRAM_CHAT_ID='42',
+                   OUTBOX_RETRY_DELAY=60, OUTBOX_MAX_ATTEMPTS=2)
+class OutboxTest(BaseTestCase):
+    """
+    Тесты для очереди уведомлений о заявках.
+    """
+
+    def setUp(self):
+        """
+        Контакты сайта с e-mail получателя писем о заявках.
+        """
+        cache.clear()
+        SiteContact.objects.create(email='artist@example.com')
+        invalidate_singleton(SiteContact)
+        self.data = {'name': 'Anna', 'email': 'anna@example.com', 'message': 'Hello'}
+
+    def test_form_saves_request_and_outbox_without_network(self):
+        """Тест: заявка и уведомления пишутся в одной транзакции, запрос формы ничего не отправляет."""
+        with mock.patch('core.outbox.urllib.request.urlopen') as urlopen:
+            response = self.client.post(reverse('contacts'), self.data)
+        self.assertEqual(response.status_code, 302)
+        urlopen.assert_not_called()
+        self.assertEqual(mail.outbox, [])
+        contact_request = ContactRequest.objects.get()
+        self.assertEqual(
+            sorted(contact_request.notifications.values_list('channel', 'recipient', 'status')),
+            [('email', 'artist@example.com', 'pending'), ('telegram', '42', 'pending')]
+        )
+
+        with mock.patch('core.views.enqueue_contact_request', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('contacts'), self.data)
+        self.assertEqual(ContactRequest.objects.count(), 1)
+
+    def test_delivers_emails_in_batches(self):
+        """Тест: команда отправляет все наступившие письма пачками и отмечает их отправленными."""
+        for index in range(3):
+            OutboxMessage.objects.create(channel=OutboxMessage.EMAIL, recipient=f'user{index}@example.com',
+                                         subject='Subject', body='Body')
+        with mock.patch('core.outbox.deliver_batch', wraps=deliver_batch) as batch:
+            self.assertEqual(deliver_pending(batch_size=2), {'sent': 3, 'retried': 0, 'failed': 0})
+        self.assertEqual(batch.call_count, 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['user0@example.com', 'user1@example.com', 'user2@example.com'])
+        self.assertFalse(OutboxMessage.objects.exclude(status=OutboxMessage.SENT).exists())
+
+        out = StringIO()
+        call_command('deliver_outbox', stdout=out)
+        self.assertIn('Отправлено: 0', out.getvalue())
+
+    def test_retries_with_backoff_then_fails(self):
+        """Тест: после ошибки попытка откладывается с растущей паузой, после лимита сообщение не доставлено."""
+        message = OutboxMessage.objects.create(channel=OutboxMessage.TELEGRAM, recipient='42', body='Body')
+        with mock.patch('core.outbox.urllib.request.urlopen', side_effect=OSError('timeout')) as urlopen, \
+                self.assertLogs('core.outbox', 'WARNING') as logs:
+            self.assertEqual(deliver_pending(), {'sent': 0, 'retried': 1, 'failed': 0})
+            message.refresh_from_db()
+            self.assertEqual((message.status, message.attempts), (OutboxMessage.PENDING, 1))
+            self.assertIn('timeout', message.last_error)
+            self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=50))
+            self.assertEqual(deliver_pending(), {'sent': 0, 'retried': 0, 'failed': 0})  # Пауза не истекла
+
+            OutboxMessage.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(deliver_pending(), {'sent': 0, 'retried': 0, 'failed': 1})
+        self.assertEqual(urlopen.call_count, 2)
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING', 'ERROR'])
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.FAILED)
+
+
+@override_settings(CONTACT_RATE_LIMIT_IP=(3, 60), CONTACT_RATE_LIMIT_EMAIL=(2, 60))
+class ContactRateLimitTest(BaseTestCase):
+    """
+    Тесты для ограничения частоты отправки формы обратной связи.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def post(self, email='anna@example.com', ip='10.0.0.1', **extra):
+        data = {'name': 'Anna', 'email': email, 'message': 'Hello', **extra}
+        return self.client.post(reverse('contacts'), data, HTTP_X_REAL_IP=ip)
+
+    def test_ip_limit_rejects_before_database(self):
+        """Тест: после исчерпания лимита IP запрос отклоняется с 429 без обращений к БД."""
+        for index in range(3):
+            self.assertEqual(self.post(email=f'user{index}@example.com').status_code, 302)
+        with self.assertNumQueries(0):
+            response = self.post(email='other@example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertContains(response, 'Слишком много сообщений', status_code=429)
+        self.assertEqual(self.post(email='other@example.com', ip='10.0.0.2').status_code, 302)
+        self.assertEqual(ContactRequest.objects.count(), 4)
+        self.assertEqual(shed_stats()['ip']['count'], 1)
+
+    def test_email_limit_and_refill(self):
+        """Тест: лимит по e-mail действует с разных IP, токены восстанавливаются со временем."""
+        self.assertEqual(self.post(ip='10.0.0.1').status_code, 302)
+        self.assertEqual(self.post(ip='10.0.0.2').status_code, 302)
+        self.assertEqual(self.post(email='ANNA@example.com', ip='10.0.0.3').status_code, 429)
+        self.assertEqual(shed_stats()['email']['count'], 1)
+        with mock.patch('core.ratelimit.time.time', return_value=time.time() + 30):
+            self.assertEqual(self.post(ip='10.0.0.4').status_code, 302)
+        self.assertEqual(ContactRequest.objects.count(), 3)
+
+    def test_honeypot_is_shed_silently(self):
+        """Тест: заполненное скрытое поле — ответ как при успехе, без записи и без расхода токенов."""
+        response = self.client.get(reverse('contacts'))
+        self.assertContains(response, 'name="website"')
+        with self.assertNumQueries(0):
+            response = self.post(website='http://spam.example.com')
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(ContactRequest.objects.exists())
+        self.assertEqual(shed_stats()['honeypot']['count'], 1)
+
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        stats = self.client.get(reverse('custom_admin:contact_stats')).json()
+        self.assertEqual({reason: value['count'] for reason, value in stats.items()},
+                         {'honeypot': 1, 'ip': 0, 'email': 0})
+
+
+class ContactStateTest(BaseTestCase):
+    """
+    Тесты для страницы контактов без CSRF-токена и запроса ее динамической части.
+    """
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_does_not_depend_on_session(self):
+        """Тест: страница контактов одинакова для всех посетителей и не ставит куки."""
+        first = self.client.get(reverse('contacts'))
+        self.assertNotIn('csrftoken', first.cookies)
+        self.assertNotIn('Cookie', first.get('Vary', ''))
+        self.assertContains(first, 'name="csrfmiddlewaretoken" value=""')
+        self.assertContains(first, f'data-state-url="{reverse("contacts_state")}"')
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get(reverse('contacts')).content, first.content)
+
+    def test_state_returns_token_and_flash_messages(self):
+        """Тест: токен из /contacts/state/ принимается формой, сообщение об отправке приходит один раз."""
+        client = self.client_class(enforce_csrf_checks=True)
+        state = client.get(reverse('contacts_state'))
+        self.assertIn('no-cache', state['Cache-Control'])
+        self.assertEqual(state.json()['messages'], [])
+        data = {'name': 'Anna', 'email': 'anna@example.com', 'message': 'Hello'}
+        self.assertEqual(client.post(reverse('contacts'), data).status_code, 403)
+
+        data['csrfmiddlewaretoken'] = state.json()['csrf_token']
+        response = client.post(reverse('contacts'), data)
+        self.assertRedirects(response, reverse('contacts'))
+        messages = client.get(reverse('contacts_state')).json()['messages']
+        self.assertEqual([message['level'] for message in messages], ['success'])
+        self.assertEqual(client.get(reverse('contacts_state')).json()['messages'], [])
+
+    def test_bound_form_keeps_inline_token(self):
+        """Тест: страница с ошибками формы (ответ Django, не экспорт) содержит токен сразу."""
+        response = self.client.post(reverse('contacts'), {'name': 'Anna', 'email': 'invalid', 'message': 'Hello'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="csrfmiddlewaretoken" value=""')
+
+
+class ContactExportTest(BaseTestCase):
+    """
+    Тесты для выгрузки заявок в CSV.
+    """
+
+    def setUp(self):
+        """
+        Заявки за два года (время в часовом поясе сайта); у одной текст похож на формулу.
+        """
+        for name, created_at, message in (
+            ('Anna', '2024-03-01T12:00:00+07:00', 'Hello'),
+            ('Boris', '2025-01-15T09:30:00+07:00', '=HYPERLINK("http://spam")'),
+            ('Vera', '2025-12-31T23:59:00+07:00', 'Line 1\nLine 2'),
+        ):
+            request = ContactRequest.objects.create(name=name, email=f'{name.lower()}@example.com', message=message)
+            ContactRequest.objects.filter(pk=request.pk).update(created_at=created_at)
+
+    def read_csv(self, lines):
+        import csv
+        return list(csv.reader(StringIO(''.join(lines).lstrip('\ufeff'))))
+
+    def test_stream_is_lazy_and_escapes_formulas(self):
+        """Тест: заголовок отдается без запроса к БД, строки — по порциям, формулы экранируются."""
+        lines = stream_csv(ContactRequest.objects.all(), chunk_size=2)
+        with self.assertNumQueries(0):
+            header = next(lines)
+        self.assertTrue(header.startswith('\ufeffДата,Имя'))
+        rows = self.read_csv([header, *lines])
+        self.assertEqual([row[1] for row in rows[1:]], ['Anna', 'Boris', 'Vera'])
+        self.assertEqual(rows[2][3], '\'=HYPERLINK("http://spam")')
+        self.assertEqual(rows[3][3], 'Line 1\nLine 2')
+
+    def test_command_filters_by_date_range(self):
+        """Тест: команда выгружает заявки за период включительно в файл или stdout."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'requests.csv')
+            out = StringIO()
+            call_command('export_contact_requests', '--from', '2025-01-01', '--to', '2025-12-31',
+                         '--output', path, stdout=out)
+            self.assertIn('Выгружено заявок: 2', out.getvalue())
+            with open(path, encoding='utf-8-sig', newline='') as file:
+                self.assertEqual([row[1] for row in self.read_csv(file)[1:]], ['Boris', 'Vera'])
+
+        out = StringIO()
+        call_command('export_contact_requests', '--to', '2024-12-31', stdout=out)
+        self.assertEqual([row[1] for row in self.read_csv(out.getvalue())], ['Имя', 'Anna'])
+        with self.assertRaisesMessage(CommandError, 'argument --from: некорректная дата 31.12.2025'):
+            call_command('export_contact_requests', '--from', '31.12.2025')
+
+    def test_admin_action_streams_csv(self):
+        """Тест: действие админки отдает выбранные заявки потоковым ответом с вложением."""
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        selected = ContactRequest.objects.filter(name__in=['Anna', 'Vera']).values_list('pk', flat=True)
+        response = self.client.post(reverse('custom_admin:core_contactrequest_changelist'), {
+            'action': 'export_csv', '_selected_action': list(selected),
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="contact-requests-', response['Content-Disposition'])
+        self.assertEqual(response['X-Accel-Buffering'], 'no')
+        rows = self.read_csv(chunk.decode() for chunk in response.streaming_content)
+        self.assertEqual([row[1] for row in rows[1:]], ['Anna', 'Vera'])
+
+
+class CatalogArchiveTest(BaseTestCase):
+    """
+    Тесты для резервной копии каталога в ZIP-архиве.
+    """
+
+    def setUp(self):
+        """
+        Каталог: художник, две картины с одним изображением (общие файлы) и пост с обложкой.
+        """
+        Artist.objects.create(name='Test Artist', bio='Bio')
+        SiteContact.objects.create(email='info@example.com')
+        self.painting = Painting.objects.create(
+            title='Sunset', creation_date='2024-01-01', price=1000, image=self.create_sample_image()
+        )
+        copy = Painting(title='Sunset copy', creation_date='2024-02-01')
+        copy.reuse_renditions('image', self.painting)
+        copy.save()
+        self.post = BlogPost.objects.create(title='Post', content='Text', cover_image=self.create_sample_image())
+        BlogPostImage.objects.create(post=self.post, image=self.create_sample_image(width=600, height=400))
+
+    def read_archive(self, chunks):
+        return zipfile.ZipFile(BytesIO(b''.join(chunks)))
+
+    def test_stream_contains_manifest_and_files(self):
+        """Тест: архив отдается частями и содержит все записи и по одному разу каждый файл."""
+        chunks = list(stream_catalog(chunk_size=1))
+        self.assertGreater(len(chunks), 10)
+        archive = self.read_archive(chunks)
+        manifest = archive.read(CATALOG_MANIFEST).decode().splitlines()
+        models = [line.split('"model": "')[1].split('"')[0] for line in manifest]
+        self.assertEqual(models.count('core.painting'), 2)
+        self.assertEqual(models.count('core.blogpostimage'), 1)
+        self.assertIn('core.imagehash', models)
+
+        media = [name for name in archive.namelist() if name.startswith(MEDIA_DIR)]
+        self.assertEqual(len(media), 6)  # Оригинал и 3 версии картины, обложка, изображение поста
+        name = self.painting.medium_image.name
+        with default_storage.open(name, 'rb') as file:
+            self.assertEqual(archive.read(MEDIA_DIR + name), file.read())
+
+    def test_export_and_import_round_trip(self):
+        """Тест: команды выгружают каталог и восстанавливают его с теми же id и файлами."""
+        painting = self.painting
+        hashes = ImageHash.objects.count()
+        edited = (timezone.now() - timedelta(days=30)).replace(microsecond=0)  # JSON хранит миллисекунды
+        BlogPost.objects.update(updated_at=edited)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'catalog.zip')
+            call_command('export_catalog', path, stdout=StringIO())
+            with self.assertRaises(CommandError):
+                call_command('import_catalog', path, stdout=StringIO())  # Каталог не пуст
+
+            call_command('clear_db', '--force', stdout=StringIO())
+            ImageHash.objects.all().delete()
+            self.assertFalse(default_storage.exists(painting.large_image.name))
+            suggest('sunset')  # Индекс подсказок и счетчики фасетов пустого каталога
+            build_facets({}, QueryDict())
+            out = StringIO()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('import_catalog', path, '--workers', '2', stdout=out)
+
+        self.assertIn(f'Восстановлено записей: {6 + hashes}, файлов: 6', out.getvalue())
+        restored = Painting.objects.get(pk=painting.pk)
+        self.assertEqual(
+            (restored.slug, restored.price, restored.large_image.name, bytes(restored.color_signature)),
+            (painting.slug, painting.price, painting.large_image.name, bytes(painting.color_signature))
+        )
+        self.assertFalse(restored.tiles_ready)
+        self.assertTrue(default_storage.exists(restored.large_image.name))
+        self.assertEqual(BlogPost.objects.get().images.count(), 1)
+        self.assertEqual(BlogPost.objects.get().updated_at, edited)  # Изображения поста не меняют его дату
+        self.assertEqual(ImageHash.objects.count(), hashes)
+        self.assertIsNone(cache.get(FACETS_KEY))
+        self.assertEqual(sorted(entry['title'] for entry in suggest('sunset')), ['Sunset', 'Sunset copy'])
+        self.assertGreater(Painting.objects.create(title='New', creation_date='2025-01-01').pk, painting.pk)
+
+    def test_admin_download_for_superuser_only(self):
+        """Тест: архив в админке скачивает только суперпользователь."""
+        user_model = get_user_model()
+        user_model.objects.create_user('staff', 'staff@example.com', 'password', is_staff=True)
+        self.client.login(username='staff', password='password')
+        self.assertEqual(self.client.get(reverse('custom_admin:catalog_export')).status_code, 403)
+
+        user_model.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        response = self.client.get(reverse('custom_admin:catalog_export'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('attachment; filename="catalog-', response['Content-Disposition'])
+        self.assertIn(CATALOG_MANIFEST, self.read_archive(response.streaming_content).namelist())
+
+
+@override_settings(REPLICA_DATABASES=['replica'], REPLICA_MAX_LAG=5, REPLICA_CHECK_INTERVAL=60)
+class ReplicaRoutingTest(BaseTestCase):
+    """
+    Тесты для чтения публичных страниц с реплики БД.
+    """
+
+    def test_router_uses_replica_only_when_allowed(self):
+        """Тест: чтение идет на реплику только в блоке replica_reads, запись и миграции — в default."""
+        router = ReplicaRouter()
+        with mock.patch('core.db.replica_available', return_value=True):
+            self.assertEqual(router.db_for_read(Painting), 'default')
+            with replica_reads():
+                self.assertEqual(router.db_for_read(Painting), 'replica')
+                self.assertEqual(router.db_for_write(Painting), 'default')
+            self.assertEqual(router.db_for_read(Painting), 'default')
+        with mock.patch('core.db.replica_available', return_value=False), replica_reads():
+            self.assertEqual(router.db_for_read(Painting), 'default')  # Реплика не пригодна
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+        self.assertTrue(router.allow_migrate('default', 'core'))
+
+    def test_shared_caches_filled_from_primary(self):
+        """Тест: индекс подсказок и счетчики фасетов строятся из основной БД даже при чтении с реплики."""
+        Painting.objects.create(title='Birches', creation_date='2023-05-01', image=self.create_sample_image())
+        cache.clear()
+        # Алиаса replica нет в DATABASES: чтение с реплики завершилось бы ошибкой
+        with mock.patch('core.db.replica_available', return_value=True), replica_reads():
+            self.assertEqual([entry['title'] for entry in suggest('bir')], ['Birches'])
+            self.assertEqual(build_facets({}, QueryDict())[0]['options'][0]['count'], 1)
+
+    def test_lag_check_falls_back_and_is_cached(self):
+        """Тест: отстающая или недоступная реплика не используется; проверка кэшируется в процессе."""
+        with mock.patch('core.db.replica_lag', return_value=1.5) as lag:
+            self.assertTrue(replica_available('replica-ok'))
+            self.assertTrue(replica_available('replica-ok'))
+        self.assertEqual(lag.call_count, 1)
+
+        with mock.patch('core.db.replica_lag', return_value=12.0), self.assertLogs('core.db', 'WARNING'):
+            self.assertFalse(replica_available('replica-lagging'))
+        with mock.patch('core.db.replica_lag', side_effect=DatabaseError('connection refused')), \
+                self.assertLogs('core.db', 'WARNING') as logs:
+            self.assertFalse(replica_available('replica-down'))
+        self.assertIn('connection refused', logs.output[0])
+
+    def test_staff_write_pins_reads_to_primary(self):
+        """Тест: публичные страницы читают с реплики, пока сотрудник не изменил данные в админке."""
+        get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        request = ContactRequest.objects.create(name='Anna', email='anna@example.com', message='Hello')
+        with mock.patch('core.db.replica_available', return_value=False) as available:
+            self.client.get(reverse('painting_list'))
+            self.assertTrue(available.called)
+
+            available.reset_mock()
+            self.client.login(username='admin', password='password')
+            self.client.get(reverse('custom_admin:index'))
+            self.assertFalse(available.called)  # Админка всегда читает из основной БД
+
+            response = self.client.post(reverse('custom_admin:core_contactrequest_changelist'), {
+                'action': 'delete_selected', '_selected_action': [request.pk], 'post': 'yes',
+            })
+            self.assertEqual(response.status_code, 302)
+            self.assertIn(PIN_COOKIE, response.cookies)
+            self.client.get(reverse('painting_list'))
+            self.assertFalse(available.called)
+
+
+class OverwriteStorageTest(TestCase):
+    """
+    Тесты для перезаписи файлов и параллельной записи в хранилище.
+    """
+
+    def test_overwrite_uses_storage_api_and_parallel_keeps_order(self):
+        """Тест: файл заменяется через API хранилища вне MEDIA_ROOT; run_parallel сохраняет порядок и ошибки."""
+        self.assertIsInstance(overwrite_storage(), OverwriteStorage)
+        self.assertIs(overwrite_storage(), storages['overwrite'])
+        self.assertIs(Artist._meta.get_field('photo').storage, storages['overwrite'])
+
+        with tempfile.TemporaryDirectory() as location:
+            storage = OverwriteStorage(location=location)
+            names = run_parallel([
+                lambda: storage.save('artist/photo.webp', ContentFile(b'first')),
+                lambda: storage.save('artist/other.webp', ContentFile(b'other')),
+            ], workers=2)
+            self.assertEqual(names, ['artist/photo.webp', 'artist/other.webp'])
+            self.assertEqual(storage.save('artist/photo.webp', ContentFile(b'second')), 'artist/photo.webp')
+            with storage.open('artist/photo.webp') as file:
+                self.assertEqual(file.read(), b'second')
+            self.assertEqual(sorted(storage.listdir('artist')[1]), ['other.webp', 'photo.webp'])
+
+        def fail():
+            raise OSError('disk full')
+
+        with self.assertRaisesMessage(OSError, 'disk full'):
+            run_parallel([lambda: 1, fail, lambda: 3], workers=3)
+
+
+@skipUnless(mock_aws, 'boto3 и moto не установлены')
+class S3StorageTest(BaseTestCase):
+    """
+    Тесты для хранения медиафайлов в S3 (бакет moto вместо настоящего хранилища).
+    """
+    bucket = 'gallery-media'
+
+    def setUp(self):
+        """
+        Бакет в moto и STORAGES из переменных окружения режима S3 (части multipart по 5 МБ).
+        """
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        self.s3 = boto3.client('s3', region_name='us-east-1')
+        self.s3.create_bucket(Bucket=self.bucket)
+        environ = {
+            'S3_BUCKET': self.bucket, 'S3_REGION': 'us-east-1', 'S3_ACCESS_KEY': 'testing', 'S3_SECRET_KEY': 'testing',
+            'S3_MULTIPART_THRESHOLD': '5', 'S3_MULTIPART_CHUNKSIZE': '5',
+        }
+        with mock.patch.dict(os.environ, environ):
+            settings_override = override_settings(STORAGES=build_storages())
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def keys(self, prefix=''):
+        """
+        Возвращает ключи объектов бакета с префиксом prefix.
+        """
+        pages = self.s3.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=prefix)
+        return {item['Key'] for page in pages for item in page.get('Contents', [])}
+
+    def test_painting_pipeline_uses_bucket(self):
+        """Тест: оригинал, версии и тайлы картины пишутся в бакет и удаляются вместе с картиной."""
+        painting = Painting.objects.create(
+            title='Test Painting', creation_date='2023-01-01', image=self.create_sample_image()
+        )
+        stored = {painting.image.name, painting.small_image.name, painting.medium_image.name, painting.large_image.name}
+        self.assertEqual(len(stored), 4)
+        self.assertLessEqual(stored, self.keys())
+        self.assertTrue(painting.small_image.url.startswith(f'https://{self.bucket}.s3.amazonaws.com/'))
+
+        self.assertGreater(build_painting_tiles(painting.pk), 0)
+        self.assertIn(f'{tiles_dir(painting.pk)}/image.dzi', self.keys(tiles_dir(painting.pk)))
+
+        painting.delete()
+        self.assertEqual(self.keys(), set())
+
+    def test_large_original_is_uploaded_in_parts(self):
+        """Тест: файл больше S3_MULTIPART_THRESHOLD загружается по частям (multipart upload)."""
+        name = default_storage.save('paintings/original.tif', ContentFile(os.urandom(11 * MB)))
+        self.assertEqual(default_storage.size(name), 11 * MB)
+        etag = self.s3.head_object(Bucket=self.bucket, Key=name)['ETag']
+        self.assertTrue(etag.strip('"').endswith('-3'))  # ETag составного объекта: <хеш>-<число частей>
+        default_storage.delete(name)
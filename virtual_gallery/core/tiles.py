@@ -0,0 +1,258 @@
+"""
+Пирамида тайлов (Deep Zoom, DZI) для просмотра картины в высоком разрешении.
+
+Из оригинального изображения строятся уровни от 1x1 пикселя до полного размера, каждый уровень
+режется на тайлы 256x256 в WEBP. Просмотрщик (static/js/deepzoom.js) загружает только тайлы,
+попадающие в видимую область, поэтому объем трафика не зависит от размера оригинала.
+
+Структура в хранилище (совместима с форматом DZI, например с OpenSeadragon):
+paintings/tiles/<pk>/image.dzi
+paintings/tiles/<pk>/image_files/<уровень>/<столбец>_<строка>.webp
+"""
+import logging
+import math
+import os
+import tempfile
+import threading
+from functools import partial
+from io import BytesIO
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image
+from PIL.Image import Resampling
+from .image_guard import check_image, run_guarded
+from .storage import run_parallel
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256  # Сторона тайла в пикселях
+TILE_OVERLAP = 1  # Перекрытие соседних тайлов (убирает швы при масштабировании)
+TILE_FORMAT = 'webp'
+TILE_QUALITY = 80
+TILES_ROOT = 'paintings/tiles'
+
+DZI_TEMPLATE = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="{format}" '
+    'Overlap="{overlap}" TileSize="{tile_size}">\n'
+    '    <Size Width="{width}" Height="{height}"/>\n'
+    '</Image>\n'
+)
+
+# Построение пирамиды занимает память под полноразмерное изображение, поэтому в процессе
+# одновременно строится только одна пирамида.
+_build_lock = threading.Lock()
+
+
+def tiles_dir(pk):
+    """
+    Возвращает каталог тайлов картины в хранилище.
+    """
+    return f'{TILES_ROOT}/{pk}'
+
+
+def max_level(width, height):
+    """
+    Возвращает номер уровня полного разрешения: на уровне 0 изображение занимает 1x1 пиксель.
+    """
+    return math.ceil(math.log2(max(width, height, 1)))
+
+
+def tile_ranges(length, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """
+    Возвращает границы тайлов по одной оси с учетом перекрытия: список (индекс, начало, конец).
+    """
+    ranges = []
+    for index in range(math.ceil(length / tile_size)):
+        start = max(0, index * tile_size - overlap)
+        end = min(length, (index + 1) * tile_size + overlap)
+        ranges.append((index, start, end))
+    return ranges
+
+
+def pyramid_columns(image):
+    """
+    Генератор тайлов пирамиды по столбцам: списки (путь в каталоге пирамиды, байты WEBP).
+
+    Уровни строятся сверху вниз: каждый следующий получается уменьшением предыдущего вдвое,
+    поэтому в памяти одновременно находится не больше двух уровней.
+    """
+    level_image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    for level in range(max_level(*image.size), -1, -1):
+        for col, left, right in tile_ranges(level_image.width):
+            column = []
+            for row, top, bottom in tile_ranges(level_image.height):
+                tile = level_image.crop((left, top, right, bottom))
+                buffer = BytesIO()
+                tile.save(buffer, format=TILE_FORMAT.upper(), quality=TILE_QUALITY)
+                column.append((f'image_files/{level}/{col}_{row}.{TILE_FORMAT}', buffer.getvalue()))
+            yield column
+        if level:
+            next_size = (max(1, math.ceil(level_image.width / 2)), max(1, math.ceil(level_image.height / 2)))
+            level_image = level_image.resize(next_size, Resampling.LANCZOS)
+
+
+def dzi_descriptor(width, height):
+    """
+    Возвращает содержимое image.dzi для изображения width x height.
+    """
+    return DZI_TEMPLATE.format(
+        format=TILE_FORMAT, overlap=TILE_OVERLAP, tile_size=TILE_SIZE, width=width, height=height
+    ).encode('utf-8')
+
+
+def build_pyramid(image, storage, base):
+    """
+    Строит пирамиду тайлов изображения и сохраняет ее в storage по пути base.
+
+    Аргументы:
+    image -- объект изображения Pillow (оригинал).
+    storage -- хранилище файлов Django.
+    base -- каталог пирамиды в хранилище.
+
+    Возвращает число сохраненных тайлов.
+    """
+    count = 0
+    for column in pyramid_columns(image):
+        # Тайлы столбца записываются параллельно, в памяти держится не больше одного столбца
+        count += len(run_parallel(partial(storage.save, f'{base}/{name}', ContentFile(data)) for name, data in column))
+    storage.save(f'{base}/image.dzi', ContentFile(dzi_descriptor(*image.size)))
+    return count
+
+
+def write_pyramid(source, directory):
+    """
+    Строит пирамиду тайлов изображения source в локальный каталог directory.
+
+    Выполняется в процессе обработки с лимитами памяти и CPU (image_guard.run_guarded), поэтому
+    работает с файлами напрямую, без настроек Django.
+
+    Аргументы:
+    source -- путь к файлу или открытый файл.
+    directory -- каталог пирамиды на диске.
+
+    Возвращает число тайлов.
+    """
+    count = 0
+    with Image.open(source) as image:
+        image.load()
+        for column in pyramid_columns(image):
+            for name, data in column:
+                path = os.path.join(directory, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as file:
+                    file.write(data)
+            count += len(column)
+        with open(os.path.join(directory, 'image.dzi'), 'wb') as file:
+            file.write(dzi_descriptor(*image.size))
+    return count
+
+
+def upload_pyramid(directory, storage, base):
+    """
+    Копирует пирамиду из локального каталога directory в storage по пути base (файлы — параллельно).
+    """
+    saves = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, directory).replace(os.sep, '/')
+            saves.append(partial(_save_local_file, storage, f'{base}/{relative}', path))
+    run_parallel(saves)
+
+
+def _save_local_file(storage, name, path):
+    """
+    Вспомогательная функция: сохраняет файл с диска в хранилище, не читая его в память целиком.
+    """
+    with open(path, 'rb') as file:
+        return storage.save(name, File(file))
+
+
+def delete_tiles(storage, pk):
+    """
+    Удаляет каталог тайлов картины через API хранилища (на диске и в S3 одинаково).
+    """
+    _delete_recursive(storage, tiles_dir(pk))
+
+
+def _delete_recursive(storage, path):
+    """
+    Вспомогательная функция: удаляет файлы каталога (параллельно) и подкаталогов, затем сам каталог.
+
+    У FileSystemStorage delete удаляет пустой каталог, в S3 каталогов нет и удаление ничего не меняет.
+    """
+    try:
+        directories, files = storage.listdir(path)
+    except FileNotFoundError:
+        return
+    run_parallel(partial(storage.delete, f'{path}/{name}') for name in files)
+    for name in directories:
+        _delete_recursive(storage, f'{path}/{name}')
+    try:
+        storage.delete(path)
+    except OSError:  # Каталог не пуст: в него уже пишет новая нарезка
+        pass
+
+
+def build_painting_tiles(pk):
+    """
+    Строит пирамиду тайлов для картины и отмечает ее готовность.
+
+    Изображения больше IMAGE_SUBPROCESS_PIXELS нарезаются в отдельном процессе с лимитами памяти и CPU;
+    при превышении лимита выбрасывается ValidationError, тайлы не строятся.
+    Флаг tiles_ready обновляется через update(), чтобы не запускать повторную обработку в save().
+    Возвращает число тайлов или None, если у картины нет изображения.
+    """
+    from .models import Painting
+    from .site_export import painting_paths, schedule_export
+
+    painting = Painting.objects.filter(pk=pk).only('pk', 'slug', 'image').first()
+    if painting is None or not painting.image:
+        return None
+
+    storage = painting.image.storage
+    with _build_lock:
+        delete_tiles(storage, pk)
+        with painting.image.open('rb') as file:
+            _, width, height = check_image(file)
+            if width * height <= settings.IMAGE_SUBPROCESS_PIXELS:
+                with Image.open(file) as image:
+                    image.load()
+                    count = build_pyramid(image, storage, tiles_dir(pk))
+            else:
+                # Оригинал декодируется в отдельном процессе с лимитами памяти и CPU (как при создании версий),
+                # тайлы из его временного каталога затем копируются в хранилище.
+                with tempfile.TemporaryDirectory(dir=settings.FILE_UPLOAD_TEMP_DIR) as directory:
+                    count = run_guarded(file, write_pyramid, directory)
+                    upload_pyramid(directory, storage, tiles_dir(pk))
+    if Painting.objects.filter(pk=pk, image=painting.image.name).update(tiles_ready=True):
+        # update() не отправляет post_save: экспортированная страница картины обновляется явно.
+        schedule_export(painting_paths(painting)[-1:])
+    return count
+
+
+def _build_in_background(pk):
+    """
+    Вспомогательная функция: точка входа фонового потока.
+    """
+    try:
+        build_painting_tiles(pk)
+    except Exception:
+        logger.exception('Не удалось построить тайлы для картины #%s', pk)
+    finally:
+        connections.close_all()  # Соединения потока не переиспользуются, закрываем их сразу.
+
+
+def schedule_tiles(pk):
+    """
+    Запускает построение тайлов в фоновом потоке после фиксации транзакции.
+
+    Сохранение картины в админке не ждет нарезки: до готовности тайлов лайтбокс показывает large_image.
+    Поток не демонический: управляющие команды (populate_db и т.п.) дожидаются его перед выходом.
+    """
+    transaction.on_commit(
+        lambda: threading.Thread(target=_build_in_background, args=(pk,), name=f'tiles-{pk}').start()
+    )
@@ -0,0 +1,174 @@
+"""
+Загрузка больших изображений по частям из админки (подмножество протокола tus 1.0.0).
+
+Клиент (static/js/chunked_upload.js):
+1. POST uploads/ с заголовками Upload-Length и Upload-Metadata (filename в base64) — создание загрузки,
+   в ответе Location с адресом загрузки.
+2. PATCH <адрес> с Upload-Offset и телом application/offset+octet-stream — очередная часть.
+3. HEAD <адрес> — текущий Upload-Offset, чтобы продолжить прерванную загрузку.
+4. DELETE <адрес> — отмена.
+
+Части пишутся потоково во временный файл (тело запроса не читается в память целиком), каждая часть
+меньше client_max_body_size Nginx. После первых HEADER_CHECK_BYTES байт заголовок проверяется Pillow:
+файл, не являющийся изображением поддерживаемого формата, отклоняется сразу, а не после загрузки
+гигабайт. Проверка та же, что и при обычной загрузке (image_guard.check_image): формат, число пикселей
+и оценка памяти. Готовый файл передается полю модели как django.core.files.File и копируется в хранилище
+частями.
+"""
+import base64
+import os
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+from PIL import Image
+from .image_guard import check_image
+from .models import ChunkedUpload
+
+TUS_VERSION = '1.0.0'
+HEADER_CHECK_BYTES = 256 * 1024  # Сколько байт нужно для проверки заголовка (с запасом на EXIF)
+READ_BLOCK_SIZE = 64 * 1024  # Размер блока при потоковой записи тела запроса
+
+
+def tus_response(status, **headers):
+    """
+    Возвращает пустой ответ с заголовками протокола tus.
+    """
+    response = HttpResponse(status=status)
+    response['Tus-Resumable'] = TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    for name, value in headers.items():
+        response[name.replace('_', '-')] = str(value)
+    return response
+
+
+def parse_metadata(header):
+    """
+    Разбирает заголовок Upload-Metadata: пары «ключ значение_в_base64» через запятую.
+    """
+    metadata = {}
+    for pair in filter(None, (item.strip() for item in header.split(','))):
+        key, _, value = pair.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value).decode('utf-8') if value else ''
+        except (ValueError, UnicodeDecodeError):
+            continue
+    return metadata
+
+
+def inspect_header(path):
+    """
+    Проверяет заголовок частично загруженного файла.
+
+    Pillow читает только заголовок, пиксели не декодируются. Возвращает MIME-тип или None,
+    если файл не является изображением поддерживаемого формата или не укладывается в бюджет обработки.
+    """
+    try:
+        image_format, _, _ = check_image(path)
+    except ValidationError:
+        return None
+    return Image.MIME.get(image_format)
+
+
+def open_upload(upload):
+    """
+    Возвращает завершенную загрузку как File для присваивания ImageField.
+
+    Файл не читается в память: хранилище копирует его частями при сохранении модели.
+    """
+    return File(open(upload.path, 'rb'), name=os.path.basename(upload.filename))
+
+
+def user_uploads(request):
+    """
+    Загрузки текущего пользователя: чужие загрузки для него не существуют (404).
+    """
+    return ChunkedUpload.objects.filter(user=request.user)
+
+
+@require_http_methods(['POST'])
+def create_upload(request):
+    """
+    Создает загрузку (расширение creation протокола tus).
+    """
+    try:
+        size = int(request.headers.get('Upload-Length', ''))
+    except ValueError:
+        return tus_response(400)
+    if size <= 0:
+        return tus_response(400)
+    if size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        return tus_response(413, Tus_Max_Size=settings.CHUNKED_UPLOAD_MAX_SIZE)
+
+    filename = parse_metadata(request.headers.get('Upload-Metadata', '')).get('filename') or 'upload'
+    upload = ChunkedUpload.objects.create(filename=filename[:255], size=size, user=request.user)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(upload.path, 'wb').close()
+
+    location = reverse('custom_admin:chunked_upload_detail', args=[upload.pk])
+    return tus_response(201, Location=location, Upload_Offset=0)
+
+
+@require_http_methods(['HEAD', 'PATCH', 'DELETE'])
+def upload_detail(request, pk):
+    """
+    Текущее смещение (HEAD), прием очередной части (PATCH) и отмена загрузки (DELETE).
+    """
+    if request.method == 'HEAD':
+        upload = get_object_or_404(user_uploads(request), pk=pk)
+        return tus_response(200, Upload_Offset=upload.offset, Upload_Length=upload.size)
+    if request.method == 'DELETE':
+        get_object_or_404(user_uploads(request), pk=pk).delete()  # Временный файл удаляется сигналом
+        return tus_response(204)
+    return append_chunk(request, pk)
+
+
+def append_chunk(request, pk):
+    """
+    Дописывает часть из тела запроса во временный файл загрузки.
+
+    Строка загрузки блокируется на время записи, поэтому параллельный PATCH той же загрузки
+    дождется окончания и получит 409 из-за устаревшего Upload-Offset.
+    """
+    if request.content_type != 'application/offset+octet-stream':
+        return tus_response(415)
+    try:
+        offset = int(request.headers.get('Upload-Offset', ''))
+    except ValueError:
+        return tus_response(400)
+
+    with transaction.atomic():
+        upload = get_object_or_404(user_uploads(request).select_for_update(), pk=pk)
+        if offset != upload.offset:
+            return tus_response(409, Upload_Offset=upload.offset)
+
+        remaining = upload.size - upload.offset
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+        if length > remaining:
+            return tus_response(413, Upload_Offset=upload.offset)
+
+        written = 0
+        with open(upload.path, 'r+b') as file:
+            # Обрезаем хвост от прерванной записи: в файле ровно offset подтвержденных байт.
+            file.truncate(upload.offset)
+            file.seek(upload.offset)
+            while written < length:
+                block = request.read(min(READ_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                file.write(block)
+                written += len(block)
+        upload.offset += written
+
+        if not upload.mime and upload.offset >= min(upload.size, HEADER_CHECK_BYTES):
+            upload.mime = inspect_header(upload.path) or ''
+            if not upload.mime:
+                upload.delete()
+                return tus_response(415)
+        upload.save(update_fields=['offset', 'mime', 'updated_at'])
+
+    return tus_response(204, Upload_Offset=upload.offset)
@@ -1,13 +1,23 @@
 from django.urls import path
+from .api import ArtistApi, PaintingDetailApi, PaintingListApi, PostListApi, SuggestApi
 from .views import (
-    HomeView, PaintingListView, PaintingDetailView,
-    BlogListView, ContactsView
+    HomeView, PaintingListView, PaintingDetailView, PaintingViewBeacon,
+    BlogListView, ContactsView, ContactStateView
 )
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
     path('paintings/', PaintingListView.as_view(), name='painting_list'),
     path('paintings/<slug:slug>/', PaintingDetailView.as_view(), name='painting_detail'),
+    path('paintings/<slug:slug>/view/', PaintingViewBeacon.as_view(), name='painting_view_beacon'),
     path('blog/', BlogListView.as_view(), name='blog_list'),
     path('contacts/', ContactsView.as_view(), name='contacts'),
+    path('contacts/state/', ContactStateView.as_view(), name='contacts_state'),
+
+    # JSON API только для чтения (см. core/api.py)
+    path('api/paintings/', PaintingListApi.as_view(), name='api_painting_list'),
+    path('api/paintings/<slug:slug>/', PaintingDetailApi.as_view(), name='api_painting_detail'),
+    path('api/posts/', PostListApi.as_view(), name='api_post_list'),
+    path('api/artist/', ArtistApi.as_view(), name='api_artist'),
+    path('api/suggest/', SuggestApi.as_view(), name='api_suggest'),
 ]
@@ -1,24 +1,49 @@
+from django.conf import settings
+from django.db import transaction
+from django.contrib import messages
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.middleware.csrf import get_token
+from django.views import View
+from django.views.decorators.cache import never_cache
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView, ListView, DetailView, FormView
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
+from .api import PAINTING_FIELDS, serialize
+from .colors import color_options, parse_color, rank_paintings
+from .facets import build_facets, filter_paintings, parse_filters
 from .models import Artist, Painting, BlogPost, SiteContact
+from .outbox import enqueue_contact_request
+from .popularity import popular_paintings, record_view
+from .ratelimit import HONEYPOT_FIELD, client_ip, record_shed, take_token
+from .singletons import get_singleton
 from .forms import ContactForm
+from .tiles import TILE_FORMAT, TILE_OVERLAP, TILE_SIZE
+
+
+# Поля картины для карусели на главной (тот же формат, что у /api/paintings/?fields=...)
+CAROUSEL_FIELDS = ('slug', 'title', 'url', 'medium_image', 'placeholder', 'dominant_color')
 
 
 class HomeView(TemplateView):
     """
     Представление главной страницы сайта.
 
-    Отображает информацию о художнике и избранные картины.
+    Отображает информацию о художнике, избранные и популярные картины.
     """
     template_name = 'core/home.html'
+    replica_reads = True  # Чтение с реплики БД, если она настроена (см. core/db.py)
 
     def get_context_data(self, **kwargs):
         """
-        Добавляет контекст для шаблона: художника и избранные картины.
+        Добавляет контекст для шаблона: художника, избранные картины и их данные для карусели,
+        популярные картины (топ по просмотрам из кэша).
         """
         context = super().get_context_data(**kwargs)
-        context['artist'] = Artist.objects.first()  # Единственный художник
+        context['artist'] = get_singleton(Artist)  # Единственный художник
         context['featured_paintings'] = Painting.objects.filter(is_featured=True).order_by('-creation_date')
+        context['carousel_paintings'] = serialize(context['featured_paintings'], PAINTING_FIELDS, CAROUSEL_FIELDS)
+        context['popular_paintings'] = popular_paintings()
         return context
 
 
@@ -26,17 +51,42 @@ class PaintingListView(ListView):
     """
     Представление списка всех картин.
 
-    Отображает картины в порядке от новых к старым.
+    Отображает картины в порядке от новых к старым с фильтрами по году, цене,
+    наличию и избранному (см. core/facets.py). С параметром color картины упорядочены
+    по близости к цвету (см. core/colors.py).
     """
     model = Painting
     template_name = 'core/painting_list.html'
     context_object_name = 'paintings'
+    replica_reads = True
 
     def get_queryset(self):
         """
-        Возвращает queryset с сортировкой по дате создания (новые сначала).
+        Возвращает отфильтрованный queryset с сортировкой по дате создания (новые сначала)
+        или, если выбран цвет, список похожих по цвету картин в порядке убывания сходства.
+        """
+        self.filters = parse_filters(self.request.GET)
+        self.color = parse_color(self.request.GET.get('color'))
+        queryset = filter_paintings(super().get_queryset(), self.filters).order_by('-creation_date')
+        if self.color:
+            ranks = {pk: position for position, pk in enumerate(rank_paintings(self.color))}
+            queryset = sorted(queryset.filter(pk__in=ranks), key=lambda painting: ranks[painting.pk])
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        """
+        Добавляет в контекст фасеты со счетчиками из кэша, варианты цвета и параметры фильтра
+        для ссылок пагинации.
         """
-        return super().get_queryset().order_by('-creation_date')
+        context = super().get_context_data(**kwargs)
+        context['facets'] = build_facets(self.filters, self.request.GET)
+        context['filters'] = self.filters
+        context['color'] = self.color
+        context['color_options'] = color_options(self.color, self.request.GET)
+        query = self.request.GET.copy()
+        query.pop('page', None)
+        context['filter_query'] = f'{query.urlencode()}&' if query else ''
+        return context
 
 
 class PaintingDetailView(DetailView):
@@ -49,24 +99,47 @@ class PaintingDetailView(DetailView):
     template_name = 'core/painting_detail.html'
     slug_field = 'slug'
     slug_url_kwarg = 'slug'
+    replica_reads = True
+
+    def get_context_data(self, **kwargs):
+        """
+        Добавляет в контекст параметры пирамиды тайлов для просмотрщика в лайтбоксе.
+        """
+        context = super().get_context_data(**kwargs)
+        context['tile_size'] = TILE_SIZE
+        context['tile_overlap'] = TILE_OVERLAP
+        context['tile_format'] = TILE_FORMAT
+        return context
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class PaintingViewBeacon(View):
+    """
+    Прием маяка просмотра картины (navigator.sendBeacon со страницы картины).
+
+    Просмотр учитывается в памяти воркера, без запроса к БД (см. core/popularity.py).
+    Токен CSRF не проверяется: sendBeacon не передает заголовки, а запрос только увеличивает счетчик.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, slug):
+        record_view(slug)
+        return HttpResponse(status=204)
 
 
 class BlogListView(ListView):
     """
     Представление списка постов в блоге.
 
-    Отображает посты в порядке от новых к старым, с предзагрузкой изображений.
+    Отображает посты в порядке от новых к старым. Изображения постов подгружаются
+    только для карточек, которых нет в кэше фрагментов (см. core/cards.py). Исходный текст
+    не загружается: карточка выводит подготовленный при сохранении HTML (см. core/content.py).
     """
-    model = BlogPost
+    queryset = BlogPost.objects.defer('content')
     template_name = 'core/blog_list.html'
     context_object_name = 'posts'
     ordering = '-pub_date'
-
-    def get_queryset(self):
-        """
-        Возвращает queryset с предзагруженными изображениями для оптимизации.
-        """
-        return super().get_queryset().prefetch_related('images')
+    replica_reads = True
 
 
 class ContactsView(FormView):
@@ -74,22 +147,72 @@ class ContactsView(FormView):
     Представление страницы контактов с формой обратной связи.
 
     Обрабатывает отправку формы и отображает контактную информацию сайта.
+    Уведомления о заявке отправляются командой deliver_outbox (см. core/outbox.py).
+    Частота отправок ограничена по IP и e-mail, боты отсекаются скрытым полем (см. core/ratelimit.py).
+
+    Страница без отправленной формы не зависит от сессии: CSRF-токен и сообщения подгружаются
+    запросом к ContactStateView, поэтому страница экспортируется в HTML, как остальные.
     """
     template_name = 'core/contacts.html'
     form_class = ContactForm
-    success_url = reverse_lazy('home')  # После отправки на главную
+    success_url = reverse_lazy('contacts')  # После отправки — та же страница с сообщением об успехе
 
     def get_context_data(self, **kwargs):
         """
         Добавляет контекст для шаблона: контактную информацию сайта.
         """
         context = super().get_context_data(**kwargs)
-        context['site_contact'] = SiteContact.objects.first()  # Контакты сайта
+        context['site_contact'] = get_singleton(SiteContact)  # Контакты сайта
         return context
 
+    def post(self, request, *args, **kwargs):
+        """
+        До разбора формы отсекает ботов (заполненное скрытое поле) и превышение лимита по IP.
+        """
+        if request.POST.get(HONEYPOT_FIELD):
+            # Бот получает обычный ответ об успехе, заявка не сохраняется
+            record_shed('honeypot')
+            return HttpResponseRedirect(self.get_success_url())
+        if not take_token('ip', client_ip(request), *settings.CONTACT_RATE_LIMIT_IP):
+            record_shed('ip')
+            return self.rate_limited(self.get_form())
+        return super().post(request, *args, **kwargs)
+
     def form_valid(self, form):
         """
-        Сохраняет форму при успешной валидации.
+        Проверяет лимит по e-mail и сохраняет заявку и уведомления о ней в одной транзакции,
+        без обращения к сети.
         """
-        form.save()
+        if not take_token('email', form.cleaned_data['email'], *settings.CONTACT_RATE_LIMIT_EMAIL):
+            record_shed('email')
+            return self.rate_limited(form)
+        with transaction.atomic():
+            enqueue_contact_request(form.save())
+        messages.success(self.request, 'Спасибо! Сообщение отправлено, я свяжусь с вами в ближайшее время.')
         return super().form_valid(form)
+
+    def rate_limited(self, form):
+        """
+        Ответ 429 с формой и сообщением о превышении лимита (введенные данные сохраняются в форме).
+        """
+        form.add_error(None, 'Слишком много сообщений подряд. Пожалуйста, попробуйте позже.')
+        return self.render_to_response(self.get_context_data(form=form), status=429)
+
+
+@method_decorator(never_cache, name='dispatch')
+class ContactStateView(View):
+    """
+    Динамическая часть страницы контактов: CSRF-токен для формы и сообщения сессии.
+
+    Сама страница отдается из экспорта (одинаковая для всех), а этот короткий JSON-ответ
+    запрашивается скриптом страницы и не кэшируется.
+    """
+
+    def get(self, request):
+        """
+        Возвращает токен (и ставит CSRF-куку) и непрочитанные сообщения.
+        """
+        return JsonResponse({
+            'csrf_token': get_token(request),
+            'messages': [{'level': message.tags, 'text': str(message)} for message in messages.get_messages(request)],
+        })
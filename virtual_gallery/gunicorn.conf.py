@@ -0,0 +1,23 @@
+"""
+Конфигурация Gunicorn для production (подхватывается автоматически из рабочей директории).
+
+Число воркеров и потоков задается через переменные окружения WEB_CONCURRENCY и GUNICORN_THREADS:
+те же значения использует settings/database.py для расчета размера пула соединений к БД.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 3))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+
+# Перезапуск воркера после N запросов (с разбросом), чтобы не копить утечки памяти
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+
+
+def worker_exit(server, worker):
+    """
+    Записывает в БД просмотры картин, накопленные воркером (см. core/popularity.py).
+    """
+    from core.popularity import flush_views
+    flush_views()
@@ -0,0 +1,117 @@
+/**
+ * Загрузка больших изображений в админке по частям (протокол в стиле tus, см. core/uploads.py).
+ *
+ * Работает для полей, рядом с которыми форма выводит скрытое поле <имя>_upload
+ * с атрибутом data-chunked-upload. Файлы больше одной части не отправляются вместе с формой:
+ * они загружаются частями заранее, а в форму попадает только идентификатор загрузки.
+ * Прерванная загрузка (обрыв связи, перезагрузка страницы) продолжается с последнего
+ * подтвержденного байта: адрес загрузки хранится в localStorage.
+ */
+document.addEventListener('DOMContentLoaded', function () {
+    'use strict';
+
+    const MAX_RETRIES = 5;
+
+    document.querySelectorAll('input[data-chunked-upload]').forEach(function (hidden) {
+        const fileInput = document.getElementById(hidden.id.replace(/_upload$/, ''));
+        if (!fileInput) return;
+
+        const form = fileInput.form;
+        const endpoint = hidden.dataset.endpoint;
+        const chunkSize = parseInt(hidden.dataset.chunkSize, 10);
+        const status = document.createElement('div');
+        status.className = 'help chunked-upload-status';
+        fileInput.insertAdjacentElement('afterend', status);
+
+        const csrfToken = () => form.querySelector('input[name=csrfmiddlewaretoken]').value;
+        const submitButtons = () => form.querySelectorAll('[type=submit]');
+        const setBusy = (busy) => submitButtons().forEach((button) => { button.disabled = busy; });
+
+        async function request(method, url, headers, body) {
+            return fetch(url, {
+                method: method,
+                headers: Object.assign({ 'Tus-Resumable': '1.0.0', 'X-CSRFToken': csrfToken() }, headers),
+                body: body,
+                credentials: 'same-origin'
+            });
+        }
+
+        // Смещение уже сохраненной загрузки или null, если продолжать нечего
+        async function resumeOffset(url) {
+            const response = await request('HEAD', url, {});
+            return response.ok ? parseInt(response.headers.get('Upload-Offset'), 10) : null;
+        }
+
+        async function createUpload(file) {
+            const filename = btoa(unescape(encodeURIComponent(file.name)));
+            const response = await request('POST', endpoint, {
+                'Upload-Length': file.size,
+                'Upload-Metadata': 'filename ' + filename
+            });
+            if (response.status === 413) throw new Error('файл слишком большой');
+            if (response.status !== 201) throw new Error('сервер не принял загрузку (' + response.status + ')');
+            return response.headers.get('Location');
+        }
+
+        async function upload(file) {
+            const key = ['chunked-upload', file.name, file.size, file.lastModified].join(':');
+            let url = localStorage.getItem(key);
+            let offset = url ? await resumeOffset(url) : null;
+            if (offset === null) {
+                url = await createUpload(file);
+                offset = 0;
+                localStorage.setItem(key, url);
+            }
+
+            let retries = 0;
+            while (offset < file.size) {
+                status.textContent = `Загрузка: ${Math.floor(offset / file.size * 100)}%`;
+                let response;
+                try {
+                    response = await request('PATCH', url, {
+                        'Upload-Offset': offset,
+                        'Content-Type': 'application/offset+octet-stream'
+                    }, file.slice(offset, offset + chunkSize));
+                } catch (error) {
+                    response = null;  // Обрыв связи: повторим с подтвержденного сервером смещения
+                }
+
+                if (response && response.status === 204) {
+                    offset = parseInt(response.headers.get('Upload-Offset'), 10);
+                    retries = 0;
+                    continue;
+                }
+                if (response && response.status === 415) {
+                    localStorage.removeItem(key);
+                    throw new Error('файл не является изображением поддерживаемого формата');
+                }
+                if (++retries > MAX_RETRIES) throw new Error('не удалось загрузить часть файла');
+
+                await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** retries));
+                const confirmed = await resumeOffset(url).catch(() => null);
+                if (confirmed !== null) offset = confirmed;
+            }
+
+            localStorage.removeItem(key);
+            return url.replace(/\/$/, '').split('/').pop();
+        }
+
+        fileInput.addEventListener('change', async function () {
+            const file = fileInput.files[0];
+            hidden.value = '';
+            status.textContent = '';
+            if (!file || file.size <= chunkSize) return;  // Небольшие файлы уходят вместе с формой
+
+            setBusy(true);
+            try {
+                hidden.value = await upload(file);
+                fileInput.value = '';  // Файл уже на сервере: не отправляем его повторно с формой
+                status.textContent = `Файл «${file.name}» загружен, сохраните форму.`;
+            } catch (error) {
+                status.textContent = 'Ошибка загрузки: ' + error.message;
+            } finally {
+                setBusy(false);
+            }
+        });
+    });
+});
@@ -0,0 +1,228 @@
+/**
+ * Легкий просмотрщик пирамиды тайлов (Deep Zoom, DZI) для лайтбокса картины.
+ *
+ * Загружает только тайлы, попадающие в видимую область, с уровня, соответствующего текущему
+ * масштабу. Под тайлами растянуто большое изображение (large_image), поэтому при прокрутке
+ * и масштабировании нет пустых областей, пока тайлы догружаются.
+ *
+ * Разметка:
+ * <div class="deepzoom-viewer" data-tiles-url="/media/paintings/tiles/1/image_files/"
+ *      data-width="6000" data-height="4000" data-tile-size="256" data-overlap="1"
+ *      data-format="webp" data-preview="/media/paintings/large/x_large.webp"></div>
+ */
+(function () {
+    'use strict';
+
+    const MAX_ZOOM = 2;  // Максимальное увеличение относительно оригинала
+    const WHEEL_STEP = 1.2;  // Множитель масштаба на одно деление колеса
+
+    function DeepZoomViewer(container) {
+        const data = container.dataset;
+        this.container = container;
+        this.tilesUrl = data.tilesUrl;
+        this.width = parseInt(data.width, 10);
+        this.height = parseInt(data.height, 10);
+        this.tileSize = parseInt(data.tileSize, 10);
+        this.overlap = parseInt(data.overlap, 10);
+        this.format = data.format;
+        this.maxLevel = Math.ceil(Math.log2(Math.max(this.width, this.height)));
+        this.tiles = new Map();  // "уровень/столбец_строка" -> <img>
+        this.pointers = new Map();  // Активные указатели (для перетаскивания и pinch-жеста)
+        this.frame = null;
+
+        this.preview = document.createElement('img');
+        this.preview.className = 'deepzoom-preview';
+        this.preview.src = data.preview;
+        this.preview.alt = '';
+        this.container.appendChild(this.preview);
+
+        this.addControls();
+        this.bindEvents();
+        this.fit();
+    }
+
+    DeepZoomViewer.prototype.addControls = function () {
+        const controls = document.createElement('div');
+        controls.className = 'deepzoom-controls';
+        [['+', 'Приблизить', WHEEL_STEP * WHEEL_STEP], ['−', 'Отдалить', 1 / (WHEEL_STEP * WHEEL_STEP)]].forEach(([label, title, factor]) => {
+            const button = document.createElement('button');
+            button.type = 'button';
+            button.textContent = label;
+            button.setAttribute('aria-label', title);
+            button.addEventListener('click', (e) => {
+                e.stopPropagation();
+                this.zoomAt(this.container.clientWidth / 2, this.container.clientHeight / 2, factor);
+            });
+            controls.appendChild(button);
+        });
+        this.container.appendChild(controls);
+    };
+
+    // Масштаб, при котором картина целиком помещается в контейнер
+    DeepZoomViewer.prototype.fitScale = function () {
+        return Math.min(this.container.clientWidth / this.width, this.container.clientHeight / this.height);
+    };
+
+    DeepZoomViewer.prototype.fit = function () {
+        this.scale = this.fitScale();
+        this.x = (this.container.clientWidth - this.width * this.scale) / 2;
+        this.y = (this.container.clientHeight - this.height * this.scale) / 2;
+        this.render();
+    };
+
+    // Изменение масштаба с сохранением точки под курсором (cx, cy — координаты в контейнере)
+    DeepZoomViewer.prototype.zoomAt = function (cx, cy, factor) {
+        const scale = Math.min(Math.max(this.scale * factor, this.fitScale()), MAX_ZOOM);
+        factor = scale / this.scale;
+        this.x = cx - (cx - this.x) * factor;
+        this.y = cy - (cy - this.y) * factor;
+        this.scale = scale;
+        this.render();
+    };
+
+    // Картина не уезжает за край: если она меньше контейнера по оси, то центрируется
+    DeepZoomViewer.prototype.clamp = function () {
+        const cw = this.container.clientWidth;
+        const ch = this.container.clientHeight;
+        const w = this.width * this.scale;
+        const h = this.height * this.scale;
+        this.x = w <= cw ? (cw - w) / 2 : Math.min(0, Math.max(cw - w, this.x));
+        this.y = h <= ch ? (ch - h) / 2 : Math.min(0, Math.max(ch - h, this.y));
+    };
+
+    DeepZoomViewer.prototype.render = function () {
+        if (this.frame) return;
+        this.frame = requestAnimationFrame(() => {
+            this.frame = null;
+            this.clamp();
+            this.draw();
+        });
+    };
+
+    DeepZoomViewer.prototype.draw = function () {
+        const s = this.scale;
+        Object.assign(this.preview.style, {
+            left: this.x + 'px',
+            top: this.y + 'px',
+            width: this.width * s + 'px',
+            height: this.height * s + 'px'
+        });
+
+        // Уровень, на котором один пиксель тайла не меньше пикселя экрана (с учетом плотности экрана)
+        const density = window.devicePixelRatio || 1;
+        const level = Math.min(this.maxLevel, Math.max(0, Math.ceil(this.maxLevel + Math.log2(s * density))));
+        const levelScale = Math.pow(2, level - this.maxLevel);
+        const levelWidth = Math.ceil(this.width * levelScale);
+        const levelHeight = Math.ceil(this.height * levelScale);
+        const ratio = s / levelScale;  // Пикселей экрана на пиксель уровня
+
+        // Видимая область в координатах уровня
+        const left = Math.max(0, -this.x / ratio);
+        const top = Math.max(0, -this.y / ratio);
+        const right = Math.min(levelWidth, (this.container.clientWidth - this.x) / ratio);
+        const bottom = Math.min(levelHeight, (this.container.clientHeight - this.y) / ratio);
+        const ts = this.tileSize;
+
+        const visible = new Set();
+        for (let col = Math.floor(left / ts); col * ts < right; col++) {
+            for (let row = Math.floor(top / ts); row * ts < bottom; row++) {
+                const key = `${level}/${col}_${row}`;
+                visible.add(key);
+                const x0 = Math.max(0, col * ts - this.overlap);
+                const y0 = Math.max(0, row * ts - this.overlap);
+                const x1 = Math.min(levelWidth, (col + 1) * ts + this.overlap);
+                const y1 = Math.min(levelHeight, (row + 1) * ts + this.overlap);
+
+                let tile = this.tiles.get(key);
+                if (!tile) {
+                    tile = document.createElement('img');
+                    tile.className = 'deepzoom-tile';
+                    tile.alt = '';
+                    tile.addEventListener('load', () => tile.classList.add('loaded'));
+                    tile.src = `${this.tilesUrl}${key}.${this.format}`;
+                    this.tiles.set(key, tile);
+                    this.container.insertBefore(tile, this.preview.nextSibling);
+                }
+                Object.assign(tile.style, {
+                    left: this.x + x0 * ratio + 'px',
+                    top: this.y + y0 * ratio + 'px',
+                    width: (x1 - x0) * ratio + 'px',
+                    height: (y1 - y0) * ratio + 'px'
+                });
+            }
+        }
+
+        // Тайлы вне экрана и других уровней удаляются: в DOM остается только видимое
+        this.tiles.forEach((tile, key) => {
+            if (!visible.has(key)) {
+                tile.remove();
+                this.tiles.delete(key);
+            }
+        });
+    };
+
+    DeepZoomViewer.prototype.bindEvents = function () {
+        const el = this.container;
+
+        // Клики внутри просмотрщика не закрывают лайтбокс
+        el.addEventListener('click', (e) => e.stopPropagation());
+
+        el.addEventListener('wheel', (e) => {
+            e.preventDefault();
+            const rect = el.getBoundingClientRect();
+            this.zoomAt(e.clientX - rect.left, e.clientY - rect.top, e.deltaY < 0 ? WHEEL_STEP : 1 / WHEEL_STEP);
+        }, { passive: false });
+
+        el.addEventListener('dblclick', (e) => {
+            const rect = el.getBoundingClientRect();
+            this.zoomAt(e.clientX - rect.left, e.clientY - rect.top, 2);
+        });
+
+        el.addEventListener('pointerdown', (e) => {
+            el.setPointerCapture(e.pointerId);
+            this.pointers.set(e.pointerId, { x: e.clientX, y: e.clientY });
+            el.classList.add('dragging');
+        });
+
+        el.addEventListener('pointermove', (e) => {
+            const previous = this.pointers.get(e.pointerId);
+            if (!previous) return;
+            const current = { x: e.clientX, y: e.clientY };
+
+            if (this.pointers.size === 2) {
+                // Pinch-жест: масштаб по изменению расстояния между пальцами
+                const other = [...this.pointers.entries()].find(([id]) => id !== e.pointerId)[1];
+                const before = Math.hypot(previous.x - other.x, previous.y - other.y);
+                const after = Math.hypot(current.x - other.x, current.y - other.y);
+                const rect = el.getBoundingClientRect();
+                if (before > 0) {
+                    this.zoomAt((current.x + other.x) / 2 - rect.left, (current.y + other.y) / 2 - rect.top, after / before);
+                }
+            } else {
+                this.x += current.x - previous.x;
+                this.y += current.y - previous.y;
+                this.render();
+            }
+            this.pointers.set(e.pointerId, current);
+        });
+
+        const release = (e) => {
+            this.pointers.delete(e.pointerId);
+            if (!this.pointers.size) el.classList.remove('dragging');
+        };
+        el.addEventListener('pointerup', release);
+        el.addEventListener('pointercancel', release);
+
+        window.addEventListener('resize', () => this.fit());
+    };
+
+    // Инициализация по требованию: размеры контейнера известны только когда лайтбокс открыт
+    window.initDeepZoom = function (container) {
+        if (!container.deepZoom) {
+            container.deepZoom = new DeepZoomViewer(container);
+        } else {
+            container.deepZoom.fit();
+        }
+        return container.deepZoom;
+    };
+})();
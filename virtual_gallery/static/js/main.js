@@ -1,25 +1,4 @@
 document.addEventListener('DOMContentLoaded', function() {
-    // ===== Экран загрузки =====
-    const loadingScreen = document.createElement('div');
-    loadingScreen.className = 'loading-screen';
-    loadingScreen.innerHTML = `
-        <div class="loading-content">
-            <div class="loading-spinner"></div>
-            <p class="loading-text">Загрузка галереи...</p>
-        </div>
-    `;
-    document.body.appendChild(loadingScreen);
-
-    // Скрытие экрана загрузки после полной загрузки страницы
-    window.addEventListener('load', function() {
-        setTimeout(() => {
-            loadingScreen.classList.add('fade-out');
-            setTimeout(() => {
-                loadingScreen.remove();
-            }, 500);
-        }, 300);
-    });
-
     // ===== Плавная прокрутка к якорям =====
     // Для всех ссылок с хэшем
     document.querySelectorAll('a[href^="#"]').forEach(anchor => {
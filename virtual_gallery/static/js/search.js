@@ -0,0 +1,90 @@
+// Подсказки поиска по названиям картин и постов блога.
+// Запрос к /api/suggest/ уходит через паузу после ввода; ответ строится из индекса в памяти сервера.
+document.addEventListener('DOMContentLoaded', function() {
+    const container = document.querySelector('.site-search');
+    if (!container) return;
+
+    const input = container.querySelector('.site-search-input');
+    const list = container.querySelector('.site-search-results');
+    const url = container.dataset.suggestUrl;
+    const kinds = {painting: 'Картина', post: 'Блог'};
+    const minLength = 2;
+    const delay = 150;
+    let timer = null;
+    let controller = null;
+    let active = -1;
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    function close() {
+        list.hidden = true;
+        list.innerHTML = '';
+        active = -1;
+        input.setAttribute('aria-expanded', 'false');
+    }
+
+    function render(results) {
+        if (!results.length) {
+            close();
+            return;
+        }
+        list.innerHTML = results.map(item =>
+            `<li role="option"><a href="${escapeHtml(item.url)}">` +
+            `<span>${escapeHtml(item.title)}</span>` +
+            `<span class="site-search-kind">${kinds[item.kind] || ''}</span></a></li>`
+        ).join('');
+        list.hidden = false;
+        active = -1;
+        input.setAttribute('aria-expanded', 'true');
+    }
+
+    function highlight(index) {
+        const links = list.querySelectorAll('a');
+        if (!links.length) return;
+        active = (index + links.length) % links.length;
+        links.forEach((link, i) => link.classList.toggle('active', i === active));
+    }
+
+    function load(query) {
+        // Ответ на устаревший префикс не нужен: предыдущий запрос отменяется
+        if (controller) controller.abort();
+        controller = new AbortController();
+        fetch(`${url}?q=${encodeURIComponent(query)}`, {signal: controller.signal})
+            .then(response => response.ok ? response.json() : {results: []})
+            .then(data => render(data.results))
+            .catch(error => {
+                if (error.name !== 'AbortError') close();
+            });
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const query = input.value.trim();
+        if (query.length < minLength) {
+            close();
+            return;
+        }
+        timer = setTimeout(() => load(query), delay);
+    });
+
+    input.addEventListener('keydown', function(e) {
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            highlight(active + (e.key === 'ArrowDown' ? 1 : -1));
+        } else if (e.key === 'Enter') {
+            const links = list.querySelectorAll('a');
+            const link = links[Math.max(active, 0)];
+            if (link) window.location.href = link.href;
+        } else if (e.key === 'Escape') {
+            close();
+        }
+    });
+
+    document.addEventListener('click', function(e) {
+        if (!container.contains(e.target)) close();
+    });
+});
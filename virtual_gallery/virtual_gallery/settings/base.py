@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+from .storage import build_storages
 
 # Базовый путь проекта: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent  # На один уровень выше, т.к. настройки в подпапке
@@ -27,6 +28,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',  # Чтение публичных страниц с реплик БД (см. core/db.py)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
@@ -47,6 +49,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.singletons',  # artist и site_contact для base.html
             ],
         },
     },
@@ -87,5 +90,81 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'  # Путь для collectstatic в produ
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Хранилища медиафайлов: локальный диск или S3 (S3_BUCKET и др., см. settings/storage.py)
+STORAGES = build_storages()
+MEDIA_WRITE_WORKERS = int(os.environ.get('MEDIA_WRITE_WORKERS', 8))  # Потоков записи версий и тайлов в хранилище
+
+# Загрузка больших изображений по частям из админки (см. core/uploads.py)
+CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', BASE_DIR / 'uploads')  # Вне MEDIA_ROOT: не раздается Nginx
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get('CHUNKED_UPLOAD_MAX_SIZE', 2 * 1024 ** 3))  # 2 ГБ
+CHUNKED_UPLOAD_CHUNK_SIZE = 8 * 1024 ** 2  # 8 МБ: меньше client_max_body_size в Nginx
+
+# Экспорт публичных страниц в HTML для Nginx (см. core/site_export.py); без каталога автоэкспорт отключен
+SITE_EXPORT_DIR = os.environ.get('SITE_EXPORT_DIR') or None
+SITE_EXPORT_WORKERS = int(os.environ.get('SITE_EXPORT_WORKERS', 4))
+
+# Бюджет обработки изображений (см. core/image_guard.py)
+IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS', 150_000_000))  # 150 Мп, больше — отказ по заголовку
+IMAGE_MAX_MEMORY = int(os.environ.get('IMAGE_MAX_MEMORY', 2 * 1024 ** 3))  # 2 ГБ на процесс обработки
+IMAGE_SUBPROCESS_PIXELS = int(os.environ.get('IMAGE_SUBPROCESS_PIXELS', 16_000_000))  # Больше — в отдельном процессе
+IMAGE_DECODE_CPU_SECONDS = int(os.environ.get('IMAGE_DECODE_CPU_SECONDS', 60))  # Лимит процессорного времени
+
+# Повторные загрузки: изображения с перцептивными хешами, отличающимися не больше чем на столько бит из 64,
+# считаются копиями (см. core/duplicates.py; поиск по частям хеша гарантирован до 3 бит)
+IMAGE_DUPLICATE_MAX_DISTANCE = int(os.environ.get('IMAGE_DUPLICATE_MAX_DISTANCE', 3))
+
+# Реплики БД для чтения публичных страниц (см. core/db.py); алиасы реплик задаются в prod.py/dev.py
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+REPLICA_DATABASES = []
+REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 5))  # Допустимое отставание реплики, сек
+REPLICA_CHECK_INTERVAL = 5  # Как часто воркер проверяет отставание каждой реплики, сек
+REPLICA_PIN_SECONDS = 15  # Сколько сотрудник читает из основной БД после своего изменения, сек
+
+# Кэш: Redis, общий для всех воркеров, если задан REDIS_URL, иначе память процесса
+if os.environ.get('REDIS_URL'):
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': os.environ['REDIS_URL']}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Кэш HTML-карточек картин и постов (см. core/cards.py)
+CARD_CACHE_TIMEOUT = int(os.environ.get('CARD_CACHE_TIMEOUT', 24 * 60 * 60))  # Сутки; изменение объекта меняет ключ
+
+# Счетчики просмотров картин (см. core/popularity.py)
+VIEW_COUNTER_FLUSH_INTERVAL = int(os.environ.get('VIEW_COUNTER_FLUSH_INTERVAL', 30))  # Запись в БД раз в N секунд
+POPULAR_PAINTINGS_COUNT = 3  # Картин в блоке «Популярные работы» на главной
+
+# Счетчики фасетов каталога (см. core/facets.py): сбрасываются при изменении картин, таймаут — страховка
+FACET_CACHE_TIMEOUT = 60 * 60
+
+# Почта: по умолчанию письма выводятся в консоль; в production — SMTP (см. settings/prod.py)
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_FILE_PATH = BASE_DIR / 'var' / 'emails'  # Каталог писем для django.core.mail.backends.filebased
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1') == '1'
+EMAIL_TIMEOUT = 10  # Секунды; письма отправляет deliver_outbox, а не запрос формы
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
+
+# Лимиты отправки формы обратной связи (см. core/ratelimit.py): (отправок подряд, за сколько секунд восстанавливаются)
+CONTACT_RATE_LIMIT_IP = (5, 10 * 60)
+CONTACT_RATE_LIMIT_EMAIL = (3, 60 * 60)
+
+# Уведомления о заявках с формы обратной связи (см. core/outbox.py)
+# Адреса для писем о заявках через запятую; пусто — e-mail из контактной информации сайта
+CONTACT_NOTIFY_EMAILS = [email.strip() for email in os.environ.get('CONTACT_NOTIFY_EMAILS', '').split(',') if email.strip()]
+TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '')  # Без токена и чата уведомления в Telegram не создаются
+TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID', '')
+OUTBOX_BATCH_SIZE = 50  # Сообщений за одну выборку deliver_outbox
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 8))  # После стольких неудач сообщение не доставлено
+OUTBOX_RETRY_DELAY = 60  # Пауза после первой неудачи, сек; удваивается с каждой попыткой
+OUTBOX_RETRY_MAX_DELAY = 6 * 60 * 60  # Пауза между попытками не больше 6 часов
+OUTBOX_SEND_TIMEOUT = 10  # Таймаут запроса к Telegram Bot API, сек
+
+# Матрица цветовых сигнатур картин для поиска по цвету (см. core/colors.py): файл .npy, который воркеры
+# отображают в память; пересобирается автоматически после изменения каталога
+COLOR_INDEX_PATH = os.environ.get('COLOR_INDEX_PATH', BASE_DIR / 'var' / 'color_index.npy')
+
 # Тип первичного ключа по умолчанию
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -0,0 +1,124 @@
+"""
+Сборка настроек подключения к PostgreSQL.
+
+Под psycopg 3 (с установленным psycopg_pool) включается пул соединений Django, под psycopg2 —
+постоянные соединения (CONN_MAX_AGE) с проверкой живости перед каждым запросом.
+Размер пула рассчитывается из числа воркеров Gunicorn так, чтобы все процессы вместе
+не превысили лимит соединений сервера БД.
+"""
+import os
+from importlib.util import find_spec
+
+
+def env_int(name, default):
+    """
+    Возвращает целочисленное значение переменной окружения или default, если она не задана.
+    """
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def detect_driver():
+    """
+    Определяет драйвер, который будет использовать Django: 'psycopg' (3) или 'psycopg2'.
+
+    Django предпочитает psycopg 3, если он установлен, поэтому порядок проверки такой же.
+    Пул доступен только при наличии пакета psycopg_pool (psycopg[pool]).
+    """
+    if find_spec('psycopg') is not None:
+        return 'psycopg-pool' if find_spec('psycopg_pool') is not None else 'psycopg'
+    return 'psycopg2'
+
+
+def pool_size(workers, threads, max_connections, reserved):
+    """
+    Рассчитывает максимальный размер пула одного процесса.
+
+    Аргументы:
+    workers -- число процессов Gunicorn.
+    threads -- число потоков в каждом процессе.
+    max_connections -- лимит соединений сервера PostgreSQL (max_connections).
+    reserved -- соединения, оставляемые для админских команд, миграций и фоновых задач.
+
+    Каждому потоку нужно не больше одного соединения, плюс одно про запас для фоновых потоков
+    процесса. Итог ограничивается долей лимита сервера, приходящейся на один воркер.
+    """
+    budget = max(1, (max_connections - reserved) // max(1, workers))
+    return max(1, min(threads + 1, budget))
+
+
+def build_database(name, user, password, host, port, driver=None, alias='default'):
+    """
+    Возвращает словарь настроек для DATABASES['default'] с учетом драйвера.
+
+    Аргументы:
+    name, user, password, host, port -- параметры подключения.
+    driver -- 'psycopg-pool', 'psycopg' или 'psycopg2' (по умолчанию определяется автоматически).
+    alias -- имя подключения, используется как имя пула в статистике.
+
+    Управляющие переменные окружения:
+    WEB_CONCURRENCY, GUNICORN_THREADS -- число воркеров и потоков (те же, что читает gunicorn.conf.py).
+    DB_MAX_CONNECTIONS, DB_RESERVED_CONNECTIONS -- лимит сервера и резерв вне веб-процессов.
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT -- явная настройка пула.
+    DB_CONN_MAX_AGE -- время жизни постоянного соединения в секундах (для psycopg2).
+    """
+    driver = driver or detect_driver()
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': name,
+        'USER': user,
+        'PASSWORD': password,
+        'HOST': host,
+        'PORT': port,
+        # Проверка соединения перед использованием: для пула — check при выдаче, иначе — ping
+        # в начале запроса, если соединение пережило предыдущий.
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+
+    if driver == 'psycopg-pool':
+        max_size = env_int('DB_POOL_MAX_SIZE', pool_size(
+            workers=env_int('WEB_CONCURRENCY', 3),
+            threads=env_int('GUNICORN_THREADS', 1),
+            max_connections=env_int('DB_MAX_CONNECTIONS', 100),
+            reserved=env_int('DB_RESERVED_CONNECTIONS', 10),
+        ))
+        min_size = min(env_int('DB_POOL_MIN_SIZE', 1), max_size)
+        # Пул несовместим с постоянными соединениями: Django требует CONN_MAX_AGE = 0.
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': min_size,
+            'max_size': max_size,
+            'timeout': env_int('DB_POOL_TIMEOUT', 10),
+            'max_idle': env_int('DB_POOL_MAX_IDLE', 600),
+            'name': alias,
+        }
+    else:
+        config['CONN_MAX_AGE'] = env_int('DB_CONN_MAX_AGE', 600)
+
+    return config
+
+
+def build_replicas(hosts, name, user, password, port, driver=None):
+    """
+    Возвращает настройки реплик для DATABASES: {'replica': ..., 'replica2': ...} по списку хостов.
+
+    Хост может содержать порт (db-replica:5433). Реплики — потоковые копии основной БД с теми же
+    именем, пользователем и паролем. В тестах они зеркалируют default (TEST MIRROR), отдельные
+    тестовые БД для них не создаются.
+    """
+    replicas = {}
+    for number, host in enumerate(hosts, start=1):
+        alias = 'replica' if number == 1 else f'replica{number}'
+        host, _, host_port = host.partition(':')
+        config = build_database(name, user, password, host, host_port or port, driver=driver, alias=alias)
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[alias] = config
+    return replicas
+
+
+def replica_hosts():
+    """
+    Возвращает хосты реплик из переменной окружения DB_REPLICA_HOSTS (через запятую).
+    """
+    return [host.strip() for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
@@ -1,4 +1,5 @@
 from .base import *
+from .database import build_replicas, replica_hosts
 
 # Разработка: включен debug-режим
 DEBUG = True
@@ -15,5 +16,17 @@ DATABASES = {
         'PASSWORD': os.environ.get('DB_PASSWORD', ''),
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+    },
+    # Локальная реплика (docker compose --profile replica): DB_REPLICA_HOSTS=localhost:5433
+    **build_replicas(
+        replica_hosts(),
+        name=os.environ.get('DB_NAME', 'gallery_dev'),
+        user=os.environ.get('DB_USER', 'postgres'),
+        password=os.environ.get('DB_PASSWORD', ''),
+        port='5432',
+    ),
 }
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+
+# Письма уведомлений сохраняются файлами в var/emails (см. core/outbox.py)
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend')
@@ -1,4 +1,6 @@
 from .base import *
+from .database import build_database, build_replicas, replica_hosts
+from .storage import build_storages
 
 # Production: отключен debug-режим
 DEBUG = False
@@ -6,17 +8,26 @@ DEBUG = False
 # Разрешенные хосты: из переменных окружения (список через запятую)
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '').split(',')
 
-# База данных: PostgreSQL для production, данные строго из .env
+# База данных: PostgreSQL для production, данные строго из .env.
+# Пул соединений (psycopg 3) или постоянные соединения (psycopg2), см. settings/database.py
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.environ.get('DB_NAME'),
-        'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASSWORD'),
-        'HOST': os.environ.get('DB_HOST', 'db'),
-        'PORT': os.environ.get('DB_PORT', '5432'),
-    }
+    'default': build_database(
+        name=os.environ.get('DB_NAME'),
+        user=os.environ.get('DB_USER'),
+        password=os.environ.get('DB_PASSWORD'),
+        host=os.environ.get('DB_HOST', 'db'),
+        port=os.environ.get('DB_PORT', '5432'),
+    ),
+    # Реплики для чтения публичных страниц: DB_REPLICA_HOSTS=db-replica (см. core/db.py)
+    **build_replicas(
+        replica_hosts(),
+        name=os.environ.get('DB_NAME'),
+        user=os.environ.get('DB_USER'),
+        password=os.environ.get('DB_PASSWORD'),
+        port=os.environ.get('DB_PORT', '5432'),
+    ),
 }
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
 
 # Настройки безопасности для production
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')  # Для прокси (например, Nginx)
@@ -29,6 +40,15 @@ SECURE_HSTS_SECONDS = 31536000  # HSTS на 1 год
 SECURE_HSTS_PRELOAD = True  # Разрешить предзагрузку HSTS
 X_FRAME_OPTIONS = 'DENY'  # Запрет встраивания в фреймы
 
+# Почта уведомлений: SMTP, если задан EMAIL_HOST (EMAIL_PORT/EMAIL_HOST_USER/EMAIL_HOST_PASSWORD из .env),
+# иначе письма выводятся в лог сервиса outbox
+if os.environ.get('EMAIL_HOST'):
+    EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+
 # Пути для static и media в production (сервируются Nginx)
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Статика: минификация, хеш содержимого в имени файла и предсжатые .gz/.br копии при collectstatic.
+# Медиафайлы: локальный диск или S3 (см. settings/storage.py)
+STORAGES = build_storages('core.storage.CompressedManifestStaticFilesStorage')
@@ -0,0 +1,58 @@
+"""
+Сборка настроек хранилищ файлов (STORAGES).
+
+Медиафайлы хранятся на локальном диске (MEDIA_ROOT) или, если задан S3_BUCKET, в S3-совместимом
+хранилище (AWS S3, MinIO, Yandex Object Storage): тогда несколько веб-узлов работают с одними файлами.
+Алиас overwrite — то же хранилище, но новый файл заменяет прежний с тем же именем
+(см. core.storage.overwrite_storage).
+"""
+import os
+from .database import env_int
+
+MB = 1024 * 1024
+
+
+def s3_options():
+    """
+    Параметры S3Storage (django-storages) из переменных окружения.
+
+    Оригиналы больше S3_MULTIPART_THRESHOLD МБ загружаются по частям (multipart upload)
+    в S3_MAX_CONCURRENCY потоков: упавшая часть повторяется отдельно, а не весь файл.
+    """
+    from boto3.s3.transfer import TransferConfig  # boto3 нужен только для режима S3
+
+    return {
+        'bucket_name': os.environ['S3_BUCKET'],
+        'endpoint_url': os.environ.get('S3_ENDPOINT_URL') or None,  # Для MinIO и других совместимых хранилищ
+        'region_name': os.environ.get('S3_REGION') or None,
+        'access_key': os.environ.get('S3_ACCESS_KEY'),
+        'secret_key': os.environ.get('S3_SECRET_KEY'),
+        'custom_domain': os.environ.get('S3_CUSTOM_DOMAIN') or None,  # Домен раздачи (CDN или хост:порт/бакет)
+        'url_protocol': os.environ.get('S3_URL_PROTOCOL', 'https:'),
+        'querystring_auth': False,  # Изображения публичные: ссылки без подписи, кэшируются браузером
+        'transfer_config': TransferConfig(
+            multipart_threshold=env_int('S3_MULTIPART_THRESHOLD', 16) * MB,
+            multipart_chunksize=env_int('S3_MULTIPART_CHUNKSIZE', 16) * MB,
+            max_concurrency=env_int('S3_MAX_CONCURRENCY', 4),
+        ),
+    }
+
+
+def build_storages(staticfiles_backend='django.contrib.staticfiles.storage.StaticFilesStorage'):
+    """
+    Возвращает STORAGES: default и overwrite для медиафайлов, staticfiles для статики.
+
+    Статика всегда собирается на диск (collectstatic) и раздается Nginx.
+    """
+    if os.environ.get('S3_BUCKET'):
+        options = s3_options()
+        media = {'BACKEND': 'storages.backends.s3.S3Storage', 'OPTIONS': {**options, 'file_overwrite': False}}
+        overwrite = {'BACKEND': 'storages.backends.s3.S3Storage', 'OPTIONS': {**options, 'file_overwrite': True}}
+    else:
+        media = {'BACKEND': 'django.core.files.storage.FileSystemStorage'}
+        overwrite = {'BACKEND': 'core.storage.OverwriteStorage'}
+    return {
+        'default': media,
+        'overwrite': overwrite,
+        'staticfiles': {'BACKEND': staticfiles_backend},
+    }